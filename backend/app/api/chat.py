@@ -5,7 +5,6 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.future import select
 from typing import Dict, Any
@@ -14,11 +13,16 @@ import json
 import asyncio
 from datetime import datetime, timezone, timedelta
 
-from app.database import get_db, IS_ASYNC
+from app.database import get_db, get_read_db, IS_ASYNC
 from app.models.project import Project
 from app.models.image_record import ChatMessage
 from app.schemas.chat import ChatRequest, ChatResponse
-from app.services.gpt_service import GPTService
+from app.services.llm_router import get_llm_router
+from app.services.knowledge_service import get_knowledge_service, to_rag_context
+from app.middleware.admission import get_chat_admission, AdmissionRejected
+from app.services.chat_hub import get_chat_hub, message_frame
+from app.services.timing import span
+from app.middleware.conditional import conditional_get
 
 router = APIRouter(prefix="/api/v2/chat", tags=["chat-v2"])
 
@@ -51,12 +55,30 @@ async def send_message_v2(
             "expected_spaces": project.expected_spaces or ["거실", "주방", "침실", "욕실"]
         }
         
-        # GPT 서비스로 응답 생성
-        gpt_service = GPTService()
-        gpt_result = await gpt_service.chat_response(
-            message=chat_request.message,
-            project_context=project_context
-        )
+        # 관련 지식 검색 - 필요한 스니펫만 프롬프트에 주입
+        with span("rag"):
+            knowledge = get_knowledge_service().retrieve(chat_request.message)
+        project_context["knowledge"] = [snippet["text"] for snippet in knowledge["snippets"]]
+        rag_context = to_rag_context(knowledge)
+        
+        # 읽기 트랜잭션 종료 - 슬롯/응답을 기다리는 동안 DB 연결을 풀에 반납 (저장할 때 다시 획득)
+        if IS_ASYNC:
+            await db.commit()
+        else:
+            db.commit()
+        
+        # 동시성 제한 안에서 라우터(가장 빠른 프로바이더)로 응답 생성
+        llm_router = get_llm_router()
+        try:
+            async with get_chat_admission().slot(chat_request.project_id):
+                with span("llm"):
+                    gpt_result = await llm_router.generate_response(
+                        user_message=chat_request.message,
+                        project_context=project_context,
+                        hedge=chat_request.latency_critical
+                    )
+        except AdmissionRejected as e:
+            raise e.to_http_exception()
         
         if not gpt_result.get("success", False):
             raise HTTPException(
@@ -73,17 +95,23 @@ async def send_message_v2(
             project_id=chat_request.project_id,
             user_message=chat_request.message,
             ai_response=gpt_result["response"],
-            rag_context=None,  # 새 버전에서는 RAG 없음
+            rag_context=json.dumps(rag_context, ensure_ascii=False) if rag_context else None,
             confidence=0.0
         )
         
         db.add(new_message)
-        if IS_ASYNC:
-            await db.commit()
-            await db.refresh(new_message)
-        else:
-            db.commit()
-            db.refresh(new_message)
+        with span("commit"):
+            if IS_ASYNC:
+                await db.commit()
+                await db.refresh(new_message)
+            else:
+                db.commit()
+                db.refresh(new_message)
+        
+        # 같은 프로젝트를 보고 있는 다른 기기에 푸시
+        get_chat_hub().publish(chat_request.project_id, message_frame(
+            chat_request.project_id, message_id, chat_request.message, gpt_result["response"]
+        ))
         
         # 한국 시간으로 변환 (UTC + 9시간)
         kst_time = new_message.created_at.replace(tzinfo=timezone.utc) + timedelta(hours=9)
@@ -94,12 +122,13 @@ async def send_message_v2(
             message_id=message_id,
             response=gpt_result["response"],
             confidence=0.0,
-            rag_context=None,
+            rag_context=rag_context,
             created_at=kst_time,
             model_info={
                 "model_name": gpt_result.get("model", "gpt-4o-mini"),
-                "provider": "openai",
-                "quick_response": gpt_result.get("quick_response", False)
+                "provider": gpt_result.get("provider", "openai"),
+                "quick_response": gpt_result.get("quick_response", False),
+                "usage": gpt_result.get("usage")
             }
         )
         
@@ -111,99 +140,12 @@ async def send_message_v2(
             detail=f"채팅 처리 중 오류가 발생했습니다: {str(e)}"
         )
 
-@router.post("/stream")
-async def chat_stream(
-    chat_request: ChatRequest,
-    db = Depends(get_db)
-):
-    """스트리밍 채팅 응답"""
-    async def generate():
-        try:
-            # 프로젝트 확인
-            if IS_ASYNC:
-                result = await db.execute(
-                    select(Project).where(Project.project_id == chat_request.project_id)
-                )
-                project = result.scalar_one_or_none()
-            else:
-                project = db.query(Project).filter(Project.project_id == chat_request.project_id).first()
-            
-            if not project:
-                yield f"data: {json.dumps({'type': 'error', 'message': '프로젝트를 찾을 수 없습니다'})}\n\n"
-                return
-            
-            # 프로젝트 컨텍스트
-            project_context = {
-                "project_type": project.project_type or "일반 주택",
-                "current_stage": project.current_stage or "시공 전",
-                "expected_spaces": project.expected_spaces or ["거실", "주방", "침실", "욕실"]
-            }
-            
-            # 최근 대화 히스토리 가져오기 (3개만)
-            if IS_ASYNC:
-                result = await db.execute(
-                    select(ChatMessage)
-                    .where(ChatMessage.project_id == chat_request.project_id)
-                    .order_by(ChatMessage.created_at.desc())
-                    .limit(3)
-                )
-                recent_messages = result.scalars().all()
-            else:
-                recent_messages = db.query(ChatMessage).filter(
-                    ChatMessage.project_id == chat_request.project_id
-                ).order_by(ChatMessage.created_at.desc()).limit(3).all()
-            
-            # 대화 히스토리 구성
-            conversation_history = []
-            for msg in reversed(recent_messages):
-                conversation_history.append({"role": "user", "content": msg.user_message})
-                conversation_history.append({"role": "assistant", "content": msg.ai_response})
-            
-            # GPT 스트리밍 응답
-            gpt_service = GPTService()
-            full_response = ""
-            
-            async for chunk in gpt_service.generate_stream(
-                user_message=chat_request.message,
-                project_context=project_context,
-                conversation_history=conversation_history
-            ):
-                yield f"data: {chunk}\n\n"
-                
-                # 응답 텍스트 누적
-                chunk_data = json.loads(chunk)
-                if chunk_data.get('type') == 'content':
-                    full_response += chunk_data.get('text', '')
-            
-            # DB에 저장 (스트리밍 완료 후)
-            if full_response:
-                message_id = f"msg_{str(uuid.uuid4())[:8]}"
-                new_message = ChatMessage(
-                    message_id=message_id,
-                    project_id=chat_request.project_id,
-                    user_message=chat_request.message,
-                    ai_response=full_response,
-                    rag_context=None,
-                    confidence=1.0
-                )
-                
-                db.add(new_message)
-                if IS_ASYNC:
-                    await db.commit()
-                else:
-                    db.commit()
-            
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
-    
-    return StreamingResponse(generate(), media_type="text/event-stream")
-
-@router.get("/history/{project_id}")
+@router.get("/history/{project_id}", dependencies=[Depends(conditional_get("chat"))])
 async def get_chat_history_v2(
     project_id: str,
     skip: int = 0,
     limit: int = 50,
-    db = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     """채팅 히스토리 조회"""
     try:
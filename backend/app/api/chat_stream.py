@@ -1,154 +1,311 @@
 """
 스트리밍 채팅 API
 - SSE (Server-Sent Events)를 통한 실시간 응답
-- Gemini API 스트림 모드 활용
+- 라우터가 넘겨준 이벤트 객체를 응답 가장자리에서 한 번만 직렬화
+- 클라이언트 연결이 끊기면 라우터/업스트림 스트림을 즉시 닫고 부분 응답을 저장
+- 생성 로직(ChatStream.events)은 WebSocket 채팅(chat_ws.py)과 공유
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from sqlalchemy.future import select
+import os
 import json
-import asyncio
+import time
 import uuid
+import asyncio
+from contextlib import aclosing
 from datetime import datetime, timezone, timedelta
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Optional, List
 
 from app.database import get_db, IS_ASYNC
 from app.models.project import Project
 from app.models.image_record import ChatMessage
 from app.schemas.chat import ChatRequest
-from app.services.gpt_service import GPTService
+from app.services.llm_router import get_llm_router, FALLBACK_TEXT
+from app.services.stream_events import StreamEvent, ContentEvent, EndEvent, ErrorEvent, TimingEvent, encode_sse
+from app.services.chat_hub import get_chat_hub, message_frame, Subscriber
+from app.services.metrics import streams_in_flight
+from app.services.timing import span, record, current_timings
+from app.services.knowledge_service import get_knowledge_service, to_rag_context
+from app.middleware.admission import get_chat_admission, AdmissionRejected, Slot
 
 router = APIRouter(prefix="/api/v2/chat", tags=["chat-stream"])
 
-async def generate_sse_response(
-    chat_request: ChatRequest,
-    db
-) -> AsyncGenerator[str, None]:
-    """SSE 스트림 생성"""
-    
-    try:
-        # 프로젝트 확인
+# 토큰 전송 사이 연결 끊김 확인 간격 (초) - 토큰마다 확인하지 않음
+DISCONNECT_CHECK_INTERVAL = float(os.getenv("CHAT_DISCONNECT_CHECK_INTERVAL", "0.5"))
+
+# 스트림 종료 통계
+_stream_stats: Dict[str, int] = {"completed": 0, "disconnected": 0, "partial_saved": 0}
+
+
+def get_stream_stats() -> Dict[str, int]:
+    """스트림 종료 사유별 건수"""
+    return dict(_stream_stats)
+
+
+class ChatStream:
+    """채팅 스트림 1건
+
+    - events(): 이벤트 객체 생성 (전송 방식과 무관)
+    - body(): StreamingResponse 본문 (SSE 프레임)
+    - finish(): 응답 후 정리 - 업스트림 종료, 중단된 부분 응답 저장, 슬롯 반납
+
+    연결 끊김은 두 경로로 감지한다.
+    1. Starlette 가 http.disconnect 를 받으면 스트림 태스크를 취소 (토큰 대기 중)
+    2. 토큰 전송 사이에 Request.is_disconnected() 확인 (DISCONNECT_CHECK_INTERVAL 간격)
+    """
+
+    def __init__(self, chat_request: ChatRequest, db, request: Optional[Request] = None,
+                 slot: Optional[Slot] = None, origin: Optional[Subscriber] = None):
+        """
+        Args:
+            request: SSE 요청 (토큰 사이 연결 끊김 확인용)
+            slot: 동시성 제한 슬롯 (finish 에서 반납)
+            origin: 요청을 보낸 WebSocket 연결 (자기 자신에게는 푸시하지 않음)
+        """
+        self.chat_request = chat_request
+        self.db = db
+        self.request = request
+        self.slot = slot
+        self.origin = origin
+        self.text_parts: List[str] = []
+        self.rag_context: Optional[Dict] = None
+        self.completed = False
+        self.disconnected = False
+        self._events: Optional[AsyncGenerator[StreamEvent, None]] = None
+        self._transport: Optional[str] = None
+        self._checked_at = time.monotonic()
+
+    async def _client_gone(self) -> bool:
+        """토큰 사이 연결 끊김 확인 (간격 제한)"""
+        if self.request is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < DISCONNECT_CHECK_INTERVAL:
+            return False
+        self._checked_at = now
+        return await self.request.is_disconnected()
+
+    def events(self) -> AsyncGenerator[StreamEvent, None]:
+        """이벤트 생성기 (finish 에서 닫을 수 있도록 보관)"""
+        self._events = self._generate()
+        self._transport = "sse" if self.request is not None else "ws"
+        streams_in_flight.labels(self._transport).inc()
+        return self._events
+
+    def interrupt(self):
+        """클라이언트가 떠남 - 완료 전이면 finish 에서 부분 응답으로 처리"""
+        self.disconnected = not self.completed
+
+    async def body(self) -> AsyncGenerator[bytes, None]:
+        """SSE 본문 - 연결이 끊기면 이벤트 생성기를 즉시 닫음, 정상 종료 시 마지막에 timing 이벤트"""
+        events = self.events()
+        try:
+            async for event in events:
+                yield encode_sse(event)
+                if not self.completed and await self._client_gone():
+                    self.interrupt()
+                    break
+            timings = current_timings()
+            if self.completed and timings is not None:
+                yield encode_sse(TimingEvent(timings.to_dict()))
+        except (asyncio.CancelledError, GeneratorExit):
+            # 전송 중 연결 끊김 (Starlette 가 스트림 태스크를 취소)
+            self.interrupt()
+            raise
+        finally:
+            # 라우터 → 프로바이더 생성기를 닫으면 업스트림 시도 태스크가 취소되고 HTTP 스트림도 닫힘
+            await events.aclose()
+            if self.slot is not None:
+                self.slot.release()
+
+    async def finish(self):
+        """응답 종료 후 정리 (취소되지 않는 컨텍스트에서 실행 - SSE 는 백그라운드 태스크)"""
+        try:
+            if self._events is not None:
+                await self._events.aclose()
+            if self.disconnected:
+                _stream_stats["disconnected"] += 1
+                if self.text_parts:
+                    # 사용자가 본 부분까지 저장 (정상 응답과 같은 형식 + 중단 표시)
+                    await self._save("".join(self.text_parts), interrupted=True)
+                    _stream_stats["partial_saved"] += 1
+            elif self.completed:
+                _stream_stats["completed"] += 1
+        except Exception as e:
+            print(f"스트림 정리 오류: {e}")
+        finally:
+            if self.slot is not None:
+                self.slot.release()
+            if self._transport is not None:
+                streams_in_flight.labels(self._transport).dec()
+                self._transport = None
+
+    async def _save(self, text: str, interrupted: bool = False) -> str:
+        """응답 메시지 저장"""
+        rag_context = dict(self.rag_context or {})
+        if interrupted:
+            rag_context["interrupted"] = True
+
+        message_id = f"msg_{str(uuid.uuid4())[:8]}"
+        new_message = ChatMessage(
+            message_id=message_id,
+            project_id=self.chat_request.project_id,
+            user_message=self.chat_request.message,
+            ai_response=text,
+            rag_context=json.dumps(rag_context, ensure_ascii=False) if rag_context else None,
+            confidence=1.0
+        )
+
+        self.db.add(new_message)
         if IS_ASYNC:
-            result = await db.execute(
-                select(Project).where(Project.project_id == chat_request.project_id)
-            )
-            project = result.scalar_one_or_none()
+            await self.db.commit()
         else:
-            project = db.query(Project).filter(Project.project_id == chat_request.project_id).first()
-        
-        if not project:
-            yield f"data: {json.dumps({'error': '프로젝트를 찾을 수 없습니다'})}\n\n"
-            return
-        
-        # 프로젝트 컨텍스트
-        project_context = {
-            "project_type": project.project_type or "일반 주택",
-            "current_stage": project.current_stage or "시공 전",
-            "expected_spaces": project.expected_spaces or ["거실", "주방", "침실", "욕실"]
-        }
-        
-        # GPT 서비스
-        gpt_service = GPTService()
-        
-        # 빠른 응답 체크 (public method 사용)
-        try:
-            quick_response = await gpt_service._check_quick_patterns(chat_request.message)
-        except:
-            quick_response = None
-            
-        if quick_response:
-            # 빠른 응답은 한 번에 전송
-            yield f"data: {json.dumps({'type': 'start', 'model': 'cache'})}\n\n"
-            yield f"data: {json.dumps({'type': 'content', 'text': quick_response['response']})}\n\n"
-            yield f"data: {json.dumps({'type': 'end'})}\n\n"
-            return
-        
-        # 대화 히스토리 준비
-        conversation_history = [
-            {"role": h.get("role", "user"), "content": h.get("content", "")}
-            for h in (chat_request.conversation_history or [])[-10:]
-        ]
-        
-        # GPT 스트리밍 생성
-        full_text = ""
-        message_id = None
-        
+            self.db.commit()
+
+        # 같은 프로젝트를 보고 있는 다른 기기에 푸시
+        get_chat_hub().publish(self.chat_request.project_id, message_frame(
+            self.chat_request.project_id, message_id, self.chat_request.message, text
+        ), exclude=self.origin)
+        return message_id
+
+    async def _generate(self) -> AsyncGenerator[StreamEvent, None]:
+        """응답 이벤트 생성 (직렬화는 전송 계층에서 한 번만)"""
+        chat_request = self.chat_request
+        db = self.db
+
         try:
-            async for chunk_json in gpt_service.generate_stream(
-                chat_request.message,
-                project_context,
-                conversation_history
-            ):
-                chunk_data = json.loads(chunk_json)
-                
-                # 컨텐츠 누적
-                if chunk_data.get('type') == 'content':
-                    full_text += chunk_data.get('text', '')
-                    # SSE 형식으로 전송
-                    yield f"data: {json.dumps(chunk_data)}\n\n"
-                
-                # 시작 이벤트 전송
-                elif chunk_data.get('type') == 'start':
-                    yield f"data: {json.dumps(chunk_data)}\n\n"
-                
-                # 종료 이벤트 처리
-                elif chunk_data.get('type') == 'end':
-                    # 메시지 저장
-                    if full_text:
-                        message_id = f"msg_{str(uuid.uuid4())[:8]}"
-                        new_message = ChatMessage(
-                            message_id=message_id,
-                            project_id=chat_request.project_id,
-                            user_message=chat_request.message,
-                            ai_response=full_text,
-                            rag_context=None,
-                            confidence=0.0
-                        )
-                        
-                        db.add(new_message)
-                        if IS_ASYNC:
-                            await db.commit()
-                        else:
-                            db.commit()
-                    
-                    # 메시지 ID와 함께 종료 이벤트 전송
-                    yield f"data: {json.dumps({'type': 'end', 'message_id': message_id})}\n\n"
-                    return
-            
+            # 프로젝트 확인
+            if IS_ASYNC:
+                result = await db.execute(
+                    select(Project).where(Project.project_id == chat_request.project_id)
+                )
+                project = result.scalar_one_or_none()
+            else:
+                project = db.query(Project).filter(Project.project_id == chat_request.project_id).first()
+
+            if not project:
+                yield ErrorEvent('프로젝트를 찾을 수 없습니다')
+                return
+
+            # 프로젝트 컨텍스트
+            project_context = {
+                "project_type": project.project_type or "일반 주택",
+                "current_stage": project.current_stage or "시공 전",
+                "expected_spaces": project.expected_spaces or ["거실", "주방", "침실", "욕실"]
+            }
+
+            # 관련 지식 검색 - 필요한 스니펫만 프롬프트에 주입
+            with span("rag"):
+                knowledge = get_knowledge_service().retrieve(chat_request.message)
+            project_context["knowledge"] = [snippet["text"] for snippet in knowledge["snippets"]]
+            self.rag_context = to_rag_context(knowledge)
+
+            # 대화 히스토리 준비 (클라이언트가 보내지 않으면 DB의 최근 대화 3개)
+            conversation_history = [
+                {"role": h.get("role", "user"), "content": h.get("content", "")}
+                for h in (chat_request.conversation_history or [])[-10:]
+            ]
+            if not conversation_history:
+                if IS_ASYNC:
+                    result = await db.execute(
+                        select(ChatMessage)
+                        .where(ChatMessage.project_id == chat_request.project_id)
+                        .order_by(ChatMessage.created_at.desc())
+                        .limit(3)
+                    )
+                    recent_messages = result.scalars().all()
+                else:
+                    recent_messages = db.query(ChatMessage).filter(
+                        ChatMessage.project_id == chat_request.project_id
+                    ).order_by(ChatMessage.created_at.desc()).limit(3).all()
+
+                for msg in reversed(recent_messages):
+                    conversation_history.append({"role": "user", "content": msg.user_message})
+                    conversation_history.append({"role": "assistant", "content": msg.ai_response})
+
+            # 읽기 트랜잭션 종료 - 토큰을 기다리는 동안 DB 연결을 풀에 반납 (저장할 때 다시 획득)
+            if IS_ASYNC:
+                await db.commit()
+            else:
+                db.commit()
+
+            # 라우터를 통한 스트리밍 생성 (빠른 응답 판별 + 가장 빠른 정상 프로바이더)
+            llm_router = get_llm_router()
+            llm_started_at = time.perf_counter()
+
+            try:
+                # 중간에 빠져나가면 라우터 생성기를 바로 닫아 업스트림 시도 태스크 취소
+                async with aclosing(llm_router.generate_stream(
+                    chat_request.message,
+                    project_context,
+                    conversation_history,
+                    hedge=chat_request.latency_critical
+                )) as events:
+                    async for event in events:
+                        if isinstance(event, EndEvent):
+                            # 메시지 저장 후 메시지 ID와 함께 종료 이벤트 전송
+                            self.completed = True
+                            record("llm", time.perf_counter() - llm_started_at)
+                            full_text = "".join(self.text_parts)
+                            with span("save"):
+                                message_id = await self._save(full_text) if full_text else None
+                            yield EndEvent(usage=event.usage, message_id=message_id)
+                            return
+
+                        # 컨텐츠 누적
+                        if isinstance(event, ContentEvent):
+                            if not self.text_parts:
+                                record("llm_ttft", time.perf_counter() - llm_started_at)
+                            self.text_parts.append(event.text)
+                        yield event
+
+            except Exception as e:
+                # 에러 로깅 (서버 측에서만)
+                import traceback
+                error_detail = traceback.format_exc()
+                print(f"스트리밍 에러 (서버): {error_detail}")
+
+                # 에러 발생 시 폴백 응답 (에러 이벤트 없이)
+                self.completed = True
+                yield ContentEvent(FALLBACK_TEXT, fallback=True)
+
+                # 메시지 ID 없이 종료
+                yield EndEvent()
+
         except Exception as e:
-            # 에러 로깅 (서버 측에서만)
-            import traceback
-            error_detail = traceback.format_exc()
-            print(f"스트리밍 에러 (서버): {error_detail}")
-            
-            # 에러 발생 시 폴백 응답 (에러 이벤트 없이)
-            yield f"data: {json.dumps({'type': 'content', 'text': '네, 실장님. 말씀하신 내용 확인했어요. 구체적으로 어떤 도움이 필요하신가요?'})}\n\n"
-            # yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"  # 에러 이벤트 제거
-            
-            # 메시지 ID 없이 종료
-            yield f"data: {json.dumps({'type': 'end'})}\n\n"
-            
-    except Exception as e:
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            self.completed = True
+            yield ErrorEvent(str(e))
+
 
 @router.post("/stream")
 async def stream_message(
     chat_request: ChatRequest,
+    request: Request,
     db = Depends(get_db)
 ):
     """스트리밍 채팅 엔드포인트"""
-    
+
+    # 동시성 제한 - 슬롯은 스트림이 끝나거나 연결이 끊기면 반납
+    try:
+        slot = await get_chat_admission().acquire(chat_request.project_id)
+    except AdmissionRejected as e:
+        raise e.to_http_exception()
+
     headers = {
         "Content-Type": "text/event-stream",
         "Cache-Control": "no-cache",
         "Connection": "keep-alive",
         "X-Accel-Buffering": "no",  # Nginx 버퍼링 비활성화
     }
-    
+
+    stream = ChatStream(chat_request, db, request=request, slot=slot)
     return StreamingResponse(
-        generate_sse_response(chat_request, db),
+        stream.body(),
         media_type="text/event-stream",
-        headers=headers
-    )
\ No newline at end of file
+        headers=headers,
+        background=BackgroundTask(stream.finish)
+    )
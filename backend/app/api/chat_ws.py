@@ -0,0 +1,245 @@
+"""
+WebSocket 채팅 API (/ws/chat)
+- 기기당 연결 1개로 여러 프로젝트 대화를 다중화 (턴마다 클라이언트가 정한 id)
+- 응답은 짧은 키의 압축 프레임으로 스트리밍 - 생성 로직은 /api/v2/chat/stream 과 동일 (ChatStream)
+- 구독한 프로젝트에 새 메시지가 저장되면 서버 푸시
+
+프로토콜 (JSON 텍스트 프레임)
+  클라이언트 → 서버
+    {"t": "chat", "id": "c1", "p": "<project_id>", "m": "<메시지>", "h": [히스토리], "lc": true}
+    {"t": "cancel", "id": "c1"}
+    {"t": "sub", "p": "<project_id>"} / {"t": "unsub", "p": "<project_id>"}
+    {"t": "ping"}
+  서버 → 클라이언트
+    {"t": "hello", "v": 1, "max_turns": 4}
+    {"t": "s", "id": "c1", "m": "<model>"}              응답 시작
+    {"t": "d", "id": "c1", "x": "<텍스트 조각>"}         델타
+    {"t": "e", "id": "c1", "mid": "<message_id>", "u": {...}}  종료 (취소된 턴은 "c": 1)
+    {"t": "x", "id": "c1", "e": "<오류>", "retry": 3}    오류 (retry: 재시도 대기 초)
+    {"t": "push", "p": "<project_id>", "mid": ..., "q": ..., "a": ...}  다른 기기의 새 메시지
+    {"t": "pong"}
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Dict, Any, Optional, Set
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.database import SessionLocal, IS_ASYNC
+from app.schemas.chat import ChatRequest
+from app.api.chat_stream import ChatStream
+from app.services.chat_hub import get_chat_hub
+from app.services.stream_events import StreamEvent, encode_frame, encode_json
+from app.middleware.admission import get_chat_admission, AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["chat-ws"])
+
+PROTOCOL_VERSION = 1
+WS_MAX_TURNS = int(os.getenv("WS_MAX_TURNS", "4"))        # 연결당 동시 진행 턴
+WS_SEND_QUEUE = int(os.getenv("WS_SEND_QUEUE", "256"))    # 연결당 보내기 대기열 (프레임)
+MAX_TURN_ID = 64
+
+# 연결 통계
+_ws_stats: Dict[str, int] = {"active": 0, "connections": 0, "turns": 0, "cancelled": 0, "frames_sent": 0}
+
+
+def get_ws_stats() -> Dict[str, Any]:
+    """WebSocket 채팅 통계 (푸시 허브 포함)"""
+    return {**_ws_stats, "hub": get_chat_hub().get_stats()}
+
+
+class ChatConnection:
+    """기기 1대의 WebSocket 연결
+
+    턴마다 태스크 하나가 ChatStream 이벤트를 보내기 대기열에 넣고,
+    writer 태스크 하나만 소켓에 쓴다 (동시 send 없음, 느린 클라이언트는 대기열로 역압).
+    """
+
+    def __init__(self, websocket: WebSocket, max_turns: int = WS_MAX_TURNS):
+        self.websocket = websocket
+        self.max_turns = max_turns
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE)
+        self.turns: Dict[str, asyncio.Task] = {}
+        self.subscriptions: Set[str] = set()
+        self._cancel_requested: Set[str] = set()
+
+    # =========================
+    # 보내기
+    # =========================
+
+    async def send(self, frame: Dict[str, Any]):
+        await self.outbox.put(encode_json(frame).decode("utf-8"))
+
+    async def send_event(self, event: StreamEvent, turn_id: str):
+        await self.outbox.put(encode_frame(event, turn_id))
+
+    def push(self, frame: Dict[str, Any]) -> bool:
+        """허브 푸시 (발행자를 기다리게 하지 않음)"""
+        try:
+            self.outbox.put_nowait(encode_json(frame).decode("utf-8"))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _writer(self):
+        try:
+            while True:
+                text = await self.outbox.get()
+                await self.websocket.send_text(text)
+                _ws_stats["frames_sent"] += 1
+        except Exception as e:
+            # 소켓이 이미 닫힘 - 받기 루프가 곧 연결 종료를 처리
+            logger.debug(f"WebSocket 쓰기 중단: {e}")
+
+    # =========================
+    # 받기
+    # =========================
+
+    async def serve(self):
+        """연결 수명 동안 클라이언트 프레임 처리"""
+        writer = asyncio.create_task(self._writer())
+        await self.send({"t": "hello", "v": PROTOCOL_VERSION, "max_turns": self.max_turns})
+        try:
+            while True:
+                text = await self.websocket.receive_text()
+                try:
+                    frame = json.loads(text)
+                except ValueError:
+                    await self.send({"t": "x", "id": None, "e": "JSON 프레임이 아닙니다"})
+                    continue
+                if not isinstance(frame, dict):
+                    await self.send({"t": "x", "id": None, "e": "객체 프레임이 필요합니다"})
+                    continue
+                await self._handle(frame)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await self.close()
+            writer.cancel()
+
+    async def _handle(self, frame: Dict[str, Any]):
+        kind = frame.get("t")
+        if kind == "chat":
+            await self._start_turn(frame)
+        elif kind == "cancel":
+            turn_id = str(frame.get("id"))
+            task = self.turns.get(turn_id)
+            if task is not None:
+                _ws_stats["cancelled"] += 1
+                self._cancel_requested.add(turn_id)
+                task.cancel()
+        elif kind == "sub":
+            self._subscribe(frame.get("p"))
+        elif kind == "unsub":
+            project_id = frame.get("p")
+            if project_id in self.subscriptions:
+                self.subscriptions.discard(project_id)
+                get_chat_hub().unsubscribe(project_id, self)
+        elif kind == "ping":
+            await self.send({"t": "pong"})
+        else:
+            await self.send({"t": "x", "id": frame.get("id"), "e": f"알 수 없는 프레임: {kind}"})
+
+    def _subscribe(self, project_id: Any):
+        if isinstance(project_id, str) and project_id and project_id not in self.subscriptions:
+            self.subscriptions.add(project_id)
+            get_chat_hub().subscribe(project_id, self)
+
+    async def _start_turn(self, frame: Dict[str, Any]):
+        turn_id = frame.get("id")
+        if not isinstance(turn_id, str) or not turn_id or len(turn_id) > MAX_TURN_ID:
+            await self.send({"t": "x", "id": None, "e": "턴 id가 필요합니다"})
+            return
+        if turn_id in self.turns:
+            await self.send({"t": "x", "id": turn_id, "e": "이미 진행 중인 턴 id입니다"})
+            return
+        if len(self.turns) >= self.max_turns:
+            await self.send({"t": "x", "id": turn_id, "e": "동시 진행 턴이 너무 많습니다", "retry": 1})
+            return
+
+        try:
+            chat_request = ChatRequest(
+                project_id=frame.get("p"),
+                message=frame.get("m"),
+                conversation_history=frame.get("h") or [],
+                latency_critical=frame.get("lc")
+            )
+        except ValidationError:
+            await self.send({"t": "x", "id": turn_id, "e": "p(프로젝트)와 m(메시지)이 필요합니다"})
+            return
+
+        # 대화 중인 프로젝트는 자동 구독 (다른 기기의 메시지 푸시)
+        self._subscribe(chat_request.project_id)
+        _ws_stats["turns"] += 1
+        self.turns[turn_id] = asyncio.create_task(self._run_turn(turn_id, chat_request))
+
+    async def _run_turn(self, turn_id: str, chat_request: ChatRequest):
+        """턴 1개 - /stream 과 같은 ChatStream 으로 생성하고 압축 프레임으로 전송"""
+        stream: Optional[ChatStream] = None
+        slot = None
+        db = None
+        try:
+            try:
+                slot = await get_chat_admission().acquire(chat_request.project_id)
+            except AdmissionRejected as e:
+                await self.send({"t": "x", "id": turn_id, "e": f"요청이 많아 잠시 후 다시 시도해주세요 ({e.reason})",
+                                 "retry": e.retry_after})
+                return
+
+            # 턴마다 별도 세션 (동시 진행 턴이 세션을 공유하지 않음)
+            db = SessionLocal()
+            stream = ChatStream(chat_request, db, slot=slot, origin=self)
+            async for event in stream.events():
+                await self.send_event(event, turn_id)
+        except asyncio.CancelledError:
+            # 클라이언트 취소 또는 연결 종료 - 업스트림은 생성기 종료와 함께 닫힘
+            if stream is not None:
+                stream.interrupt()
+            if turn_id in self._cancel_requested:
+                self.push({"t": "e", "id": turn_id, "c": 1})
+        except Exception as e:
+            logger.error(f"WebSocket 턴 오류: {e}")
+            # 클라이언트 턴이 끝나지 않은 채 남지 않도록 오류 프레임으로 종료
+            self.push({"t": "x", "id": turn_id, "e": "응답 생성 중 오류가 발생했습니다"})
+        finally:
+            if stream is not None:
+                await stream.finish()
+            elif slot is not None:
+                # 세션/스트림 생성 전에 실패 - finish() 가 없으므로 슬롯을 직접 반환
+                slot.release()
+            if db is not None:
+                if IS_ASYNC:
+                    await db.close()
+                else:
+                    db.close()
+            self.turns.pop(turn_id, None)
+            self._cancel_requested.discard(turn_id)
+
+    async def close(self):
+        """연결 종료 - 진행 중인 턴 취소, 구독 해제"""
+        get_chat_hub().unsubscribe_all(self)
+        self.subscriptions.clear()
+        turns = list(self.turns.values())
+        for task in turns:
+            task.cancel()
+        if turns:
+            # 턴 정리(부분 응답 저장)는 이 태스크가 취소되어도 끝까지 진행
+            await asyncio.shield(asyncio.gather(*turns, return_exceptions=True))
+
+
+@router.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket):
+    """다중화 채팅 WebSocket 엔드포인트"""
+    await websocket.accept()
+    _ws_stats["active"] += 1
+    _ws_stats["connections"] += 1
+    try:
+        await ChatConnection(websocket).serve()
+    finally:
+        _ws_stats["active"] -= 1
@@ -0,0 +1,131 @@
+"""
+대시보드 API
+- 프로젝트 목록 + 프로젝트별 통계 + 마지막 채팅 미리보기 + 대표(최근) 사진을 한 번에
+- 페이지 크기와 무관하게 쿼리 4번 (목록+통계 조인 / 전체 수 / 최근 채팅 / 최근 사진)
+- 통계는 project_stats (쓰기 시 증분 갱신) - 아카이브 폴더 스캔 없음
+"""
+
+import os
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from app.database import get_read_db, IS_ASYNC
+from app.models.project import Project
+from app.models.project_stats import ProjectStats
+from app.models.image_record import ImageRecord, ChatMessage
+
+router = APIRouter(prefix="/api/v1/dashboard", tags=["dashboard"])
+
+PREVIEW_CHARS = 120
+
+
+@router.get("/")
+async def get_dashboard(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db = Depends(get_read_db)
+):
+    """프로젝트 카드 목록 (최신 프로젝트 순)"""
+    start = time.perf_counter()
+    try:
+        page_query = (
+            select(Project, ProjectStats)
+            .outerjoin(ProjectStats, ProjectStats.project_id == Project.project_id)
+            .order_by(Project.created_at.desc(), Project.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        count_query = select(func.count()).select_from(Project)
+        if IS_ASYNC:
+            rows = (await db.execute(page_query)).all()
+            total = (await db.execute(count_query)).scalar() or 0
+        else:
+            rows = db.execute(page_query).all()
+            total = db.execute(count_query).scalar() or 0
+
+        project_ids = [project.project_id for project, _ in rows]
+        messages, covers = {}, {}
+        if project_ids:
+            # 프로젝트별 가장 최근 채팅 1건 (id 최대값 - 프로젝트 인덱스로 그룹별 조회)
+            latest_message_ids = (
+                select(func.max(ChatMessage.id))
+                .where(ChatMessage.project_id.in_(project_ids))
+                .group_by(ChatMessage.project_id)
+            )
+            message_query = select(
+                ChatMessage.project_id,
+                func.substr(ChatMessage.user_message, 1, PREVIEW_CHARS),
+                func.substr(ChatMessage.ai_response, 1, PREVIEW_CHARS),
+                ChatMessage.created_at
+            ).where(ChatMessage.id.in_(latest_message_ids))
+
+            # 프로젝트별 대표 사진 = 가장 최근 사진
+            latest_image_ids = (
+                select(func.max(ImageRecord.id))
+                .where(ImageRecord.project_id.in_(project_ids))
+                .group_by(ImageRecord.project_id)
+            )
+            cover_query = select(
+                ImageRecord.project_id, ImageRecord.image_id, ImageRecord.storage_path,
+                ImageRecord.space_value, ImageRecord.stage_value, ImageRecord.created_at
+            ).where(ImageRecord.id.in_(latest_image_ids))
+
+            if IS_ASYNC:
+                message_rows = (await db.execute(message_query)).all()
+                cover_rows = (await db.execute(cover_query)).all()
+            else:
+                message_rows = db.execute(message_query).all()
+                cover_rows = db.execute(cover_query).all()
+
+            messages = {
+                row[0]: {"user_message": row[1], "ai_response": row[2], "created_at": row[3]}
+                for row in message_rows
+            }
+            covers = {
+                row.project_id: {
+                    "image_id": row.image_id,
+                    # /archive/{project_id}/{filename} 형태로 변환 (저장 경로가 파일 시스템 경로인 기존 기록 포함)
+                    "image_url": f"/archive/{row.project_id}/{os.path.basename(row.storage_path)}"
+                    if row.storage_path else None,
+                    "space": row.space_value,
+                    "stage": row.stage_value,
+                    "created_at": row.created_at
+                }
+                for row in cover_rows
+            }
+
+        projects = []
+        for project, stats in rows:
+            projects.append({
+                "project_id": project.project_id,
+                "name": project.name,
+                "description": project.description,
+                "current_stage": project.current_stage,
+                "created_at": project.created_at,
+                "statistics": {
+                    "total_images": stats.image_count if stats else 0,
+                    "images_by_space": (stats.images_by_space if stats else None) or {},
+                    "images_by_stage": (stats.images_by_stage if stats else None) or {},
+                    "total_messages": stats.message_count if stats else 0,
+                    "bytes_stored": stats.bytes_stored if stats else 0,
+                    "last_activity_at": stats.last_activity_at if stats else None
+                },
+                "last_message": messages.get(project.project_id),
+                "cover": covers.get(project.project_id)
+            })
+
+        return {
+            "success": True,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "has_more": page * page_size < total,
+            "projects": projects,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    except Exception as e:
+        print(f"Dashboard error: {e}")
+        raise HTTPException(status_code=500, detail=f"대시보드 조회 실패: {str(e)}")
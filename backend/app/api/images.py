@@ -4,16 +4,23 @@
 - 통합 서비스 사용
 """
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query
 from sqlalchemy.orm import Session
 from sqlalchemy.future import select
 from typing import Optional, Dict, Any
 import uuid
 import io
+import time
 
-from app.database import get_db, IS_ASYNC
+from app.database import get_db, get_read_db, IS_ASYNC
 from app.models.project import Project
+from app.models.image_record import ImageRecord
 from app.services.archive_service import archive_service
+from app.services.vector_index import get_image_vectors
+from app.services.metrics import image_stage
+from app.services.timing import span
+from app.middleware.conditional import conditional_get
+from app.services.resource_versions import touch
 from app.utils.file_validation import validate_upload_file
 
 router = APIRouter(prefix="/api/v2/images", tags=["images-v2"])
@@ -27,6 +34,7 @@ async def analyze_and_save_image(
     db = Depends(get_db)
 ):
     """이미지 분석 + 아카이브 저장을 한 번에 처리"""
+    started_at = time.perf_counter()
     try:
         # 프로젝트 존재 확인
         if IS_ASYNC:
@@ -52,7 +60,8 @@ async def analyze_and_save_image(
             )
         
         # 이미지 파일 읽기
-        image_data = await image_file.read()
+        with span("upload_read", image_stage):
+            image_data = await image_file.read()
         
         # 이미지 분석은 임시로 비활성화 (Gemini 제거)
         # TODO: GPT-4 Vision API로 교체 필요
@@ -60,15 +69,16 @@ async def analyze_and_save_image(
         confidence = 0.5
         description = caption if caption else "이미지 업로드"
         
-        # 아카이브에 저장
-        save_result = await archive_service.save_image(
-            project_id=project_id,
-            image_file=image_data,
-            space=space,
-            stage=stage,  # 사용자가 선택한 단계 사용
-            description=description,
-            confidence=confidence
-        )
+        # 아카이브에 저장 (디코드/리사이즈/인코딩 단계는 서비스에서 따로 기록)
+        with span("archive", image_stage):
+            save_result = await archive_service.save_image(
+                project_id=project_id,
+                image_file=image_data,
+                space=space,
+                stage=stage,  # 사용자가 선택한 단계 사용
+                description=description,
+                confidence=confidence
+            )
         
         if not save_result.get("success", False):
             raise HTTPException(
@@ -76,6 +86,37 @@ async def analyze_and_save_image(
                 detail=f"이미지 저장 실패: {save_result.get('error', 'Unknown error')}"
             )
         
+        # DB에 이미지 기록 저장 (검색 색인/프로젝트 통계는 저장 시 자동 갱신)
+        image_record = ImageRecord(
+            image_id=save_result.get("image_id"),
+            project_id=project_id,
+            space_value=space,
+            space_confidence=confidence,
+            stage_value=stage,
+            description_ko=description,
+            keywords_json=[],
+            confidence=confidence,
+            storage_path=save_result.get("archive_url"),
+            original_filename=image_file.filename,
+            caption=caption or None
+        )
+        image_record.file_size = save_result.get("file_size")
+        db.add(image_record)
+        with span("db_commit", image_stage):
+            if IS_ASYNC:
+                await db.commit()
+            else:
+                db.commit()
+        
+        # 의미 검색용 벡터 색인 (실패해도 업로드는 성공 처리)
+        try:
+            with span("vector_index", image_stage):
+                await get_image_vectors().index_record(image_record)
+        except Exception as e:
+            print(f"Vector index error: {e}")
+        
+        image_stage.labels("total").observe(time.perf_counter() - started_at)
+        
         # 통합 응답
         return {
             "success": True,
@@ -103,12 +144,62 @@ async def analyze_and_save_image(
             detail=f"이미지 처리 중 오류가 발생했습니다: {str(e)}"
         )
 
-@router.get("/archive/{project_id}")
+@router.get("/semantic-search")
+async def semantic_search_images(
+    q: str = Query(..., min_length=1, max_length=200, description="검색 문장"),
+    project_id: Optional[str] = Query(None, description="프로젝트 필터"),
+    space: Optional[str] = Query(None, description="공간 필터"),
+    stage: Optional[str] = Query(None, description="단계 필터"),
+    top_k: int = Query(10, ge=1, le=50),
+    db = Depends(get_read_db)
+):
+    """현장 사진 의미 검색 (설명/추론 근거/키워드 임베딩 유사도)"""
+    try:
+        matches = await get_image_vectors().search(
+            q, top_k=top_k, project_id=project_id, space=space, stage=stage
+        )
+        
+        records = {}
+        if matches:
+            query = select(ImageRecord).where(ImageRecord.image_id.in_([image_id for image_id, _ in matches]))
+            result = (await db.execute(query)) if IS_ASYNC else db.execute(query)
+            records = {r.image_id: r for r in result.scalars().all()}
+        
+        results = [
+            {
+                "image_id": image_id,
+                "score": round(score, 4),
+                "project_id": records[image_id].project_id,
+                "space": records[image_id].space_value,
+                "stage": records[image_id].stage_value,
+                "description": records[image_id].description_ko,
+                "keywords": records[image_id].keywords_json or [],
+                "image_url": records[image_id].storage_path,
+                "created_at": records[image_id].created_at
+            }
+            for image_id, score in matches
+            if image_id in records and score > 0
+        ]
+        
+        return {
+            "success": True,
+            "query": q,
+            "filters": {"project_id": project_id, "space": space, "stage": stage},
+            "results": results
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"사진 검색 중 오류가 발생했습니다: {str(e)}"
+        )
+
+@router.get("/archive/{project_id}", dependencies=[Depends(conditional_get("archive", "images"))])
 async def get_project_archive(
     project_id: str,
     space: Optional[str] = None,
     stage: Optional[str] = None,
-    db = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     """프로젝트 아카이브 조회"""
     try:
@@ -128,11 +219,12 @@ async def get_project_archive(
             )
         
         # 아카이브 조회
-        archive_result = await archive_service.get_project_archive(
-            project_id=project_id,
-            space=space,
-            stage=stage
-        )
+        with span("archive_list"):
+            archive_result = await archive_service.get_project_archive(
+                project_id=project_id,
+                space=space,
+                stage=stage
+            )
         
         return archive_result
         
@@ -179,6 +271,31 @@ async def delete_archived_image(
                 detail=delete_result.get("message", "파일을 찾을 수 없습니다.")
             )
         
+        # DB 이미지 기록 삭제 (검색 색인/프로젝트 통계도 함께 갱신)
+        archive_url = f"/archive/{project_id}/{filename}"
+        query = select(ImageRecord).where(ImageRecord.storage_path == archive_url)
+        if IS_ASYNC:
+            record = (await db.execute(query)).scalar_one_or_none()
+            if record:
+                record.file_size = delete_result.get("file_size")
+                await db.delete(record)
+                await db.commit()
+        else:
+            record = db.execute(query).scalar_one_or_none()
+            if record:
+                record.file_size = delete_result.get("file_size")
+                db.delete(record)
+                db.commit()
+        if record:
+            get_image_vectors().remove(record.image_id)
+        else:
+            # DB 기록 없는 파일 - 이벤트가 없으므로 아카이브 버전 직접 갱신
+            await touch(db, project_id, "images")
+            if IS_ASYNC:
+                await db.commit()
+            else:
+                db.commit()
+        
         return delete_result
         
     except HTTPException:
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from sqlalchemy.future import select
 from typing import List, Optional
@@ -6,11 +8,16 @@ import uuid
 from datetime import datetime
 import json
 
-from app.database import get_db, IS_ASYNC
+from app.database import get_db, get_read_db, IS_ASYNC
 from app.models.project import Project
+from app.models.project_stats import ProjectStats
+from app.services import project_stats  # noqa: F401  (통계 증분 갱신 이벤트 등록)
 from app.schemas.chat import ProjectCreate, ProjectResponse
 from app.services.archive_service import ArchiveService
-from app.middleware.cache import cache
+from app.middleware.cache import cache, cached
+from app.middleware.conditional import conditional_get, make_etag
+from app.services.resource_versions import get_versions, get_list_version, KINDS
+from app.services.export_service import build_project_export, parse_range, RangeNotSatisfiable
 
 router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
 
@@ -37,6 +44,7 @@ async def create_project(
         else:
             db.commit()
             db.refresh(new_project)
+        cache.invalidate_tag("projects")
         
 # 스토리지는 필요시에만 생성하도록 단순화
         
@@ -55,10 +63,11 @@ async def create_project(
         print(f"Project creation error: {e}")
         raise HTTPException(status_code=500, detail=f"프로젝트 생성 실패: {str(e)}")
 
-@router.get("/{project_id}", response_model=ProjectResponse)
+@router.get("/{project_id}", response_model=ProjectResponse,
+            dependencies=[Depends(conditional_get("project"))])
 async def get_project(
     project_id: str,
-    db = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     try:
         if IS_ASYNC:
@@ -86,18 +95,13 @@ async def get_project(
         raise HTTPException(status_code=500, detail=f"프로젝트 조회 실패: {str(e)}")
 
 @router.get("/", response_model=List[ProjectResponse])
+@cached("projects", ttl_seconds=30, tags=("projects",), key_params=("skip", "limit"),
+        version=lambda params: get_list_version(params["db"]))
 async def list_projects(
     skip: int = 0,
     limit: int = 50,
-    db = Depends(get_db)
+    db = Depends(get_read_db)
 ):
-    # Check cache first
-    cache_key = cache.make_key("projects", {"skip": skip, "limit": limit})
-    cached_result = cache.get(cache_key)
-    
-    if cached_result is not None:
-        return cached_result
-    
     try:
         if IS_ASYNC:
             result = await db.execute(
@@ -122,9 +126,6 @@ async def list_projects(
             for project in projects
         ]
         
-        # Cache the result for 30 seconds
-        cache.set(cache_key, response, ttl_seconds=30)
-        
         return response
         
     except Exception as e:
@@ -156,6 +157,7 @@ async def delete_project(
         else:
             db.delete(project)
             db.commit()
+        cache.invalidate_tag("projects")
         
         # 스토리지에서 폴더 삭제는 추후 구현 (안전을 위해 수동 삭제 권장)
         
@@ -174,24 +176,22 @@ async def delete_project(
 @router.get("/{project_id}/summary")
 async def get_project_summary(
     project_id: str,
-    db = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     try:
-        # 프로젝트 존재 확인
-        if IS_ASYNC:
-            result = await db.execute(
-                select(Project).where(Project.project_id == project_id)
-            )
-            project = result.scalar_one_or_none()
-        else:
-            project = db.query(Project).filter(Project.project_id == project_id).first()
+        # 프로젝트 + 통계 한 행 조회 (통계는 쓰기 시 증분 갱신된 project_stats)
+        query = (
+            select(Project, ProjectStats)
+            .outerjoin(ProjectStats, ProjectStats.project_id == Project.project_id)
+            .where(Project.project_id == project_id)
+        )
+        row = (await db.execute(query)).first() if IS_ASYNC else db.execute(query).first()
         
-        if not project:
+        if not row:
             raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
+        project, stats = row
         
-        # 메타데이터는 데이터베이스에서 직접 조회하도록 단순화
-        metadata = {"images": [], "total_images": 0, "images_by_type": {}}
-        
+        images_by_space = (stats.images_by_space if stats else None) or {}
         return {
             "project_info": {
                 "project_id": project.project_id,
@@ -200,9 +200,13 @@ async def get_project_summary(
                 "created_at": project.created_at
             },
             "statistics": {
-                "total_images": metadata.get("total_images", 0),
-                "images_by_type": metadata.get("images_by_type", {}),
-                "last_updated": metadata.get("updated_at")
+                "total_images": stats.image_count if stats else 0,
+                "images_by_type": images_by_space,  # 레거시 키 (공간별)
+                "images_by_space": images_by_space,
+                "images_by_stage": (stats.images_by_stage if stats else None) or {},
+                "total_messages": stats.message_count if stats else 0,
+                "bytes_stored": stats.bytes_stored if stats else 0,
+                "last_updated": stats.last_activity_at if stats else None
             }
         }
         
@@ -212,12 +216,12 @@ async def get_project_summary(
         print(f"Project summary error: {e}")
         raise HTTPException(status_code=500, detail=f"프로젝트 요약 조회 실패: {str(e)}")
 
-@router.get("/{project_id}/archive")
+@router.get("/{project_id}/archive", dependencies=[Depends(conditional_get("archive", "images"))])
 async def get_project_archive(
     project_id: str,
     space: Optional[str] = Query(None, description="공간 필터"),
     stage: Optional[str] = Query(None, description="단계 필터"),
-    db = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     try:
         # 프로젝트 존재 확인
@@ -267,4 +271,51 @@ async def get_project_archive(
         raise
     except Exception as e:
         print(f"Archive retrieval error: {e}")
-        raise HTTPException(status_code=500, detail=f"아카이브 조회 실패: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"아카이브 조회 실패: {str(e)}")
+@router.get("/{project_id}/export")
+async def export_project(
+    project_id: str,
+    request: Request,
+    db = Depends(get_read_db)
+):
+    """인수인계 패키지 zip (채팅 JSONL + 사진 원본) - 스트리밍, Range/If-Range 로 이어받기"""
+    try:
+        # 버전을 먼저 읽음 - 같은 버전이면 zip 바이트가 같으므로 강한 ETag (If-Range 검증용)
+        versions = await get_versions(db, project_id, KINDS)
+        export = await build_project_export(db, project_id, versions) if len(versions) == len(KINDS) else None
+        if export is None:
+            raise HTTPException(status_code=404, detail="프로젝트를 찾을 수 없습니다")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Project export error: {e}")
+        raise HTTPException(status_code=500, detail=f"프로젝트 내보내기 실패: {str(e)}")
+    
+    etag = make_etag("export", tuple(versions[kind] for kind in KINDS))[2:]
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="tevor_{project_id}.zip"'
+    }
+    
+    # If-Range 가 없거나 현재 ETag 와 같을 때만 부분 전송 (그 사이 바뀌었으면 처음부터)
+    byte_range = None
+    if request.headers.get("if-range") in (None, etag):
+        try:
+            byte_range = parse_range(request.headers.get("range"), export.total_size)
+        except RangeNotSatisfiable:
+            export.close()
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{export.total_size}"})
+    
+    start, end = byte_range or (0, export.total_size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{export.total_size}"
+    return StreamingResponse(
+        export.iter_bytes(start, end),
+        status_code=206 if byte_range else 200,
+        media_type="application/zip",
+        headers=headers,
+        background=BackgroundTask(export.close)
+    )
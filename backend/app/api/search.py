@@ -0,0 +1,109 @@
+"""
+전문 검색 API
+- 지난 채팅과 현장 사진 설명을 한국어 부분 일치로 검색
+- 관련도 순 정렬 + 페이지네이션
+"""
+
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.future import select
+from typing import Optional
+
+from app.database import get_read_db, IS_ASYNC
+from app.models.image_record import ImageRecord, ChatMessage
+from app.services.search_service import build_match_query, build_search_sql, make_snippet
+
+router = APIRouter(prefix="/api/v2/search", tags=["search"])
+
+DIALECT = "sqlite" if IS_ASYNC else "postgresql"
+
+
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="검색어"),
+    project_id: Optional[str] = Query(None, description="프로젝트 필터"),
+    type: Optional[str] = Query(None, pattern="^(chat|image)$", description="chat / image"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db = Depends(get_read_db)
+):
+    """채팅 메시지 / 이미지 설명 전문 검색"""
+    start = time.perf_counter()
+    match = build_match_query(q, DIALECT)
+    if not match:
+        raise HTTPException(status_code=400, detail="검색어에 검색 가능한 문자가 없습니다")
+
+    try:
+        search_sql, count_sql, params = build_search_sql(
+            match, DIALECT,
+            project_id=project_id,
+            doc_type=type,
+            limit=page_size,
+            offset=(page - 1) * page_size
+        )
+
+        if IS_ASYNC:
+            rows = (await db.execute(search_sql, params)).all()
+            total = (await db.execute(count_sql, params)).scalar() or 0
+        else:
+            rows = db.execute(search_sql, params).all()
+            total = db.execute(count_sql, params).scalar() or 0
+
+        # 원본 행 조회 (유형별 한 번씩)
+        chat_keys = [row.doc_key for row in rows if row.doc_type == "chat"]
+        image_keys = [row.doc_key for row in rows if row.doc_type == "image"]
+        messages, images = {}, {}
+
+        if chat_keys:
+            query = select(ChatMessage).where(ChatMessage.message_id.in_(chat_keys))
+            result = (await db.execute(query)) if IS_ASYNC else db.execute(query)
+            messages = {m.message_id: m for m in result.scalars().all()}
+        if image_keys:
+            query = select(ImageRecord).where(ImageRecord.image_id.in_(image_keys))
+            result = (await db.execute(query)) if IS_ASYNC else db.execute(query)
+            images = {i.image_id: i for i in result.scalars().all()}
+
+        results = []
+        for row in rows:
+            if row.doc_type == "chat" and row.doc_key in messages:
+                message = messages[row.doc_key]
+                results.append({
+                    "type": "chat",
+                    "id": message.message_id,
+                    "project_id": message.project_id,
+                    "score": round(float(row.score), 4),
+                    "user_message": make_snippet(message.user_message, q),
+                    "snippet": make_snippet(message.ai_response, q),
+                    "created_at": message.created_at
+                })
+            elif row.doc_type == "image" and row.doc_key in images:
+                image = images[row.doc_key]
+                results.append({
+                    "type": "image",
+                    "id": image.image_id,
+                    "project_id": image.project_id,
+                    "score": round(float(row.score), 4),
+                    "snippet": make_snippet(image.description_ko, q),
+                    "keywords": image.keywords_json or [],
+                    "space": image.space_value,
+                    "stage": image.stage_value,
+                    "image_url": image.storage_path,
+                    "created_at": image.created_at
+                })
+
+        return {
+            "success": True,
+            "query": q,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "has_more": page * page_size < total,
+            "results": results,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Search error: {e}")
+        raise HTTPException(status_code=500, detail=f"검색 실패: {str(e)}")
@@ -1,9 +1,18 @@
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Optional
+
+from app.services.metrics import get_metrics, record_pool_checkout
+from app.services.timing import record
+from app.middleware.read_routing import prefers_primary, get_read_router, record_commit
 
 # Get database URL from environment variable
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///db/tevor.db")
@@ -12,20 +21,290 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///db/tevor.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# 읽기 전용 복제본 (PostgreSQL) - 없으면 읽기도 기본 DB
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+if DATABASE_READ_URL and DATABASE_READ_URL.startswith("postgres://"):
+    DATABASE_READ_URL = DATABASE_READ_URL.replace("postgres://", "postgresql://", 1)
+
 # Determine if we're using async (SQLite) or sync (PostgreSQL)
 IS_ASYNC = not DATABASE_URL.startswith("postgresql://")
 
+# SQL 로그 (모든 쿼리 출력 - 디버깅용)
+SQL_ECHO = os.getenv("SQL_ECHO", "0") == "1"
+
+# SQLite 프로파일: production = WAL/pragma + 읽기 전용 풀 + 쓰기 직렬화, basic = 기본 설정 그대로
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+SQLITE_READ_POOL = int(os.getenv("SQLITE_READ_POOL", "4"))
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),                                         # 읽기가 쓰기를 막지 않음
+    ("synchronous", "NORMAL"),                                       # WAL 에서는 커밋마다 fsync 불필요
+    ("mmap_size", os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    ("busy_timeout", os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),   # 다른 워커 프로세스의 쓰기 대기
+    ("cache_size", os.getenv("SQLITE_CACHE_SIZE", "-32000")),        # 음수 = KiB (32MB)
+    ("temp_store", "MEMORY"),
+)
+
 Base = declarative_base()
 
+
+class _TimedPoolMixin:
+    """풀 체크아웃 횟수와 대기 시간 기록 (풀이 가득 차면 connect() 에서 대기)"""
+    metrics_name = "primary"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            wait = time.perf_counter() - start
+            record_pool_checkout(self.metrics_name, wait)
+            record("db_pool", wait)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedReadQueuePool(TimedQueuePool):
+    metrics_name = "read"
+
+
+class TimedReadAsyncQueuePool(TimedAsyncQueuePool):
+    metrics_name = "read"
+
+
+class _WriteUnit:
+    __slots__ = ("unit", "future", "enqueued_at", "started", "context")
+
+    def __init__(self, unit: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        self.unit = unit
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+        self.started = False
+        # 요청 쪽 컨텍스트 (read-your-writes 클라이언트, 타이밍 구간) 를 writer 태스크에서도 유지
+        self.context = contextvars.copy_context()
+
+
+class SerializedWriter:
+    """프로세스 안의 SQLite 쓰기를 전용 writer 코루틴 하나가 순서대로 실행 (FIFO)
+
+    SQLite 는 쓰기 잠금이 DB 전체에 하나라 동시에 쓰면 busy_timeout 폴링으로 서로 기다림.
+    쓰기 단위(flush + COMMIT 까지 끝나는 클로저)를 큐에 넣으면 writer 태스크가 하나씩 실행하고 future 로 결과 전달
+    → 이 워커 안에서는 쓰기 잠금 경합 없음 (다른 워커 프로세스와의 경합은 busy_timeout 이 처리)
+    커밋 전에 flush/DML 을 실행하는 세션은 트랜잭션이 끝날 때까지 writer 를 점유 (reserve)
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop = None
+        self._owner: Optional[asyncio.Task] = None
+        self.units = 0
+        self.failed = 0
+        self.reservations = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_unit = 0.0
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    def _owns_writer(self) -> bool:
+        """writer 태스크 자신이거나 writer 를 점유한 태스크 - 큐에 넣으면 자기 자신을 기다리게 됨"""
+        task = asyncio.current_task()
+        return task is not None and (task is self._task or task is self._owner)
+
+    async def _run(self):
+        while True:
+            entry: _WriteUnit = await self._queue.get()
+            future = entry.future
+            if future.cancelled():
+                continue
+            started = time.perf_counter()
+            wait = started - entry.enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            record("db_write_wait", wait)
+            entry.started = True
+            try:
+                result = await entry.context.run(asyncio.ensure_future, entry.unit())
+            except Exception as e:
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.units += 1
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.max_unit = max(self.max_unit, time.perf_counter() - started)
+
+    async def run(self, unit: Callable[[], Awaitable[Any]]) -> Any:
+        """쓰기 단위를 writer 태스크에서 실행하고 결과 반환"""
+        if self._owns_writer():
+            return await unit()
+        self._ensure_started()
+        entry = _WriteUnit(unit, self._loop.create_future())
+        future = entry.future
+        self._queue.put_nowait(entry)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if entry.started:
+                # 실행 중인 단위(커밋)는 끝까지 기다림 - 호출한 쪽이 같은 세션을 바로 닫지 않도록
+                await asyncio.wait({future})
+            else:
+                future.cancel()
+            raise
+
+    async def reserve(self) -> Optional[asyncio.Event]:
+        """트랜잭션이 끝날 때까지 writer 점유 (release 로 해제) - 이미 점유 중인 태스크면 None"""
+        if self._owns_writer():
+            return None
+        released = asyncio.Event()
+        granted = asyncio.get_running_loop().create_future()
+
+        async def hold():
+            if not granted.done():
+                granted.set_result(None)
+                await released.wait()
+
+        self.reservations += 1
+        released.holder = asyncio.ensure_future(self.run(hold))
+        try:
+            await asyncio.shield(granted)
+        except asyncio.CancelledError:
+            granted.cancel()
+            released.set()
+            raise
+        self._owner = asyncio.current_task()
+        return released
+
+    def release(self, reservation: asyncio.Event):
+        if self._owner is not None and not reservation.is_set():
+            self._owner = None
+        reservation.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> dict:
+        return {
+            "units": self.units,
+            "failed": self.failed,
+            "reservations": self.reservations,
+            "waiting": self._queue.qsize() if self._queue is not None else 0,
+            "avg_wait_ms": round(self.total_wait / (self.units + self.failed) * 1000, 3) if self.units + self.failed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "max_unit_ms": round(self.max_unit * 1000, 3)
+        }
+
+
+sqlite_writer = SerializedWriter()
+
+_WRITE_VERBS = {"insert", "update", "delete", "replace", "create", "drop", "alter"}
+
+
+def _is_write(statement) -> bool:
+    """ORM/Core DML 또는 text() 로 쓴 INSERT/UPDATE/DELETE 등"""
+    if getattr(statement, "is_dml", False):
+        return True
+    if isinstance(statement, TextClause):
+        words = statement.text.split(None, 1)
+        return bool(words) and words[0].lower() in _WRITE_VERBS
+    return False
+
+
+class SerializedAsyncSession(AsyncSession):
+    """쓰기를 SerializedWriter 를 거쳐 실행하는 세션 (autoflush=False 로 생성)
+
+    - 커밋 = flush + COMMIT 한 단위로 writer 태스크에서 실행 (보류 중인 변경이 없으면 그냥 커밋)
+    - 커밋 전에 flush/DML(text() 포함) 을 실행하면 그 트랜잭션이 끝날 때까지 writer 점유
+      → 그 사이 LLM/파일 IO 같은 느린 작업을 기다리면 다른 쓰기도 기다림 (쓰기 직후 바로 커밋할 것)
+    """
+
+    _reservation: Optional[asyncio.Event] = None
+    _reserved = False
+
+    async def _reserve(self):
+        if not self._reserved:
+            self._reservation = await sqlite_writer.reserve()
+            self._reserved = True
+
+    def _release(self):
+        if self._reservation is not None:
+            sqlite_writer.release(self._reservation)
+        self._reservation = None
+        self._reserved = False
+
+    async def execute(self, statement, *args, **kwargs):
+        if _is_write(statement):
+            await self._reserve()
+        return await super().execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        if _is_write(statement):
+            await self._reserve()
+        return await super().scalar(statement, *args, **kwargs)
+
+    async def flush(self, objects=None):
+        await self._reserve()
+        await super().flush(objects)
+
+    async def commit(self):
+        if self._reserved:
+            try:
+                await super().commit()
+            finally:
+                self._release()
+        elif self.new or self.dirty or self.deleted:
+            await sqlite_writer.run(lambda: AsyncSession.commit(self))
+        else:
+            await super().commit()
+
+    async def rollback(self):
+        try:
+            await super().rollback()
+        finally:
+            self._release()
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            self._release()
+
+
+def _apply_pragmas(sync_engine, pragmas):
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
 if IS_ASYNC:
     # For SQLite, use async operations
     ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
-    engine = create_async_engine(ASYNC_DATABASE_URL, echo=True)
+    SQLITE_PRODUCTION = SQLITE_PROFILE == "production"
+    engine = create_async_engine(ASYNC_DATABASE_URL, echo=SQL_ECHO, poolclass=TimedAsyncQueuePool)
     
     SessionLocal = sessionmaker(
         engine, 
-        class_=AsyncSession,
-        expire_on_commit=False
+        class_=SerializedAsyncSession if SQLITE_PRODUCTION else AsyncSession,
+        expire_on_commit=False,
+        autoflush=not SQLITE_PRODUCTION   # 쓰기는 커밋 단위로만 (PostgreSQL 세션과 같은 autoflush=False)
     )
     
     async def get_db():
@@ -35,6 +314,27 @@ if IS_ASYNC:
             finally:
                 await db.close()
     
+    if SQLITE_PRODUCTION:
+        _apply_pragmas(engine.sync_engine, SQLITE_PRAGMAS)
+
+        # GET 엔드포인트 전용 읽기 풀 (query_only - 실수로 쓰면 에러, WAL 이라 쓰기와 병행)
+        read_engine = create_async_engine(
+            ASYNC_DATABASE_URL, echo=SQL_ECHO, poolclass=TimedReadAsyncQueuePool,
+            pool_size=SQLITE_READ_POOL, max_overflow=SQLITE_READ_POOL
+        )
+        _apply_pragmas(read_engine.sync_engine, SQLITE_PRAGMAS + (("query_only", "ON"),))
+        ReadSessionLocal = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    else:
+        read_engine = engine
+        ReadSessionLocal = SessionLocal
+
+    async def get_read_db():
+        async with _read_session_factory()() as db:
+            try:
+                yield db
+            finally:
+                await db.close()
+    
     async def init_db():
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
@@ -46,6 +346,7 @@ else:
     engine = create_engine(
         DATABASE_URL, 
         echo=False,
+        poolclass=TimedQueuePool,
         pool_size=3,  # Reduced for Render's connection limits
         max_overflow=5,  # Reduced overflow
         pool_pre_ping=True,  # Verify connections
@@ -71,6 +372,82 @@ else:
         finally:
             db.close()
     
+    if DATABASE_READ_URL:
+        # 읽기 전용 복제본 - 기본 DB 풀과 따로 (쓰기 트래픽과 연결을 나눠 쓰지 않음)
+        read_engine = create_engine(
+            DATABASE_READ_URL,
+            echo=False,
+            poolclass=TimedReadQueuePool,
+            pool_size=3,
+            max_overflow=5,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            connect_args={
+                "connect_timeout": 10,
+                "options": "-c statement_timeout=30000"
+            }
+        )
+        ReadSessionLocal = sessionmaker(
+            read_engine,
+            class_=Session,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False
+        )
+    else:
+        read_engine = engine
+        ReadSessionLocal = SessionLocal
+
+    def get_read_db():
+        db = _read_session_factory()()
+        try:
+            yield db
+        finally:
+            db.close()
+    
     async def init_db():
         # Run synchronously for PostgreSQL
-        Base.metadata.create_all(bind=engine)
\ No newline at end of file
+        Base.metadata.create_all(bind=engine)
+
+
+def _read_session_factory():
+    """읽기 전용 의존성의 세션 (읽기 엔진이 없거나 쓰기 직후 클라이언트면 기본 DB)"""
+    if ReadSessionLocal is SessionLocal or prefers_primary():
+        get_read_router().record_read("primary")
+        return SessionLocal
+    get_read_router().record_read("read")
+    return ReadSessionLocal
+
+
+def _instrument_queries(sync_engine):
+    """쿼리 실행 시간을 현재 요청의 db 구간에 기록"""
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started_at")
+        if started:
+            record("db", time.perf_counter() - started.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started_at"):
+            conn.info["query_started_at"].pop()
+
+
+_instrument_queries(engine.sync_engine if IS_ASYNC else engine)
+
+
+@event.listens_for(engine.sync_engine if IS_ASYNC else engine, "commit")
+def _pin_after_commit(conn):
+    """기본 DB 커밋마다 read-your-writes 고정 시각 갱신 (ORM/Core 쓰기 모두)"""
+    record_commit()
+
+
+get_metrics().track_pool("primary", engine)
+if read_engine is not engine:
+    _instrument_queries(read_engine.sync_engine if IS_ASYNC else read_engine)
+    get_metrics().track_pool("read", read_engine)
@@ -1,14 +1,29 @@
 import os
 import time
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
-from app.database import init_db
-from app.api import projects, chat, images, chat_stream
-from app.startup import startup_event
+from app.api import projects, chat, images, chat_stream, chat_ws, search, dashboard
+from app.startup import startup_event, shutdown_event, check_ready
+from app.services.llm_router import get_llm_router
+from app.services.resilience import get_breaker_stats
+from app.middleware.admission import get_chat_admission
+from app.services.intent_engine import get_intent_engine
+from app.services.knowledge_service import get_knowledge_service
+from app.services.vector_index import get_image_vectors
+from app.services.prompt_engine import get_prompt_engine
+from app.services.stream_coalescer import get_stream_coalescer
+from app.services.metrics import get_metrics
+from app.services.project_stats import get_stats_checker
+from app.database import sqlite_writer
+from app.middleware.timing import TimingMiddleware
+from app.middleware.read_routing import ReadRoutingMiddleware, get_read_router
+from app.middleware.conditional import get_conditional_stats
+from app.services.export_service import get_export_stats
 # GPT Service 제거됨 - Gemini로 통합
 
 # 환경변수 로드
@@ -18,14 +33,9 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     # 서버 시작시: 데이터베이스 초기화 및 최적화
     print("🚀 TEVOR Backend 시작 중...")
-    print("📊 데이터베이스 초기화...")
-    await init_db()
-    print("✅ 데이터베이스 초기화 완료")
-    
-    # 스타트업 최적화 실행
-    print("🔧 연결 풀 최적화 중...")
+    # 테이블 생성만 기다리고 연결 풀/서비스 예열은 포트를 연 뒤 백그라운드에서 (/ready 로 완료 확인)
     await startup_event()
-    print("✅ 연결 풀 최적화 완료")
+    print("✅ 데이터베이스 초기화 완료 (예열은 백그라운드 진행)")
     
     # 필수 환경변수 확인 (OpenAI API만 사용)
     openai_key = os.getenv("OPENAI_API_KEY")
@@ -53,10 +63,15 @@ async def lifespan(app: FastAPI):
     print("🌐 서버 주소: http://localhost:8000")
     print("📖 API 문서: http://localhost:8000/docs")
     
+    # 워커별 메트릭 스냅샷 기록 시작 (/metrics 에서 모든 워커 합산)
+    get_metrics().start()
+    
     yield
     
     # 서버 종료시
     print("🛑 TEVOR Backend 종료 중...")
+    await shutdown_event()
+    await get_metrics().stop()
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -75,6 +90,12 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 헤더 허용
 )
 
+# 읽기 전용 요청은 읽기 엔진으로, 쓰기 직후 클라이언트는 잠시 기본 DB 로 (read-your-writes)
+app.add_middleware(ReadRoutingMiddleware)
+
+# 요청 구간 타이밍 (Server-Timing 헤더 + 샘플링 로그) - 가장 바깥에서 전체 시간 측정
+app.add_middleware(TimingMiddleware)
+
 # 정적 파일 서빙 설정 (아카이브 이미지)
 archive_path = "archive"
 if os.path.exists(archive_path):
@@ -94,7 +115,10 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(projects.router)
 app.include_router(chat.router)
 app.include_router(chat_stream.router)  # 스트리밍 채팅 라우터 추가
+app.include_router(chat_ws.router)  # WebSocket 채팅 (/ws/chat)
 app.include_router(images.router)
+app.include_router(search.router)  # 채팅/사진 전문 검색
+app.include_router(dashboard.router)  # 프로젝트 카드 목록 (통계/최근 채팅/대표 사진 일괄)
 
 # API 라우터 (리팩토링 완료)
 
@@ -140,6 +164,12 @@ async def health_check():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
+# 준비 상태 (시작 예열 완료 + DB 응답) - 준비 전에는 503
+@app.get("/ready")
+async def readiness():
+    ready, status = await check_ready()
+    return JSONResponse(status, status_code=200 if ready else 503)
+
 # 환경 정보 엔드포인트 (개발용)
 @app.get("/env-info")
 async def env_info():
@@ -160,11 +190,34 @@ async def cache_stats():
     return {
         "service": "TEVOR Cache Statistics",
         "timestamp": time.time(),
-        "gemini_service": "active",
-        "archive_service": "active",
+        "caches": get_metrics().cache_stats(),
+        "db_pool": get_metrics().pool_stats(),
+        "sqlite_writer": sqlite_writer.get_stats(),
+        "read_routing": get_read_router().get_stats(),
+        "project_stats": get_stats_checker().get_stats(),
+        "conditional_get": get_conditional_stats().get_stats(),
+        "export": get_export_stats(),
+        "llm_router": get_llm_router().get_stats(),
+        "circuit_breakers": get_breaker_stats(),
+        "chat_admission": get_chat_admission().get_stats(),
+        "chat_streams": chat_stream.get_stream_stats(),
+        "chat_ws": chat_ws.get_ws_stats(),
+        "stream_coalescer": get_stream_coalescer().get_stats(),
+        "intent_engine": get_intent_engine().get_stats(),
+        "knowledge": get_knowledge_service().get_stats(),
+        "image_vectors": get_image_vectors().get_stats(),
+        "prompts": get_prompt_engine().get_stats(),
         "status": "healthy"
     }
 
+# Prometheus 메트릭 (모든 워커 합산)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        await get_metrics().render_async(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
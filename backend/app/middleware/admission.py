@@ -0,0 +1,245 @@
+"""
+LLM 엔드포인트 동시성 제한 (Admission Control)
+- 전역 + 프로젝트별 동시 실행 슬롯
+- 제한된 크기의 대기열, 프로젝트 간 공정한 FIFO 처리
+- 대기 시간 초과/대기열 포화 시 429 + Retry-After 로 부하 차단
+- 대기열 길이/대기 시간/거절 수는 /cache-stats 와 /metrics (tevor_admission_*)
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+from fastapi import HTTPException
+
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_admission_wait = get_metrics().histogram("tevor_admission_wait_seconds", "Time chat requests waited for a slot")
+
+
+class AdmissionRejected(Exception):
+    """동시성 제한으로 요청 거절"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def to_http_exception(self) -> HTTPException:
+        return HTTPException(
+            status_code=429,
+            detail=f"요청이 많아 잠시 후 다시 시도해주세요 ({self.reason})",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+
+class _Waiter:
+    __slots__ = ("project_id", "future", "enqueued_at")
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.perf_counter()
+
+
+class Slot:
+    """획득한 실행 슬롯 (release는 여러 번 호출해도 안전)"""
+
+    def __init__(self, controller: "AdmissionController", project_id: str):
+        self.controller = controller
+        self.project_id = project_id
+        self.acquired_at = time.perf_counter()
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self.controller._release(self.project_id, time.perf_counter() - self.acquired_at)
+
+
+class AdmissionController:
+    """전역/프로젝트별 동시성 제한기"""
+
+    def __init__(self, max_concurrent: int = 8, max_per_project: int = 2,
+                 max_queue: int = 32, max_wait: float = 10.0):
+        """
+        Args:
+            max_concurrent: 전역 동시 실행 수
+            max_per_project: 프로젝트별 동시 실행 수
+            max_queue: 대기열 최대 길이 (초과 시 즉시 거절)
+            max_wait: 대기열 최대 대기 시간 (초) - 초과 시 거절
+        """
+        self.max_concurrent = max_concurrent
+        self.max_per_project = max_per_project
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self.active = 0
+        self.active_by_project: Dict[str, int] = {}
+        self.queue: deque = deque()
+
+        # 통계
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait = 0.0
+        self.max_observed_wait = 0.0
+        self.ewma_hold_time = 2.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.getenv("CHAT_MAX_CONCURRENT", "8")),
+            max_per_project=int(os.getenv("CHAT_MAX_PER_PROJECT", "2")),
+            max_queue=int(os.getenv("CHAT_MAX_QUEUE", "32")),
+            max_wait=float(os.getenv("CHAT_MAX_QUEUE_WAIT", "10"))
+        )
+
+    def _can_run(self, project_id: str) -> bool:
+        return (
+            self.active < self.max_concurrent
+            and self.active_by_project.get(project_id, 0) < self.max_per_project
+        )
+
+    def _grant(self, project_id: str):
+        self.active += 1
+        self.active_by_project[project_id] = self.active_by_project.get(project_id, 0) + 1
+
+    def _retry_after(self) -> int:
+        """대기열 길이와 평균 점유 시간으로 재시도 시간 추정"""
+        estimate = self.ewma_hold_time * (len(self.queue) + 1) / max(1, self.max_concurrent)
+        return max(1, min(30, math.ceil(estimate)))
+
+    def _record_wait(self, waited: float):
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_observed_wait = max(self.max_observed_wait, waited)
+        _admission_wait.observe(waited)
+
+    async def acquire(self, project_id: str) -> Slot:
+        """슬롯 획득 (대기열 포화/대기 시간 초과 시 AdmissionRejected)"""
+        if not self.queue and self._can_run(project_id):
+            self._grant(project_id)
+            self._record_wait(0.0)
+            return Slot(self, project_id)
+
+        if len(self.queue) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("queue full", self._retry_after())
+
+        waiter = _Waiter(project_id)
+        self.queue.append(waiter)
+        # 다른 프로젝트 슬롯이 비어 있으면 바로 배정될 수 있음
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                self.queue.remove(waiter)
+                self.rejected_timeout += 1
+                raise AdmissionRejected("queue timeout", self._retry_after())
+        except asyncio.CancelledError:
+            # 대기 중 클라이언트가 떠난 경우 - 이미 배정됐다면 반납
+            if waiter.future.done():
+                Slot(self, project_id).release()
+            else:
+                self.queue.remove(waiter)
+            raise
+
+        self._record_wait(time.perf_counter() - waiter.enqueued_at)
+        return Slot(self, project_id)
+
+    def _release(self, project_id: str, held: float):
+        self.active -= 1
+        remaining = self.active_by_project.get(project_id, 1) - 1
+        if remaining:
+            self.active_by_project[project_id] = remaining
+        else:
+            self.active_by_project.pop(project_id, None)
+        self.ewma_hold_time = 0.2 * held + 0.8 * self.ewma_hold_time
+        self._dispatch()
+
+    def _dispatch(self):
+        """대기열 앞에서부터 실행 가능한 요청에 슬롯 배정
+
+        프로젝트 한도에 걸린 요청은 건너뛰어, 한 프로젝트의 몰림이
+        다른 프로젝트 요청을 막지 않도록 한다.
+        """
+        if not self.queue:
+            return
+        for waiter in list(self.queue):
+            if self.active >= self.max_concurrent:
+                break
+            if waiter.future.done() or not self._can_run(waiter.project_id):
+                continue
+            self.queue.remove(waiter)
+            self._grant(waiter.project_id)
+            waiter.future.set_result(True)
+
+    @asynccontextmanager
+    async def slot(self, project_id: str):
+        """async with 로 사용하는 슬롯"""
+        slot = await self.acquire(project_id)
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        oldest_wait = time.perf_counter() - self.queue[0].enqueued_at if self.queue else 0.0
+        return {
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "max_per_project": self.max_per_project,
+            "active_projects": len(self.active_by_project),
+            "queue_depth": len(self.queue),
+            "max_queue": self.max_queue,
+            "oldest_wait_ms": round(oldest_wait * 1000, 1),
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_observed_wait * 1000, 1)
+        }
+
+
+# 싱글톤 인스턴스
+_chat_admission: Optional[AdmissionController] = None
+
+def get_chat_admission() -> AdmissionController:
+    """채팅 엔드포인트용 동시성 제한기"""
+    global _chat_admission
+    if _chat_admission is None:
+        _chat_admission = AdmissionController.from_env()
+    return _chat_admission
+
+
+def _register_admission_metrics():
+    registry = get_metrics()
+    active = registry.gauge("tevor_admission_active", "Chat requests holding a slot")
+    queue_depth = registry.gauge("tevor_admission_queue_depth", "Chat requests waiting for a slot")
+    admitted = registry.counter("tevor_admission_admitted_total", "Chat requests admitted")
+    rejected = registry.counter("tevor_admission_rejected_total", "Chat requests rejected with 429", ["reason"])
+
+    def collect():
+        if _chat_admission is None:
+            return
+        active.set(_chat_admission.active)
+        queue_depth.set(len(_chat_admission.queue))
+        admitted.set(_chat_admission.admitted)
+        rejected.labels("queue_full").set(_chat_admission.rejected_queue_full)
+        rejected.labels("queue_timeout").set(_chat_admission.rejected_timeout)
+
+    registry.add_collector(collect)
+
+
+_register_admission_metrics()
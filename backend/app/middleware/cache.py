@@ -1,40 +1,238 @@
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-import json
-import hashlib
-
-class SimpleCache:
-    """Simple in-memory cache with TTL"""
-    
-    def __init__(self):
-        self.cache: Dict[str, Dict[str, Any]] = {}
-    
+"""
+API 응답 캐시
+- TTL + LRU: 항목 수 상한(API_CACHE_MAX_ENTRIES)을 넘으면 가장 오래 안 쓴 항목부터 제거
+- 만료 항목은 읽힐 때뿐 아니라 주기적 정리로도 제거 → 키가 계속 바뀌어도 메모리 상한 유지
+- 태그 무효화: set(..., tags=("projects",)) 로 묶고 쓰기 후 invalidate_tag("projects")
+- 동시 미스 병합(stampede 방지): get_or_load 는 같은 키의 로더를 한 번만 실행하고 나머지는 결과를 기다림
+- 로딩 중 무효화되면 그 결과는 저장하지 않음 (태그 세대 비교) - 무효화 직전 읽은 목록이 되살아나지 않게
+- @cached 데코레이터: 읽기 엔드포인트 결과 캐싱 (FastAPI 시그니처/의존성 그대로 유지)
+- 프로세스별 캐시: invalidate_tag 는 이 워커에서만 동작 → 워커 간에는 version= 으로 공유 세대(DB 버전 행)를 키에 포함
+"""
+
+import os
+import time
+import asyncio
+import functools
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable, Iterable, Set, Tuple
+
+from app.services.metrics import get_metrics
+
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "512"))
+API_CACHE_DEFAULT_TTL = float(os.getenv("API_CACHE_DEFAULT_TTL", "60"))
+
+# 키에 들어갈 수 있는 값 (엔드포인트 쿼리 파라미터 수준)
+_KEY_TYPES = (str, int, float, bool, type(None))
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "tags")
+
+    def __init__(self, value: Any, expires_at: float, tags: Tuple[str, ...]):
+        self.value = value
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class APICache:
+    """크기 제한 TTL+LRU 캐시 (태그 무효화, 동시 미스 병합)"""
+
+    def __init__(self, max_entries: int = API_CACHE_MAX_ENTRIES, default_ttl: float = API_CACHE_DEFAULT_TTL):
+        self.cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self._tags: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 정리 주기: 항목 수 상한의 1/4 만큼 set 될 때마다 전체 만료 정리 (분할 상환 O(1))
+        self._sweep_every = max(16, self.max_entries // 4)
+        self._sets_since_sweep = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.invalidations = 0
+        self.coalesced = 0
+        self.stale_loads = 0
+
+    # =========================
+    # 기본 연산
+    # =========================
+
     def get(self, key: str) -> Optional[Any]:
-        """Get cached value if not expired"""
-        if key in self.cache:
-            entry = self.cache[key]
-            if datetime.now() < entry['expires_at']:
-                return entry['value']
-            else:
-                del self.cache[key]
+        """만료되지 않은 값 (없으면 None)"""
+        entry = self.cache.get(key)
+        if entry is not None:
+            if time.monotonic() < entry.expires_at:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self._remove(key)
+            self.expired += 1
+        self.misses += 1
         return None
-    
-    def set(self, key: str, value: Any, ttl_seconds: int = 60):
-        """Set value with TTL"""
-        self.cache[key] = {
-            'value': value,
-            'expires_at': datetime.now() + timedelta(seconds=ttl_seconds)
-        }
-    
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None, tags: Iterable[str] = ()):
+        """값 저장 (상한 초과 시 LRU 제거)"""
+        if key in self.cache:
+            self._remove(key)
+        ttl = self.default_ttl if ttl_seconds is None else ttl_seconds
+        entry = _Entry(value, time.monotonic() + ttl, tuple(tags))
+        self.cache[key] = entry
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        self._sets_since_sweep += 1
+        if self._sets_since_sweep >= self._sweep_every:
+            self.sweep()
+        while len(self.cache) > self.max_entries:
+            oldest = next(iter(self.cache))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        if key in self.cache:
+            self._remove(key)
+            return True
+        return False
+
+    def invalidate_tag(self, tag: str) -> int:
+        """태그가 붙은 항목 전부 제거 + 진행 중 로드 결과 폐기. 제거한 항목 수 반환"""
+        self._generations[tag] = self._generations.get(tag, 0) + 1
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            if key in self.cache:
+                self._remove(key)
+        self.invalidations += 1
+        return len(keys)
+
+    def sweep(self) -> int:
+        """만료 항목 일괄 제거"""
+        self._sets_since_sweep = 0
+        now = time.monotonic()
+        expired = [key for key, entry in self.cache.items() if entry.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.expired += len(expired)
+        return len(expired)
+
     def clear(self):
         """Clear all cache"""
         self.cache.clear()
-    
+        self._tags.clear()
+
+    def _remove(self, key: str):
+        entry = self.cache.pop(key)
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    # =========================
+    # 로더 / 데코레이터
+    # =========================
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          ttl_seconds: Optional[float] = None, tags: Iterable[str] = ()) -> Any:
+        """캐시 조회 → 미스면 loader 실행 (같은 키의 동시 미스는 한 번만 실행)"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # 선행 요청이 취소됨 → 직접 로드
+
+        tags = tuple(tags)
+        generations = [self._generations.get(tag, 0) for tag in tags]
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # 기다리는 요청이 없어도 경고 로그가 남지 않게
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        if value is not None:
+            if generations == [self._generations.get(tag, 0) for tag in tags]:
+                self.set(key, value, ttl_seconds, tags)
+            else:
+                self.stale_loads += 1
+        future.set_result(value)
+        return value
+
+    def cached(self, prefix: str, ttl_seconds: Optional[float] = None, tags: Iterable[str] = (),
+               key_params: Optional[Iterable[str]] = None,
+               version: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None):
+        """async 읽기 엔드포인트 캐싱 데코레이터
+
+        키는 prefix + key_params 로 지정한 인자 (생략하면 str/int/float/bool/None 인자 전부).
+        DB 세션 같은 의존성은 키에서 빠짐. 예외(HTTPException 포함)는 캐싱하지 않음.
+        version: 엔드포인트 인자를 받아 공유 세대(DB 버전 카운터 등)를 돌려주는 함수 - 키에 포함되어
+        다른 워커의 쓰기도 바로 반영 (invalidate_tag 는 이 프로세스 안에서만 동작)
+        """
+        tags = tuple(tags)
+        names = tuple(key_params) if key_params is not None else None
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if names is not None:
+                    params = {name: kwargs.get(name) for name in names}
+                else:
+                    params = {k: v for k, v in kwargs.items() if isinstance(v, _KEY_TYPES)}
+                if version is not None:
+                    params["_v"] = await version(kwargs)
+                key = self.make_key(prefix, params)
+                return await self.get_or_load(key, lambda: func(*args, **kwargs), ttl_seconds, tags)
+            return wrapper
+        return decorator
+
+    # =========================
+    # 키 / 통계
+    # =========================
+
     def make_key(self, prefix: str, params: Dict[str, Any]) -> str:
-        """Create cache key from prefix and params"""
-        params_str = json.dumps(params, sort_keys=True)
-        hash_digest = hashlib.md5(params_str.encode()).hexdigest()
-        return f"{prefix}:{hash_digest}"
+        """prefix + 정렬된 파라미터 (해시 없이 그대로 - 짧은 쿼리 파라미터 전용)"""
+        if not params:
+            return prefix
+        return prefix + "?" + "&".join(f"{name}={params[name]!r}" for name in sorted(params))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self.cache),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expired': self.expired,
+            'invalidations': self.invalidations,
+            'coalesced': self.coalesced,
+            'stale_loads': self.stale_loads,
+            'inflight': len(self._inflight),
+            'tags': {tag: len(keys) for tag, keys in self._tags.items()},
+            'hit_rate': f"{(self.hits / total * 100) if total else 0:.1f}%"
+        }
+
 
 # Global cache instance
-cache = SimpleCache()
\ No newline at end of file
+cache = APICache()
+cached = cache.cached
+get_metrics().track_cache("api", cache)
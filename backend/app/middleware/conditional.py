@@ -0,0 +1,116 @@
+"""
+조건부 GET (ETag / If-None-Match)
+- ETag = 리소스 버전 카운터(resource_versions) + 쿼리 파라미터 → 약한 ETag  W/"chat.12.3f9a01c2"
+- 엔드포인트 의존성으로 실행: 버전 한 행 조회 후 일치하면 304 (프로젝트/메시지 로드·직렬화 없음)
+- 버전은 데이터보다 먼저 읽음 → ETag 가 내용보다 오래될 수는 있어도 앞설 수는 없음 (틀린 304 없음)
+- Cache-Control: no-cache → 브라우저가 캐시 본문을 쓰기 전에 항상 If-None-Match 로 재검증
+- 배포마다 응답 형식이 바뀔 수 있으므로 ETAG_SALT(없으면 RENDER_GIT_COMMIT) 를 ETag 에 섞음
+- 리소스별 304 비율은 /cache-stats 의 conditional_get, /metrics 의 tevor_conditional_requests_total
+"""
+
+import os
+import zlib
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from app.database import get_read_db
+from app.services.metrics import get_metrics
+from app.services.timing import span
+from app.services.resource_versions import get_versions
+
+ETAG_SALT = os.getenv("ETAG_SALT") or os.getenv("RENDER_GIT_COMMIT", "")
+
+_conditional_requests = get_metrics().counter(
+    "tevor_conditional_requests_total", "GET requests with ETag support by result", ["resource", "result"]
+)
+
+
+def make_etag(resource: str, versions: Tuple[int, ...], query: str = "") -> str:
+    variant = zlib.crc32(f"{ETAG_SALT}?{query}".encode()) & 0xffffffff
+    return f'W/"{resource}.{".".join(str(v) for v in versions)}.{variant:08x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """약한 비교 (W/ 접두어 무시, 목록/와일드카드 지원)"""
+    if not if_none_match:
+        return False
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == target:
+            return True
+    return False
+
+
+class ConditionalGetStats:
+    """리소스별 조건부 GET 결과 집계"""
+
+    RESULTS = ("not_modified", "modified", "unconditional")
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, resource: str, result: str):
+        counts = self.counts.setdefault(resource, dict.fromkeys(self.RESULTS, 0))
+        counts[result] += 1
+        _conditional_requests.labels(resource, result).inc()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for resource, counts in self.counts.items():
+            total = sum(counts.values())
+            conditional = counts["not_modified"] + counts["modified"]
+            stats[resource] = {
+                **counts,
+                "requests": total,
+                "not_modified_rate": f"{(counts['not_modified'] / total * 100) if total else 0:.1f}%",
+                "revalidation_hit_rate": f"{(counts['not_modified'] / conditional * 100) if conditional else 0:.1f}%"
+            }
+        return stats
+
+
+_conditional_stats: Optional[ConditionalGetStats] = None
+
+
+def get_conditional_stats() -> ConditionalGetStats:
+    global _conditional_stats
+    if _conditional_stats is None:
+        _conditional_stats = ConditionalGetStats()
+    return _conditional_stats
+
+
+def conditional_get(resource: str, *kinds: str):
+    """project_id 경로 파라미터를 받는 GET 엔드포인트용 의존성
+
+    사용: @router.get("/history/{project_id}", dependencies=[Depends(conditional_get("chat"))])
+    일치하면 304 로 바로 응답하고, 아니면 응답에 ETag 헤더를 붙임 (엔드포인트와 같은 DB 세션 사용).
+    """
+    kinds = kinds or (resource,)
+
+    async def dependency(project_id: str, request: Request, response: Response,
+                         db = Depends(get_read_db)) -> Optional[str]:
+        stats = get_conditional_stats()
+        with span("etag"):
+            versions = await get_versions(db, project_id, kinds)
+        if len(versions) != len(kinds):
+            # 버전 행이 없음 = 없는 프로젝트 → 엔드포인트가 404 처리
+            stats.record(resource, "unconditional")
+            return None
+
+        query = urlencode(sorted(request.query_params.multi_items()))
+        etag = make_etag(resource, tuple(versions[kind] for kind in kinds), query)
+        if_none_match = request.headers.get("if-none-match")
+        if etag_matches(if_none_match, etag):
+            stats.record(resource, "not_modified")
+            raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        stats.record(resource, "modified" if if_none_match else "unconditional")
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return etag
+
+    return dependency
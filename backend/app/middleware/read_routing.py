@@ -0,0 +1,156 @@
+"""
+읽기/쓰기 세션 라우팅 + read-your-writes
+- 읽기 전용 의존성(get_read_db)은 읽기 엔진(복제본 또는 SQLite 읽기 풀)으로, 쓰기는 기본 DB 로
+- 쓰기 요청(POST/PUT/PATCH/DELETE)이 성공하면 그 클라이언트는 READ_YOUR_WRITES_SECONDS 동안 기본 DB 에서 읽음
+  (복제 지연 때문에 방금 쓴 내용이 안 보이는 문제 방지)
+- 기준 시각은 기본 DB 커밋 시점: 엔진 commit 이벤트에서 현재 클라이언트를 다시 고정
+  (채팅 스트림은 응답 헤더 뒤 스트림 끝에서 저장, 웹소켓 턴은 HTTP 응답이 없음)
+- 클라이언트 표시: 응답 쿠키(워커가 달라도 유지) + 워커 메모리의 최근 쓰기 기록 (쿠키를 안 보내는 클라이언트, 웹소켓)
+  쿠키는 헤더를 보낼 때 정해지므로 스트리밍 응답은 READ_YOUR_WRITES_STREAM_SECONDS 만큼 더 길게
+- 클라이언트 식별: X-Client-Id 헤더 > X-Forwarded-For 첫 주소 > 접속 주소
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from app.services.metrics import get_metrics
+
+# 복제본이 있을 때만 기본값 5초 (SQLite WAL 읽기 풀은 커밋 즉시 보이므로 불필요)
+READ_YOUR_WRITES_SECONDS = float(os.getenv(
+    "READ_YOUR_WRITES_SECONDS", "5" if os.getenv("DATABASE_READ_URL") else "0"
+))
+# 스트리밍 응답 쿠키에 더하는 시간 (스트림이 끝나고 저장될 때까지)
+READ_YOUR_WRITES_STREAM_SECONDS = float(os.getenv("READ_YOUR_WRITES_STREAM_SECONDS", "120"))
+RYW_COOKIE = "tevor_ryw"
+MAX_TRACKED_CLIENTS = 10000
+
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+_prefer_primary: ContextVar[bool] = ContextVar("prefer_primary", default=False)
+_writer_client: ContextVar[Optional[str]] = ContextVar("writer_client", default=None)
+
+_db_reads = get_metrics().counter("tevor_db_reads_total", "Read-only sessions by target role", ["role"])
+
+
+def prefers_primary() -> bool:
+    """현재 요청의 읽기를 기본 DB 로 보내야 하는지"""
+    return _prefer_primary.get()
+
+
+def record_commit():
+    """기본 DB 커밋 시 현재 쓰기 요청/웹소켓의 클라이언트를 커밋 시점부터 고정 (database.py 엔진 이벤트)"""
+    key = _writer_client.get()
+    if key is None:
+        return
+    router = get_read_router()
+    router.pin(key, time.time() + router.window)
+    router.commit_pins += 1
+
+
+class ReadRouter:
+    """클라이언트별 최근 쓰기 기록 + 읽기 라우팅 통계"""
+
+    def __init__(self, window: float = READ_YOUR_WRITES_SECONDS):
+        self.window = window
+        self.recent_writes: Dict[str, float] = {}
+        self.reads_by_role: Dict[str, int] = {}
+        self.pinned_reads = 0
+        self.commit_pins = 0
+
+    def client_key(self, headers: Dict[bytes, bytes], client: Optional[tuple]) -> Optional[str]:
+        client_id = headers.get(b"x-client-id")
+        if client_id:
+            return client_id.decode("latin-1")
+        forwarded = headers.get(b"x-forwarded-for")
+        if forwarded:
+            return forwarded.decode("latin-1").split(",")[0].strip()
+        return client[0] if client else None
+
+    def is_pinned(self, headers: Dict[bytes, bytes], key: Optional[str], now: float) -> bool:
+        """쿠키 또는 이 워커의 기록상 쓰기 직후인 클라이언트인지"""
+        for part in headers.get(b"cookie", b"").decode("latin-1").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == RYW_COOKIE:
+                try:
+                    if float(value) > now:
+                        return True
+                except ValueError:
+                    pass
+        return key is not None and self.recent_writes.get(key, 0) > now
+
+    def pin(self, key: Optional[str], until: float):
+        if key is None:
+            return
+        if len(self.recent_writes) >= MAX_TRACKED_CLIENTS:
+            now = time.time()
+            self.recent_writes = {k: v for k, v in self.recent_writes.items() if v > now}
+        self.recent_writes[key] = until
+
+    def record_read(self, role: str):
+        self.reads_by_role[role] = self.reads_by_role.get(role, 0) + 1
+        _db_reads.labels(role).inc()
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "window_seconds": self.window,
+            "reads_by_role": dict(self.reads_by_role),
+            "pinned_reads": self.pinned_reads,
+            "commit_pins": self.commit_pins,
+            "pinned_clients": sum(1 for until in self.recent_writes.values() if until > now)
+        }
+
+
+class ReadRoutingMiddleware:
+    """쓰기 후 일정 시간 같은 클라이언트의 읽기를 기본 DB 로 고정 (순수 ASGI)"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        router = get_read_router()
+        if scope["type"] not in ("http", "websocket") or router.window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        now = time.time()
+        headers = dict(scope.get("headers") or [])
+        key = router.client_key(headers, scope.get("client"))
+        if scope["type"] == "websocket":
+            # 턴마다 저장 커밋 시점에 워커 메모리 기록으로 고정 (웹소켓 중에는 쿠키를 보낼 수 없음)
+            _writer_client.set(key)
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] not in _WRITE_METHODS:
+            if router.is_pinned(headers, key, now):
+                router.pinned_reads += 1
+                _prefer_primary.set(True)
+            await self.app(scope, receive, send)
+            return
+
+        _writer_client.set(key)
+
+        async def send_with_fence(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + router.window
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if content_type.startswith(b"text/event-stream"):
+                    until += READ_YOUR_WRITES_STREAM_SECONDS
+                router.pin(key, until)
+                cookie = f"{RYW_COOKIE}={until:.3f}; Max-Age={int(until - time.time()) + 1}; Path=/; SameSite=Lax"
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_fence)
+
+
+_read_router: Optional[ReadRouter] = None
+
+def get_read_router() -> ReadRouter:
+    """읽기 라우터 인스턴스 가져오기"""
+    global _read_router
+    if _read_router is None:
+        _read_router = ReadRouter()
+    return _read_router
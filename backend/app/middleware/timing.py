@@ -0,0 +1,71 @@
+"""
+요청 구간 타이밍 미들웨어
+- 요청마다 RequestTimings 시작 → 응답 헤더에 Server-Timing 추가
+- 스트리밍 응답은 헤더가 먼저 나가므로 본문 마지막 timing 이벤트로 전체 구간 전달 (chat_stream)
+- 구간 분해는 샘플링해서 구조화 로그(JSON 한 줄)로 기록 - 느린 요청은 항상 기록
+- 순수 ASGI 미들웨어 (StreamingResponse 를 버퍼링하지 않음)
+"""
+
+import os
+import json
+import time
+import random
+import logging
+from typing import Any
+
+from app.services.timing import start_request
+
+TIMING_LOG_SAMPLE = float(os.getenv("TIMING_LOG_SAMPLE", "0.05"))     # 기록 비율 (0~1)
+TIMING_LOG_SLOW_MS = float(os.getenv("TIMING_LOG_SLOW_MS", "3000"))   # 이보다 느리면 항상 기록
+TIMING_LOG_FILE = os.getenv("TIMING_LOG_FILE")                        # 지정하면 JSONL 파일로 (없으면 stderr)
+
+# 루트 로거 설정과 무관하게 한 줄 JSON 으로 출력 (오프라인 분석용)
+logger = logging.getLogger("tevor.timing")
+if not logger.handlers:
+    _handler = logging.FileHandler(TIMING_LOG_FILE, encoding="utf-8") if TIMING_LOG_FILE else logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class TimingMiddleware:
+    """Server-Timing 헤더 + 샘플링 로그"""
+
+    def __init__(self, app: Any, sample_rate: float = TIMING_LOG_SAMPLE, slow_ms: float = TIMING_LOG_SLOW_MS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request()
+        status = 0
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # 백그라운드 태스크(스트림 정리/저장)까지 끝난 뒤 기록
+            total_ms = timings.elapsed() * 1000
+            if total_ms >= self.slow_ms or random.random() < self.sample_rate:
+                logger.info(json.dumps({
+                    "ts": round(time.time(), 3),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "total_ms": round(total_ms, 2),
+                    "phases": timings.to_dict()
+                }, ensure_ascii=False))
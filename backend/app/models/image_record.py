@@ -33,6 +33,9 @@ class ImageRecord(Base):
     caption = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # 시간순 정렬 최적화
 
+    # 저장/삭제되는 파일 크기 (DB 컬럼 아님 - 저장/삭제 요청에서 채워 project_stats.bytes_stored 갱신)
+    file_size = None
+
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
@@ -55,9 +58,8 @@ Index('idx_image_space_stage', ImageRecord.space_value, ImageRecord.stage_value)
 Index('idx_image_trade_valid', ImageRecord.trade_primary, ImageRecord.is_valid_construction)  # 공종별 유효 이미지
 Index('idx_chat_project_created', ChatMessage.project_id, ChatMessage.created_at)  # 프로젝트별 시간순 채팅 조회
 
-# 🔍 의미 검색을 위한 전문 검색 인덱스 (PostgreSQL의 경우)
-# Index('idx_image_reasoning_search', ImageRecord.reasoning.op('gin')())  # GIN 인덱스 (나중에 벡터 검색 시 활용)
-# Index('idx_image_description_search', ImageRecord.description_ko.op('gin')())  # GIN 인덱스
+# 🔍 전문 검색 인덱스는 search_documents 테이블에서 관리 (app/models/search_document.py)
+#    SQLite: FTS5 가상 테이블, PostgreSQL: tsvector GIN 인덱스
 
 # 레거시 호환 인덱스
 Index('idx_image_project_type', ImageRecord.project_id, ImageRecord.image_type)  # 프로젝트별 타입별 이미지 조회 (레거시)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON
+from app.database import Base
+
+class ProjectStats(Base):
+    """프로젝트별 집계 (채팅/이미지 쓰기 시 같은 트랜잭션에서 증분 갱신 - 요약 API 는 한 행 조회)"""
+    __tablename__ = "project_stats"
+
+    project_id = Column(String, primary_key=True)
+    message_count = Column(Integer, nullable=False, default=0)
+    image_count = Column(Integer, nullable=False, default=0)
+    images_by_space = Column(JSON, nullable=False, default=dict)  # {"거실": 3, "욕실": 1}
+    images_by_stage = Column(JSON, nullable=False, default=dict)  # {"시공 전": 2, "마감 중": 2}
+    bytes_stored = Column(BigInteger, nullable=False, default=0)  # 아카이브 이미지 파일 크기 합
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)  # 마지막 채팅/이미지 시각
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class ResourceVersion(Base):
+    """프로젝트별 리소스 버전 (쓰기와 같은 트랜잭션에서 +1 - 조건부 GET 의 ETag 원천)"""
+    __tablename__ = "resource_versions"
+
+    project_id = Column(String, primary_key=True)
+    kind = Column(String, primary_key=True)  # project / chat / images
+    version = Column(Integer, nullable=False, default=1)
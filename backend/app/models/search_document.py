@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Text, Index, func, literal_column, text
+from app.database import Base
+
+class SearchDocument(Base):
+    """전문 검색용 문서 (채팅 메시지 / 이미지 설명의 한국어 바이그램 토큰)"""
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True)
+    doc_type = Column(String, nullable=False)  # chat / image
+    doc_key = Column(String, nullable=False)  # ChatMessage.message_id / ImageRecord.image_id
+    project_id = Column(String, index=True)  # 프로젝트별 검색 필터
+    tokens = Column(Text, nullable=False)  # 공백으로 구분된 바이그램 토큰
+
+    __table_args__ = (
+        # 🔍 PostgreSQL: 바이그램 토큰 tsvector GIN 인덱스 (SQLite는 FTS5 가상 테이블 사용)
+        Index(
+            'idx_search_tokens_tsv',
+            func.to_tsvector(literal_column("'simple'"), text("tokens")),
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
+    )
+
+# 원본 행 → 검색 문서 (쓰기 시 갱신/삭제용)
+Index('idx_search_doc_key', SearchDocument.doc_type, SearchDocument.doc_key, unique=True)
+
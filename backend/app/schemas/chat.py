@@ -6,6 +6,7 @@ class ChatRequest(BaseModel):
     project_id: str
     message: str
     conversation_history: Optional[List[dict]] = []
+    latency_critical: Optional[bool] = None  # True면 헤지 요청 허용 (None: 서버 기본값)
 
 class ChatResponse(BaseModel):
     id: int
@@ -10,10 +10,12 @@ import uuid
 import shutil
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from PIL import Image
 import io
 import logging
 
+from app.services.metrics import image_stage
+from app.services.timing import span
+
 logger = logging.getLogger(__name__)
 
 class ArchiveService:
@@ -48,15 +50,20 @@ class ArchiveService:
             # 이미지 저장
             file_path = os.path.join(project_archive_path, filename)
             
-            # PIL로 이미지 최적화 저장
-            image = Image.open(io.BytesIO(image_file))
+            # PIL로 이미지 최적화 저장 (PIL 은 첫 업로드 때 import - 콜드 스타트 단축)
+            from PIL import Image
+            with span("decode", image_stage):
+                image = Image.open(io.BytesIO(image_file))
+                image.load()
             
             # 이미지 크기 최적화 (최대 1920x1080)
             if image.width > 1920 or image.height > 1080:
-                image.thumbnail((1920, 1080), Image.Resampling.LANCZOS)
+                with span("resize", image_stage):
+                    image.thumbnail((1920, 1080), Image.Resampling.LANCZOS)
             
             # PNG로 저장 (품질 유지)
-            image.save(file_path, "PNG", optimize=True)
+            with span("encode", image_stage):
+                image.save(file_path, "PNG", optimize=True)
             
             # 메타데이터 생성
             metadata = {
@@ -197,14 +204,16 @@ class ArchiveService:
                     "message": f"파일을 찾을 수 없습니다: {filename}"
                 }
             
-            # 파일 삭제
+            # 파일 삭제 (크기는 프로젝트 통계 갱신용)
+            file_size = os.path.getsize(file_path)
             os.remove(file_path)
             
             logger.info(f"🗑️ Image deleted: {filename} from project {project_id}")
             
             return {
                 "success": True,
-                "message": f"이미지가 성공적으로 삭제되었습니다: {filename}"
+                "message": f"이미지가 성공적으로 삭제되었습니다: {filename}",
+                "file_size": file_size
             }
             
         except Exception as e:
@@ -260,6 +269,7 @@ class ArchiveService:
             file_path = os.path.join(project_archive_path, metadata["filename"])
             
             # PIL로 이미지 최적화 저장
+            from PIL import Image
             image = Image.open(io.BytesIO(image_bytes))
             
             # 이미지 크기 최적화 (최대 1920x1080)
@@ -12,22 +12,28 @@ from collections import OrderedDict
 import difflib
 import logging
 
+from app.services.metrics import get_metrics
+
 logger = logging.getLogger(__name__)
 
 class ResponseCache:
     """응답 캐시 관리 클래스"""
     
-    def __init__(self, max_size: int = 100, ttl: int = 3600):
+    def __init__(self, max_size: int = 100, ttl: int = 3600, name: Optional[str] = None):
         """
         Args:
             max_size: 최대 캐시 크기
             ttl: Time To Live (초)
+            name: 메트릭 이름 (지정하면 /metrics 에 노출)
         """
         self.cache: OrderedDict = OrderedDict()
         self.max_size = max_size
         self.ttl = ttl
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
+        if name:
+            get_metrics().track_cache(name, self)
         
     def _generate_key(self, message: str, context: Optional[Dict] = None) -> str:
         """캐시 키 생성"""
@@ -70,6 +76,7 @@ class ResponseCache:
             else:
                 # 만료된 엔트리 제거
                 del self.cache[key]
+                self.evictions += 1
         
         # 유사 메시지 검색
         for cached_key, entry in list(self.cache.items()):
@@ -97,6 +104,7 @@ class ResponseCache:
         if len(self.cache) >= self.max_size:
             # LRU: 가장 오래된 항목 제거
             self.cache.popitem(last=False)
+            self.evictions += 1
         
         self.cache[key] = {
             'original_message': message,
@@ -112,6 +120,7 @@ class ResponseCache:
         self.cache.clear()
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
         
     def get_stats(self) -> Dict[str, Any]:
         """캐시 통계"""
@@ -123,6 +132,7 @@ class ResponseCache:
             'max_size': self.max_size,
             'hits': self.hits,
             'misses': self.misses,
+            'evictions': self.evictions,
             'hit_rate': f"{hit_rate:.1f}%",
             'ttl': self.ttl
         }
@@ -147,6 +157,7 @@ def get_cache() -> ResponseCache:
     if _cache_instance is None:
         _cache_instance = ResponseCache(
             max_size=200,  # 최대 200개 캐싱
-            ttl=1800  # 30분 TTL
+            ttl=1800,  # 30분 TTL
+            name="response"
         )
     return _cache_instance
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+채팅 서버 푸시 허브
+- WebSocket 연결별 프로젝트 구독 관리
+- 새 채팅 메시지가 저장되면 같은 프로젝트를 구독한 다른 연결에 알림
+- 워커 프로세스 단위 (다른 워커에 붙은 기기는 다음 동기화 때 반영)
+"""
+
+import logging
+from typing import Dict, Set, Any, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber(Protocol):
+    def push(self, frame: Dict[str, Any]) -> bool:
+        """프레임을 보내기 대기열에 넣음 (가득 차면 False)"""
+        ...
+
+
+class ChatHub:
+    """프로젝트 → 구독 연결 레지스트리"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, project_id: str, subscriber: Subscriber):
+        self._subscribers.setdefault(project_id, set()).add(subscriber)
+
+    def unsubscribe(self, project_id: str, subscriber: Subscriber):
+        subscribers = self._subscribers.get(project_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[project_id]
+
+    def unsubscribe_all(self, subscriber: Subscriber):
+        for project_id in list(self._subscribers):
+            self.unsubscribe(project_id, subscriber)
+
+    def publish(self, project_id: str, frame: Dict[str, Any], exclude: Optional[Subscriber] = None):
+        """구독자에게 푸시 (느린 연결 때문에 발행자가 기다리지 않음 - 대기열이 차면 버림)"""
+        subscribers = self._subscribers.get(project_id)
+        if not subscribers:
+            return
+        self.published += 1
+        for subscriber in list(subscribers):
+            if subscriber is exclude:
+                continue
+            if subscriber.push(frame):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+                logger.warning(f"푸시 대기열 포화 - 프레임 버림 ({project_id})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "projects": len(self._subscribers),
+            "subscriptions": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+
+def message_frame(project_id: str, message_id: str, user_message: str, ai_response: str) -> Dict[str, Any]:
+    """새 메시지 알림 프레임 (클라이언트가 다시 조회하지 않고 바로 표시)"""
+    return {"t": "push", "p": project_id, "mid": message_id, "q": user_message, "a": ai_response}
+
+
+# 싱글톤 인스턴스
+_chat_hub: Optional[ChatHub] = None
+
+def get_chat_hub() -> ChatHub:
+    """채팅 허브 인스턴스 가져오기"""
+    global _chat_hub
+    if _chat_hub is None:
+        _chat_hub = ChatHub()
+    return _chat_hub
@@ -0,0 +1,401 @@
+"""
+프로젝트 내보내기 (인수인계 패키지 zip 스트리밍)
+- 구성: project.json / chat.jsonl / photos.jsonl / photos/<아카이브 파일>
+- 사진은 재압축 없이 STORED 로 디스크에서 바로 복사 (PNG/JPEG 는 이미 압축됨 - deflate 해도 CPU 만 씀)
+- 메모리 고정: JSONL 은 배치 조회로 임시 파일(SpooledTemporaryFile)에 쓰고, 모든 항목을 청크 단위로 읽어 전송
+- zip 레이아웃(항목별 오프셋, 전체 크기)을 미리 계산 → Content-Length 와 Range(이어받기) 지원
+- CRC 는 각 항목 헤더 직전에 계산 (파일은 CRC 계산 + 전송으로 두 번 읽음, 두 번째는 페이지 캐시)
+  같은 파일 CRC 는 (경로, 크기, mtime) 기준으로 기억 → 이어받기 때 건너뛴 항목도 다시 읽지 않음
+- 4GB 넘는 아카이브는 zip64 (중앙 디렉터리 오프셋/종료 레코드)
+"""
+
+import os
+import json
+import time
+import zlib
+import struct
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Iterator, IO
+
+from sqlalchemy import select
+
+from app.models.project import Project
+from app.models.image_record import ImageRecord, ChatMessage
+from app.models.project_stats import ProjectStats
+from app.services.archive_service import archive_service
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(256 * 1024)))
+EXPORT_SPOOL_BYTES = int(os.getenv("EXPORT_SPOOL_BYTES", str(1024 * 1024)))  # 넘으면 JSONL 을 디스크로
+EXPORT_BATCH_ROWS = 500
+CRC_CACHE_SIZE = 4096
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")           # 30 bytes
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")   # 46 bytes
+_END_RECORD = struct.Struct("<IHHHHIIH")                # 22 bytes
+_ZIP64_END_RECORD = struct.Struct("<IQHHIIQQQQ")        # 56 bytes
+_ZIP64_LOCATOR = struct.Struct("<IIQI")                 # 20 bytes
+_ZIP64_OFFSET_EXTRA = struct.Struct("<HHQ")             # 12 bytes
+
+_UTF8_FLAG = 0x0800
+_MAX32 = 0xFFFFFFFF
+_MAX16 = 0xFFFF
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], total: int) -> Optional[Tuple[int, int]]:
+    """단일 바이트 범위 (start, end 포함) - 없거나 여러 범위면 None (전체 전송)"""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else total - 1
+        else:
+            start, end = max(total - int(last), 0), total - 1  # bytes=-N (마지막 N 바이트)
+    except ValueError:
+        return None
+    if start >= total or start > end:
+        raise RangeNotSatisfiable()
+    return start, min(end, total - 1)
+
+
+def _dos_datetime(at: Optional[datetime]) -> Tuple[int, int]:
+    if at is None or at.year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1
+    return (at.hour << 11) | (at.minute << 5) | (at.second // 2), ((at.year - 1980) << 9) | (at.month << 5) | at.day
+
+
+class _CRCCache:
+    """(경로, 크기, mtime) → CRC32 LRU"""
+
+    def __init__(self, max_size: int = CRC_CACHE_SIZE):
+        self.entries: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[int]:
+        with self.lock:
+            crc = self.entries.get(key)
+            if crc is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return crc
+
+    def put(self, key, crc: int):
+        with self.lock:
+            self.entries[key] = crc
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
+_crc_cache = _CRCCache()
+
+
+class ZipEntry:
+    """zip 항목 하나 (디스크 파일 또는 임시 파일)"""
+
+    __slots__ = ("name", "size", "dos_time", "dos_date", "path", "file", "crc", "offset")
+
+    def __init__(self, name: str, size: int, modified: Optional[datetime],
+                 path: Optional[str] = None, file: Optional[IO[bytes]] = None, crc: Optional[int] = None):
+        if size > _MAX32:
+            raise ValueError(f"4GB 넘는 파일은 내보낼 수 없습니다: {name}")
+        self.name = name.encode("utf-8")
+        self.size = size
+        self.dos_time, self.dos_date = _dos_datetime(modified)
+        self.path = path
+        self.file = file
+        self.crc = crc
+        self.offset = 0
+
+    def _cache_key(self):
+        stat = os.stat(self.path)
+        return self.path, stat.st_size, stat.st_mtime_ns
+
+    def compute_crc(self) -> int:
+        if self.crc is not None:
+            return self.crc
+        key = self._cache_key()
+        crc = _crc_cache.get(key)
+        if crc is None:
+            crc = 0
+            for chunk in self.read(0, self.size):
+                crc = zlib.crc32(chunk, crc)
+            _crc_cache.put(key, crc)
+        self.crc = crc
+        return crc
+
+    def read(self, start: int, end: int) -> Iterator[bytes]:
+        """[start, end) 를 청크 단위로"""
+        handle = open(self.path, "rb") if self.path else self.file
+        try:
+            handle.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = handle.read(min(EXPORT_CHUNK_BYTES, remaining))
+                if not chunk:
+                    raise IOError(f"내보내는 중 파일이 바뀌었습니다: {self.name.decode('utf-8')}")
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            if self.path:
+                handle.close()
+
+    @property
+    def needs_zip64(self) -> bool:
+        return self.offset >= _MAX32
+
+    @property
+    def local_header_size(self) -> int:
+        return _LOCAL_HEADER.size + len(self.name)
+
+    @property
+    def central_header_size(self) -> int:
+        return _CENTRAL_HEADER.size + len(self.name) + (_ZIP64_OFFSET_EXTRA.size if self.needs_zip64 else 0)
+
+    def local_header(self) -> bytes:
+        return _LOCAL_HEADER.pack(
+            0x04034b50, 45 if self.needs_zip64 else 20, _UTF8_FLAG, 0, self.dos_time, self.dos_date,
+            self.compute_crc(), self.size, self.size, len(self.name), 0
+        ) + self.name
+
+    def central_header(self) -> bytes:
+        extra = _ZIP64_OFFSET_EXTRA.pack(0x0001, 8, self.offset) if self.needs_zip64 else b""
+        return _CENTRAL_HEADER.pack(
+            0x02014b50, (3 << 8) | 45, 45 if self.needs_zip64 else 20, _UTF8_FLAG, 0,
+            self.dos_time, self.dos_date, self.compute_crc(), self.size, self.size,
+            len(self.name), len(extra), 0, 0, 0, 0o100644 << 16, min(self.offset, _MAX32)
+        ) + self.name + extra
+
+
+class StreamingZip:
+    """레이아웃이 고정된 STORED zip - 전체 또는 임의 바이트 범위를 청크로 생성"""
+
+    def __init__(self, entries: List[ZipEntry]):
+        self.entries = entries
+        self.segments: List[Tuple[int, int, str, Optional[ZipEntry]]] = []  # (시작, 길이, 종류, 항목)
+        offset = 0
+        for entry in entries:
+            entry.offset = offset
+            self._add(offset, entry.local_header_size, "local", entry)
+            offset += entry.local_header_size
+            self._add(offset, entry.size, "data", entry)
+            offset += entry.size
+        self.central_offset = offset
+        for entry in entries:
+            self._add(offset, entry.central_header_size, "central", entry)
+            offset += entry.central_header_size
+        self.central_size = offset - self.central_offset
+        self.zip64 = len(entries) >= _MAX16 or self.central_offset >= _MAX32 or self.central_size >= _MAX32
+        end_size = _END_RECORD.size + ((_ZIP64_END_RECORD.size + _ZIP64_LOCATOR.size) if self.zip64 else 0)
+        self._add(offset, end_size, "end", None)
+        self.total_size = offset + end_size
+
+    def _add(self, start: int, length: int, kind: str, entry: Optional[ZipEntry]):
+        if length:
+            self.segments.append((start, length, kind, entry))
+
+    def _end_records(self) -> bytes:
+        count = len(self.entries)
+        if not self.zip64:
+            return _END_RECORD.pack(0x06054b50, 0, 0, count, count, self.central_size, self.central_offset, 0)
+        zip64_offset = self.central_offset + self.central_size
+        return (
+            _ZIP64_END_RECORD.pack(0x06064b50, _ZIP64_END_RECORD.size - 12, 45, 45, 0, 0,
+                                   count, count, self.central_size, self.central_offset)
+            + _ZIP64_LOCATOR.pack(0x07064b50, 0, zip64_offset, 1)
+            + _END_RECORD.pack(0x06054b50, 0, 0, _MAX16, _MAX16, _MAX32, _MAX32, 0)
+        )
+
+    def _segment_chunks(self, kind: str, entry: Optional[ZipEntry], start: int, end: int) -> Iterator[bytes]:
+        if kind == "data":
+            yield from entry.read(start, end)
+        elif kind == "local":
+            yield entry.local_header()[start:end]
+        elif kind == "central":
+            yield entry.central_header()[start:end]
+        else:
+            yield self._end_records()[start:end]
+
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """[start, end] (end 포함) 바이트 - 작은 헤더는 모아서 EXPORT_CHUNK_BYTES 근처 크기로 내보냄"""
+        end = self.total_size - 1 if end is None else end
+        buffer = bytearray()
+        for seg_start, length, kind, entry in self.segments:
+            seg_end = seg_start + length
+            if seg_end <= start:
+                continue
+            if seg_start > end:
+                break
+            for chunk in self._segment_chunks(kind, entry, max(start, seg_start) - seg_start,
+                                              min(end + 1, seg_end) - seg_start):
+                buffer += chunk
+                if len(buffer) >= EXPORT_CHUNK_BYTES:
+                    yield bytes(buffer)
+                    buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    def close(self):
+        for entry in self.entries:
+            if entry.file is not None and not entry.file.closed:
+                entry.file.close()
+
+
+class _JSONLWriter:
+    """임시 파일에 JSONL 을 쓰면서 크기/CRC/마지막 시각 집계"""
+
+    def __init__(self):
+        self.file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        self.size = 0
+        self.crc = 0
+        self.last_at: Optional[datetime] = None
+
+    def write(self, record: Dict[str, Any], at: Optional[datetime] = None):
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        self.file.write(line)
+        self.size += len(line)
+        self.crc = zlib.crc32(line, self.crc)
+        if at is not None and (self.last_at is None or at > self.last_at):
+            self.last_at = at
+
+    def entry(self, name: str) -> ZipEntry:
+        return ZipEntry(name, self.size, self.last_at, file=self.file, crc=self.crc)
+
+
+async def _batches(db, model, project_id: str):
+    """id 키셋 페이지네이션으로 EXPORT_BATCH_ROWS 씩 조회 (전체를 한 번에 메모리에 올리지 않음)"""
+    from app.database import IS_ASYNC
+
+    last_id = 0
+    while True:
+        query = (
+            select(model)
+            .where((model.project_id == project_id) & (model.id > last_id))
+            .order_by(model.id)
+            .limit(EXPORT_BATCH_ROWS)
+        )
+        rows = ((await db.execute(query)) if IS_ASYNC else db.execute(query)).scalars().all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+        db.expunge_all()
+
+
+def _iso(at: Optional[datetime]) -> Optional[str]:
+    return at.isoformat() if at else None
+
+
+async def build_project_export(db, project_id: str, versions: Dict[str, int]) -> Optional[StreamingZip]:
+    """내보내기 zip 준비 (DB 조회는 여기서 모두 끝남 - 전송 중에는 파일만 읽음). 없는 프로젝트면 None"""
+    from app.database import IS_ASYNC
+
+    start = time.perf_counter()
+    query = (
+        select(Project, ProjectStats)
+        .outerjoin(ProjectStats, ProjectStats.project_id == Project.project_id)
+        .where(Project.project_id == project_id)
+    )
+    row = ((await db.execute(query)) if IS_ASYNC else db.execute(query)).first()
+    if not row:
+        return None
+    project, stats = row
+
+    chat = _JSONLWriter()
+    photos = _JSONLWriter()
+    spooled = [chat.file, photos.file]
+    try:
+        async for messages in _batches(db, ChatMessage, project_id):
+            for message in messages:
+                chat.write({
+                    "message_id": message.message_id,
+                    "created_at": _iso(message.created_at),
+                    "user": message.user_message,
+                    "assistant": message.ai_response,
+                    "confidence": message.confidence,
+                    "rag_context": message.rag_context,
+                    "image_url": message.server_image_url
+                }, message.created_at)
+
+        async for records in _batches(db, ImageRecord, project_id):
+            for record in records:
+                photos.write({
+                    "image_id": record.image_id,
+                    "file": f"photos/{os.path.basename(record.storage_path)}" if record.storage_path else None,
+                    "created_at": _iso(record.created_at),
+                    "space": record.space_value,
+                    "stage": record.stage_value,
+                    "trade": record.trade_primary,
+                    "condition": record.condition_value,
+                    "description": record.description_ko,
+                    "keywords": record.keywords_json,
+                    "caption": record.caption,
+                    "original_filename": record.original_filename
+                }, record.created_at)
+
+        manifest = json.dumps({
+            "project_id": project.project_id,
+            "name": project.name,
+            "description": project.description,
+            "created_at": _iso(project.created_at),
+            "statistics": {
+                "message_count": stats.message_count if stats else 0,
+                "image_count": stats.image_count if stats else 0,
+                "images_by_space": (stats.images_by_space if stats else None) or {},
+                "images_by_stage": (stats.images_by_stage if stats else None) or {},
+                "last_activity_at": _iso(stats.last_activity_at) if stats else None
+            },
+            "versions": versions,
+            "files": {"chat": "chat.jsonl", "photos": "photos.jsonl", "photo_dir": "photos/"}
+        }, ensure_ascii=False, indent=2).encode("utf-8")
+        manifest_file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        spooled.append(manifest_file)
+        manifest_file.write(manifest)
+
+        entries = [
+            ZipEntry("project.json", len(manifest), project.created_at, file=manifest_file, crc=zlib.crc32(manifest)),
+            chat.entry("chat.jsonl"),
+            photos.entry("photos.jsonl"),
+        ]
+        project_dir = os.path.join(archive_service.archive_path, project_id)
+        if os.path.isdir(project_dir):
+            with os.scandir(project_dir) as files:
+                for item in sorted(files, key=lambda f: f.name):
+                    if item.is_file():
+                        stat = item.stat()
+                        entries.append(ZipEntry(f"photos/{item.name}", stat.st_size,
+                                                datetime.fromtimestamp(stat.st_mtime), path=item.path))
+    except BaseException:
+        for file in spooled:
+            file.close()
+        raise
+
+    export = StreamingZip(entries)
+    logger.info(f"📦 Export prepared: {project_id} ({len(entries)} files, "
+                f"{export.total_size / 1048576:.1f} MB) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return export
+
+
+def get_export_stats() -> Dict[str, Any]:
+    return {
+        "crc_cache_size": len(_crc_cache.entries),
+        "crc_cache_hits": _crc_cache.hits,
+        "crc_cache_misses": _crc_cache.misses,
+        "chunk_bytes": EXPORT_CHUNK_BYTES
+    }
@@ -6,14 +6,21 @@ TEVOR Unified Gemini Service
 """
 
 import os
+import time
+import asyncio
 import logging
-from typing import Dict, Optional, List, Any
+from contextlib import aclosing
+from typing import Dict, Optional, List, Any, AsyncGenerator
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from PIL import Image
 import io
 import base64
 from app.services.cache_service import get_cache
+from app.services.intent_engine import get_intent_engine
+from app.services.resilience import Deadline, CircuitOpenError, get_breaker, timed_stream
+from app.services.prompt_engine import get_prompt_engine, usage_from_gemini
+from app.services.stream_events import StreamEvent, StartEvent, ContentEvent, EndEvent
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +44,9 @@ class UnifiedGeminiService:
         if not api_key:
             raise ValueError("GOOGLE_API_KEY 또는 GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
         
-        genai.configure(api_key=api_key)
+        # GEMINI_API_ENDPOINT: 리전 엔드포인트/프록시/로컬 대역 서버 (benchmarks.fake_llm)
+        endpoint = os.getenv("GEMINI_API_ENDPOINT")
+        genai.configure(api_key=api_key, client_options={"api_endpoint": endpoint} if endpoint else None)
         
         # 모델 설정 - Gemini 2.0 Flash (안전 필터 우회 개선)
         self.model_name = "gemini-2.0-flash-exp"
@@ -191,13 +200,19 @@ class UnifiedGeminiService:
             # response_mime_type="application/json"는 vision_service에서만 사용
         )
         
+        self.breaker = get_breaker("gemini")
+        
+        # 프롬프트 레이아웃 (chat_prompt 를 맨 앞에 고정 → Gemini 암시적 캐시 적중)
+        self.prompt_engine = get_prompt_engine()
+        self.prompt_layout = self.prompt_engine.register("gemini", self.chat_prompt)
+        
         self._initialized = True
         logger.info(f"🚀 Unified Gemini Service initialized with {self.model_name}")
 
-    async def chat_response(self, message: str, project_context: Optional[Dict] = None) -> Dict[str, Any]:
+    async def chat_response(self, message: str, project_context: Optional[Dict] = None,
+                            deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """통합 채팅 응답 생성 - Gemini API 사용"""
-        import asyncio
-        
+        deadline = deadline or Deadline.from_env()
         try:
             # 1. 빠른 응답 패턴 체크
             quick_response = await self._check_quick_patterns(message)
@@ -216,12 +231,23 @@ class UnifiedGeminiService:
             
             logger.info(f"Gemini API 호출 중... 메시지: {message[:50]}")
             
-            # Gemini API를 비동기로 호출 (별도 스레드에서)
-            response = await asyncio.to_thread(
-                self.chat_model.generate_content,
-                prompt,
-                generation_config=self.chat_generation_config
-            )
+            # Gemini 비동기 API 호출 (스레드 풀 미사용) - 데드라인 안에서만 대기
+            if not self.breaker.allow_request():
+                raise CircuitOpenError("gemini circuit open")
+            try:
+                response = await asyncio.wait_for(
+                    self.chat_model.generate_content_async(
+                        prompt,
+                        generation_config=self.chat_generation_config,
+                        request_options={"timeout": deadline.remaining()}
+                    ),
+                    deadline.remaining()
+                )
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            self.prompt_engine.record_usage("gemini", usage_from_gemini(getattr(response, "usage_metadata", None)))
             
             # 정상 응답 처리 (안전 필터 우회)
             try:
@@ -273,76 +299,146 @@ class UnifiedGeminiService:
             }
 
 
-    def _is_simple_greeting(self, message: str) -> bool:
-        """간단한 인사말 판별"""
-        simple_greetings = [
-            '하이', '안녕', '안녕하세요', 'hi', 'hello', '헬로', '반가워',
-            '좋은 아침', '안녕히', '어이', '여기', '테스트', '테버'
-        ]
-        msg_lower = message.lower().strip()
-        return (
-            len(msg_lower) < 20 and 
-            any(greeting in msg_lower for greeting in simple_greetings)
-        )
+    async def generate_stream(self,
+                            user_message: str,
+                            project_context: Optional[Dict] = None,
+                            conversation_history: Optional[List] = None,
+                            deadline: Optional[Deadline] = None,
+                            skip_quick_patterns: bool = False) -> AsyncGenerator[StreamEvent, None]:
+        """스트리밍 응답 생성 (GPTService.generate_stream과 동일한 이벤트 형식)
 
-    async def _check_quick_patterns(self, message: str) -> Optional[Dict[str, Any]]:
-        """빠른 응답 패턴 체크 (캐싱된 응답)"""
-        import random
+        skip_quick_patterns: 호출자(라우터)가 이미 빠른 응답 판별을 한 경우 True
+        """
         
-        msg_lower = message.lower().strip()
-        
-        # 1. 간단한 인사말
-        if self._is_simple_greeting(message):
-            greetings = [
-                "안녕하세요 실장님! 오늘 현장은 어떠신가요?",
-                "네, 실장님! 무엇을 도와드릴까요?",
-                "반갑습니다! TEVOR입니다. 현장 관리를 도와드리겠습니다."
-            ]
-            return {
-                "success": True,
-                "response": random.choice(greetings),
-                "model": "cache",
-                "rag_used": False,
-                "quick_response": True
-            }
+        # 1. 빠른 패턴 확인
+        quick = None if skip_quick_patterns else await self._check_quick_patterns(user_message)
+        if quick:
+            # 빠른 응답은 한 번에 전송
+            yield StartEvent('cache')
+            yield ContentEvent(quick['response'])
+            yield EndEvent()
+            return
         
-        # 2. 감사 표현
-        if any(word in msg_lower for word in ['감사', '고마워', '고맙', 'thanks', 'thank']):
-            responses = [
-                "별말씀을요! 언제든 도와드리겠습니다.",
-                "천만에요, 실장님. 더 필요하신 게 있으면 말씀하세요.",
-                "도움이 되어 기쁩니다!"
-            ]
-            return {
-                "success": True,
-                "response": random.choice(responses),
-                "model": "cache",
-                "rag_used": False,
-                "quick_response": True
-            }
+        # 2. 캐시 확인
+        cache = get_cache()
+        cached = cache.get(user_message, project_context)
+        if cached:
+            yield StartEvent('cache')
+            yield ContentEvent(cached['response'])
+            yield EndEvent()
+            return
         
-        # 3. 확인/알겠다 표현
-        if any(word in msg_lower for word in ['오케이', 'ok', '알았', '알겠', '네', '응', '그래']):
-            if len(msg_lower) < 10:
-                return {
+        # 3. Gemini 스트리밍 API 호출 (SDK 비동기 스트림)
+        deadline = deadline or Deadline.from_env()
+        full_text = ""
+        usage = None
+        try:
+            if not self.breaker.allow_request():
+                raise CircuitOpenError("gemini circuit open")
+            
+            prompt = self._build_chat_prompt(user_message, project_context, conversation_history)
+            
+            # 스트리밍 시작
+            yield StartEvent(self.model_name)
+            
+            # 첫 토큰/토큰 간 타임아웃 적용
+            started_at = time.monotonic()
+            received_chunks = 0
+            try:
+                response = await asyncio.wait_for(
+                    self.chat_model.generate_content_async(
+                        prompt,
+                        generation_config=self.chat_generation_config,
+                        stream=True,
+                        request_options={"timeout": deadline.stream_remaining()}
+                    ),
+                    deadline.first_token_timeout()
+                )
+                
+                # 스트리밍 청크 처리 (중간에 빠져나가면 업스트림 스트림도 닫힘)
+                async with aclosing(timed_stream(
+                    response, deadline,
+                    is_token=lambda c: bool(self._extract_chunk_text(c)),
+                    started_at=started_at
+                )) as chunks:
+                    async for chunk in chunks:
+                        text = self._extract_chunk_text(chunk)
+                        if text:
+                            full_text += text
+                            received_chunks += 1
+                            yield ContentEvent(text)
+                        # 사용량은 누적값이므로 마지막 청크 기준
+                        usage = usage_from_gemini(getattr(chunk, "usage_metadata", None)) or usage
+            except (asyncio.CancelledError, GeneratorExit):
+                # 클라이언트 연결 끊김/헤지 패배로 취소 - 실패로 집계하지 않고 절약 토큰만 기록
+                received = usage["completion_tokens"] if usage else received_chunks
+                self.prompt_engine.record_cancelled(
+                    "gemini", received, self.chat_generation_config.max_output_tokens
+                )
+                raise
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            self.prompt_engine.record_usage("gemini", usage)
+            
+            if full_text:
+                # 캐시에 저장 (chat_response와 동일한 형식)
+                cache.set(user_message, {
                     "success": True,
-                    "response": "네, 실장님. 추가로 필요한 사항이 있으면 말씀해주세요.",
-                    "model": "cache",
-                    "rag_used": False,
-                    "quick_response": True
-                }
+                    "response": full_text,
+                    "model": self.model_name,
+                    "rag_used": False
+                }, project_context)
+            else:
+                # 안전 필터링으로 차단된 경우 PM 비서 응답
+                yield ContentEvent('네, 실장님. 해당 내용으로 기록해두겠습니다. 추가로 필요한 사항이 있으시면 말씀해 주세요.')
+            
+            # 스트리밍 종료 (프롬프트/캐시 토큰 사용량 포함)
+            yield EndEvent(usage=usage)
+            
+        except Exception as e:
+            logger.error(f"Gemini 스트리밍 오류: {e}")
+            if full_text:
+                # 이미 전송된 부분 응답은 유지하고 종료
+                yield EndEvent()
+                return
+            # 폴백 응답
+            yield ContentEvent('네, 실장님. 말씀하신 내용 확인했어요. 구체적으로 어떤 도움이 필요하신가요?', fallback=True)
+            yield EndEvent()
+
+    def _extract_chunk_text(self, chunk) -> str:
+        """스트림 청크에서 텍스트 추출 (차단된 청크는 빈 문자열)"""
+        try:
+            return chunk.text or ""
+        except Exception:
+            pass
         
-        # 4. 긴급 상황
-        if any(word in msg_lower for word in ['급해', '빨리', '긴급', '시급', '당장']):
-            return {
-                "success": True,
-                "response": "네, 급한 상황이시군요! 바로 처리하겠습니다. 구체적으로 어떤 도움이 필요하신가요?",
-                "model": "cache",
-                "rag_used": False,
-                "quick_response": True
-            }
+        # chunk.text 접근이 실패한 경우 - 파트에서 직접 추출
+        try:
+            if chunk.candidates and chunk.candidates[0].content.parts:
+                return "".join(
+                    getattr(part, "text", "") or ""
+                    for part in chunk.candidates[0].content.parts
+                )
+        except Exception:
+            pass
+        return ""
+
+    async def _check_quick_patterns(self, message: str) -> Optional[Dict[str, Any]]:
+        """빠른 응답 패턴 체크 (intent_rules.json - GPTService와 공유)"""
+        match = get_intent_engine().match(message)
+        if not match:
+            return None
         
-        return None
+        return {
+            "success": True,
+            "response": match["response"],
+            "model": "cache",
+            "rag_used": False,
+            "quick_response": True,
+            "intent": match["intent"]
+        }
     
     async def _quick_greeting_response(self) -> Dict[str, Any]:
         """빠른 인사 응답 (레거시 호환)"""
@@ -350,29 +446,7 @@ class UnifiedGeminiService:
 
     def _is_quick_response_pattern(self, message: str) -> bool:
         """빠른 응답이 가능한 패턴 판별 (RAG 스킵)"""
-        msg_lower = message.lower().strip()
-        msg_len = len(msg_lower)
-        
-        # 1. 간단한 인사말 (기존 로직)
-        simple_greetings = [
-            '하이', '안녕', '안녕하세요', 'hi', 'hello', '헬로', '반가워',
-            '좋은 아침', '안녕히', '어이', '여기', '테스트'
-        ]
-        
-        if msg_len < 15 and any(greeting in msg_lower for greeting in simple_greetings):
-            return True
-            
-        # 2. 🎨 일반적인 인테리어 상식 질문 (RAG 불필요)
-        quick_patterns = [
-            '색', '컬러', '추천', '어떤', '뭐가', '좋은', '예쁜', '트렌드',
-            '스타일', '분위기', '느낌', '이미지', '감각'
-        ]
-        
-        # 짧고 일반적인 질문들
-        if msg_len < 30 and any(pattern in msg_lower for pattern in quick_patterns):
-            return True
-            
-        return False
+        return get_intent_engine().match(message) is not None
 
     async def _generate_quick_response(self, message: str) -> Dict[str, Any]:
         """빠른 응답 생성 (사전 정의된 응답으로 즉시 처리)"""
@@ -419,19 +493,10 @@ class UnifiedGeminiService:
         }
 
 
-    def _build_chat_prompt(self, message: str, context: Optional[Dict] = None) -> str:
-        """채팅 프롬프트 구성"""
-        # 전체 시스템 프롬프트 사용 (안전 필터 우회)
-        prompt = f"""{self.chat_prompt}
-
-현재 프로젝트 정보:
-- 프로젝트 타입: {context.get('project_type', '일반 주택') if context else '일반 주택'}
-- 현재 단계: {context.get('current_stage', '시공 전') if context else '시공 전'}
-- 예상 공간: {', '.join(context.get('expected_spaces', ['거실', '주방', '침실', '욕실']) if context else ['거실', '주방', '침실', '욕실'])}
-
-사용자: {message}
-TEVOR:"""
-        return prompt
+    def _build_chat_prompt(self, message: str, context: Optional[Dict] = None,
+                           conversation_history: Optional[List] = None) -> str:
+        """채팅 프롬프트 구성 (정적 chat_prompt → 프로젝트 컨텍스트/지식 → 최근 대화 3개 → 메시지)"""
+        return self.prompt_layout.build_text(message, context, conversation_history)
 
     async def _fallback_vision_response(self) -> Dict[str, Any]:
         """이미지 분석 폴백 응답"""
@@ -6,12 +6,22 @@ GPT 기반 채팅 서비스
 """
 
 import os
+import time
 import asyncio
+from contextlib import aclosing
 from typing import Optional, Dict, List, AsyncGenerator
 from datetime import datetime
-import json
+import httpx
 from openai import AsyncOpenAI
 from app.services.cache_service import ResponseCache
+from app.services.intent_engine import get_intent_engine
+from app.services.resilience import Deadline, CircuitOpenError, get_breaker, timed_stream
+from app.services.prompt_engine import get_prompt_engine, usage_from_openai
+from app.services.stream_events import StreamEvent, StartEvent, ContentEvent, EndEvent
+from app.services.timing import span, record
+
+STREAM_MAX_TOKENS = 500  # 스트리밍 채팅 최대 생성 토큰 (모바일 최적화)
+
 
 class GPTService:
     def __init__(self):
@@ -19,20 +29,18 @@ class GPTService:
         self.api_key = os.getenv("OPENAI_API_KEY", "")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        self.client = AsyncOpenAI(api_key=self.api_key)
+        # 재시도는 라우터/서킷 브레이커가 담당 (SDK 재시도는 지연 예산을 초과시킴)
+        self.client = AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        self.breaker = get_breaker("openai")
         
         # 모델 설정 (최신 GPT-4-turbo 사용 - 매우 빠르고 성능 좋음)
         self.model_name = "gpt-4-turbo-preview"  # 최신 GPT-4 터보 모델, 매우 빠름
         
         # 캐시 서비스 (TTL 증가)
-        self.cache = ResponseCache(max_size=200, ttl=3600)
+        self.cache = ResponseCache(max_size=200, ttl=3600, name="gpt")
         
-        # 빠른 응답 패턴 (기존 gemini_service에서 가져옴)
-        self.quick_patterns = {
-            "안녕": "반갑습니다! TEVOR입니다. 현장 관리를 도와드리겠습니다.",
-            "고마워": "별말씀을요! 더 필요하신 거 있으면 언제든 말씀해주세요.",
-            "수고": "실장님도 수고하셨습니다! 내일도 안전한 현장 만들어요.",
-        }
+        # 빠른 응답 판별 (UnifiedGeminiService와 공유하는 규칙 기반 엔진)
+        self.intent_engine = get_intent_engine()
         
         # 상세한 시스템 프롬프트
         self.system_prompt = """당신은 TEVOR(테보)입니다. 한국의 인테리어 시공 현장 관리 AI 비서로, 현장 실장님들을 돕습니다.
@@ -108,24 +116,32 @@ class GPTService:
 기억하세요: 당신은 현장 실장님의 든든한 파트너입니다. 
 실무적이고, 정확하고, 도움이 되는 조언을 제공하되,
 불필요한 서비스 홍보는 절대 하지 않습니다."""
+        
+        # 프롬프트 레이아웃 (정적 시스템 프롬프트를 맨 앞에 고정 → OpenAI 프롬프트 캐시 적중)
+        self.prompt_engine = get_prompt_engine()
+        self.prompt_layout = self.prompt_engine.register("openai", self.system_prompt)
     
     async def _check_quick_patterns(self, message: str) -> Optional[Dict]:
-        """빠른 패턴 매칭"""
-        message_lower = message.strip().lower()
-        
-        for pattern, response in self.quick_patterns.items():
-            if pattern in message_lower:
-                return {
-                    "response": response,
-                    "source": "pattern",
-                    "confidence": 1.0
-                }
+        """빠른 패턴 매칭 (intent_rules.json)"""
+        match = self.intent_engine.match(message)
+        if match:
+            return {
+                "response": match["response"],
+                "source": "pattern",
+                "intent": match["intent"],
+                "confidence": 1.0
+            }
         return None
     
+    def _request_timeout(self, deadline: Deadline) -> httpx.Timeout:
+        """데드라인 기반 요청별 HTTP 타임아웃 (스트림이 첫 토큰 예산 뒤에도 이어지도록 스트림 예산 기준)"""
+        return httpx.Timeout(deadline.stream_remaining(), connect=deadline.connect_timeout())
+    
     async def generate_response(self, 
                                user_message: str, 
                                project_context: Optional[Dict] = None,
-                               conversation_history: Optional[List] = None) -> Dict:
+                               conversation_history: Optional[List] = None,
+                               deadline: Optional[Deadline] = None) -> Dict:
         """일반 응답 생성 (비스트리밍)"""
         
         # 1. 캐시 확인
@@ -143,39 +159,37 @@ class GPTService:
             return quick
         
         # 3. GPT API 호출
+        deadline = deadline or Deadline.from_env()
         try:
-            messages = [{"role": "system", "content": self.system_prompt}]
-            
-            # 프로젝트 컨텍스트 추가
-            if project_context:
-                context_msg = f"""현재 프로젝트 정보:
-- 프로젝트 타입: {project_context.get('project_type', '일반 주택')}
-- 현재 단계: {project_context.get('current_stage', '시공 전')}
-- 예상 공간: {', '.join(project_context.get('expected_spaces', ['거실', '주방', '침실', '욕실']))}"""
-                messages.append({"role": "system", "content": context_msg})
+            if not self.breaker.allow_request():
+                raise CircuitOpenError("openai circuit open")
             
-            # 대화 히스토리 추가
-            if conversation_history:
-                for h in conversation_history[-3:]:  # 최근 3개만 (속도 개선)
-                    if h.get("role") == "user":
-                        messages.append({"role": "user", "content": h.get("content", "")})
-                    elif h.get("role") == "assistant":
-                        messages.append({"role": "assistant", "content": h.get("content", "")})
+            # 정적 시스템 프롬프트 → 프로젝트 컨텍스트/지식 → 최근 대화 3개 → 현재 메시지
+            messages = self.prompt_layout.build_messages(user_message, project_context, conversation_history)
             
-            # 현재 메시지
-            messages.append({"role": "user", "content": user_message})
-            
-            # API 호출 (최적화)
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=800,  # 토큰 증가
-                presence_penalty=0.1,
-                frequency_penalty=0.1
-            )
+            # API 호출 (최적화) - 남은 데드라인 안에서만 대기
+            try:
+                with span("openai"):
+                    response = await asyncio.wait_for(
+                        self.client.chat.completions.create(
+                            model=self.model_name,
+                            messages=messages,
+                            temperature=0.7,
+                            max_tokens=800,  # 토큰 증가
+                            presence_penalty=0.1,
+                            frequency_penalty=0.1,
+                            timeout=self._request_timeout(deadline)
+                        ),
+                        deadline.remaining()
+                    )
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
             
             response_text = response.choices[0].message.content
+            usage = usage_from_openai(response.usage)
+            self.prompt_engine.record_usage("openai", usage)
             
             # 캐시 저장
             self.cache.set(user_message, response_text)
@@ -184,7 +198,8 @@ class GPTService:
                 "response": response_text,
                 "source": "gpt",
                 "model": self.model_name,
-                "confidence": 1.0
+                "confidence": 1.0,
+                "usage": usage
             }
             
         except Exception as e:
@@ -199,86 +214,109 @@ class GPTService:
     async def generate_stream(self,
                             user_message: str,
                             project_context: Optional[Dict] = None,
-                            conversation_history: Optional[List] = None) -> AsyncGenerator[str, None]:
-        """스트리밍 응답 생성"""
+                            conversation_history: Optional[List] = None,
+                            deadline: Optional[Deadline] = None,
+                            skip_quick_patterns: bool = False) -> AsyncGenerator[StreamEvent, None]:
+        """스트리밍 응답 생성
+
+        skip_quick_patterns: 호출자(라우터)가 이미 빠른 응답 판별을 한 경우 True
+        """
         
         # 1. 빠른 패턴 확인
-        quick = await self._check_quick_patterns(user_message)
+        quick = None if skip_quick_patterns else await self._check_quick_patterns(user_message)
         if quick:
             # 빠른 응답은 한 번에 전송
-            yield json.dumps({'type': 'start', 'model': 'cache'})
-            yield json.dumps({'type': 'content', 'text': quick['response']})
-            yield json.dumps({'type': 'end'})
+            yield StartEvent('cache')
+            yield ContentEvent(quick['response'])
+            yield EndEvent()
             return
         
         # 2. 캐시 확인
         cached = self.cache.get(user_message)
         if cached:
-            yield json.dumps({'type': 'start', 'model': 'cache'})
-            yield json.dumps({'type': 'content', 'text': cached})
-            yield json.dumps({'type': 'end'})
+            yield StartEvent('cache')
+            yield ContentEvent(cached)
+            yield EndEvent()
             return
         
         # 3. GPT 스트리밍 API 호출
+        deadline = deadline or Deadline.from_env()
+        full_text = ""
+        usage = None
         try:
-            messages = [{"role": "system", "content": self.system_prompt}]
-            
-            # 프로젝트 컨텍스트 추가
-            if project_context:
-                context_msg = f"""현재 프로젝트 정보:
-- 프로젝트 타입: {project_context.get('project_type', '일반 주택')}
-- 현재 단계: {project_context.get('current_stage', '시공 전')}
-- 예상 공간: {', '.join(project_context.get('expected_spaces', ['거실', '주방', '침실', '욕실']))}"""
-                messages.append({"role": "system", "content": context_msg})
+            if not self.breaker.allow_request():
+                raise CircuitOpenError("openai circuit open")
             
-            # 대화 히스토리 추가
-            if conversation_history:
-                for h in conversation_history[-3:]:  # 최근 3개만 (속도 개선)
-                    if h.get("role") == "user":
-                        messages.append({"role": "user", "content": h.get("content", "")})
-                    elif h.get("role") == "assistant":
-                        messages.append({"role": "assistant", "content": h.get("content", "")})
-            
-            # 현재 메시지
-            messages.append({"role": "user", "content": user_message})
+            # 정적 시스템 프롬프트 → 프로젝트 컨텍스트/지식 → 최근 대화 3개 → 현재 메시지
+            messages = self.prompt_layout.build_messages(user_message, project_context, conversation_history)
             
             # 스트리밍 시작
-            yield json.dumps({'type': 'start', 'model': self.model_name})
-            
-            # GPT 스트리밍 API 호출 (최적화)
-            stream = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=0.5,  # 더 빠른 응답을 위해 낮춤
-                max_tokens=500,   # 토큰 수 줄여서 속도 개선
-                stream=True,
-                presence_penalty=0,
-                frequency_penalty=0
-            )
+            yield StartEvent(self.model_name)
             
-            full_text = ""
-            
-            # 스트리밍 청크 처리
-            async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    text = chunk.choices[0].delta.content
-                    full_text += text
-                    yield json.dumps({'type': 'content', 'text': text})
-                    # 스트리밍 속도 최적화 - sleep 제거 또는 최소화
-                    # await asyncio.sleep(0.01)  # 부드러운 스트리밍
+            # GPT 스트리밍 API 호출 (최적화) - 연결/첫 토큰/토큰 간 타임아웃 적용
+            started_at = time.monotonic()
+            received_tokens = 0
+            try:
+                stream = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model_name,
+                        messages=messages,
+                        temperature=0.5,  # 더 빠른 응답을 위해 낮춤
+                        max_tokens=STREAM_MAX_TOKENS,   # 토큰 수 줄여서 속도 개선
+                        stream=True,
+                        stream_options={"include_usage": True},  # 마지막 청크에 토큰 사용량
+                        presence_penalty=0,
+                        frequency_penalty=0,
+                        timeout=self._request_timeout(deadline)
+                    ),
+                    deadline.first_token_timeout()
+                )
+                record("openai_connect", time.monotonic() - started_at)
+                
+                # 스트리밍 청크 처리 (중간에 빠져나가면 업스트림 스트림도 닫힘)
+                async with aclosing(timed_stream(
+                    stream, deadline,
+                    is_token=lambda c: bool(c.choices and c.choices[0].delta.content),
+                    started_at=started_at
+                )) as chunks:
+                    async for chunk in chunks:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            text = chunk.choices[0].delta.content
+                            if not received_tokens:
+                                record("openai_ttft", time.monotonic() - started_at)
+                            full_text += text
+                            received_tokens += 1  # 스트림 델타 1개 ≈ 1 토큰
+                            yield ContentEvent(text)
+                            # 스트리밍 속도 최적화 - sleep 제거 또는 최소화
+                            # await asyncio.sleep(0.01)  # 부드러운 스트리밍
+                        if getattr(chunk, "usage", None):
+                            usage = usage_from_openai(chunk.usage)
+            except (asyncio.CancelledError, GeneratorExit):
+                # 클라이언트 연결 끊김/헤지 패배로 취소 - 실패로 집계하지 않고 절약 토큰만 기록
+                self.prompt_engine.record_cancelled("openai", received_tokens, STREAM_MAX_TOKENS)
+                raise
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            self.prompt_engine.record_usage("openai", usage)
             
             # 캐시에 저장
             if full_text:
                 self.cache.set(user_message, full_text)
             
-            # 스트리밍 종료
-            yield json.dumps({'type': 'end'})
+            # 스트리밍 종료 (프롬프트/캐시 토큰 사용량 포함)
+            yield EndEvent(usage=usage)
             
         except Exception as e:
             print(f"GPT 스트리밍 오류: {e}")
+            if full_text:
+                # 이미 전송된 부분 응답은 유지하고 종료
+                yield EndEvent()
+                return
             # 폴백 응답
-            yield json.dumps({'type': 'content', 'text': '네, 실장님. 말씀하신 내용 확인했어요. 구체적으로 어떤 도움이 필요하신가요?'})
-            yield json.dumps({'type': 'end'})
+            yield ContentEvent('네, 실장님. 말씀하신 내용 확인했어요. 구체적으로 어떤 도움이 필요하신가요?', fallback=True)
+            yield EndEvent()
 
 # 싱글톤 인스턴스
 _gpt_service = None
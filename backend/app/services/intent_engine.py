@@ -0,0 +1,228 @@
+"""
+빠른 응답 인텐트 엔진
+- app/knowledge/intent_rules.json 규칙을 Aho-Corasick 오토마톤으로 컴파일
+- 우선순위, 길이 제한, 한국어 정규화 (NFKC, 공백/문장부호 제거, 반복 문자 축약)
+- 짧은 키워드(네, 응, 감사, 하이 …)는 token_keywords: 어절 전체가 일치할 때만 (누수됐'네', '응'급상황 오탐 방지)
+- passthrough_keywords (하자/긴급 상황, 질문) 나 물음표가 들어간 메시지는 빠른 응답 없이 항상 LLM 으로
+- GPTService / UnifiedGeminiService / 라우터가 공유하는 단일 판별 로직
+"""
+
+import os
+import re
+import json
+import random
+import logging
+import unicodedata
+from collections import deque
+from typing import Dict, Optional, List, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "knowledge", "intent_rules.json")
+
+
+_STRIP_RE = re.compile(r"[\W_]+")
+_REPEAT_RE = re.compile(r"(.)\1{2,}")
+
+
+def normalize_message(message: str) -> str:
+    """한국어 메시지 정규화
+
+    - NFKC (전각 문자, 호환 자모 통일) + 소문자
+    - 공백/문장부호/기호(이모지 포함) 제거
+    - 같은 문자 3회 이상 반복은 2회로 축약 (ㅋㅋㅋㅋ → ㅋㅋ, 감사!!! → 감사)
+    """
+    text = _STRIP_RE.sub("", unicodedata.normalize("NFKC", message).lower())
+    return _REPEAT_RE.sub(r"\1\1", text)
+
+
+class AhoCorasick:
+    """다중 패턴 부분 문자열 매칭 오토마톤"""
+
+    def __init__(self, patterns: List[Tuple[str, Any]]):
+        """
+        Args:
+            patterns: (패턴 문자열, 페이로드) 목록
+        """
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Any]] = [[]]
+
+        for pattern, payload in patterns:
+            if pattern:
+                self._add(pattern, payload)
+        self._build()
+
+    def _add(self, pattern: str, payload: Any):
+        state = 0
+        for ch in pattern:
+            next_state = self.goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][ch] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append(payload)
+
+    def _build(self):
+        """BFS로 실패 링크 계산 및 출력 병합"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def search(self, text: str) -> List[Any]:
+        """텍스트에 등장하는 모든 패턴의 페이로드 (등장 순서)"""
+        state = 0
+        found = []
+        goto, fail, output = self.goto, self.fail, self.output
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.extend(output[state])
+        return found
+
+
+class IntentEngine:
+    """규칙 파일 기반 빠른 응답 판별기"""
+
+    def __init__(self, rules_path: str = RULES_PATH):
+        self.rules_path = rules_path
+        self.rules: List[Dict[str, Any]] = []
+        self.automaton = AhoCorasick([])
+        self.passthrough = AhoCorasick([])
+        self.token_keywords: Dict[str, List[int]] = {}
+        self.token_suffixes: List[str] = [""]
+        self.max_rule_length = 0
+
+        # 통계
+        self.checks = 0
+        self.hits = 0
+        self.passthrough_hits = 0
+        self.hits_by_intent: Dict[str, int] = {}
+
+        self.load()
+
+    def load(self):
+        """규칙 파일을 읽어 오토마톤으로 컴파일"""
+        with open(self.rules_path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        rules = []
+        patterns = []
+        token_keywords: Dict[str, List[int]] = {}
+        for index, rule in enumerate(data.get("rules", [])):
+            compiled = {
+                "intent": rule["intent"],
+                "priority": rule.get("priority", 0),
+                "min_length": rule.get("min_length", 0),
+                "max_length": rule.get("max_length", 1000),
+                "responses": rule.get("responses", []),
+                "index": index
+            }
+            rules.append(compiled)
+            for keyword in rule.get("keywords", []):
+                patterns.append((normalize_message(keyword), index))
+            for keyword in rule.get("token_keywords", []):
+                token_keywords.setdefault(normalize_message(keyword), []).append(index)
+
+        self.rules = rules
+        self.automaton = AhoCorasick(patterns)
+        self.token_keywords = token_keywords
+        # 긴 어미부터 (감사합니다 → 감사 + 합니다)
+        self.token_suffixes = sorted({normalize_message(s) for s in data.get("token_suffixes", [])} | {""},
+                                     key=len, reverse=True)
+        self.passthrough = AhoCorasick(
+            [(normalize_message(keyword), True) for keyword in data.get("passthrough_keywords", [])]
+        )
+        self.max_rule_length = max((r["max_length"] for r in rules), default=0)
+        logger.info(f"🧭 Intent rules loaded: {len(rules)} rules, "
+                    f"{len(patterns) + len(token_keywords)} keywords")
+
+    def match(self, message: str) -> Optional[Dict[str, Any]]:
+        """빠른 응답 인텐트 판별 (요청당 한 번만 호출)
+
+        Returns:
+            {"intent", "response", "priority", "source": "intent"} 또는 None
+        """
+        self.checks += 1
+
+        # 정규화 전에도 명백히 긴 메시지는 바로 제외 (공백/기호 포함 여유 4배)
+        if len(message) > self.max_rule_length * 4:
+            return None
+        normalized = normalize_message(message)
+
+        # 모든 규칙의 길이 제한보다 긴 메시지는 스캔하지 않음
+        if not normalized or len(normalized) > self.max_rule_length:
+            return None
+
+        # 하자/긴급 상황이나 질문은 키워드가 겹쳐도 LLM 이 답해야 함 (물음표는 정규화 전에 확인)
+        if "?" in message or "？" in message or self.passthrough.search(normalized):
+            self.passthrough_hits += 1
+            return None
+
+        candidates = set(self.automaton.search(normalized))
+        if self.token_keywords:
+            for token in message.split():
+                candidates.update(self._match_token(normalize_message(token)))
+
+        best = None
+        for index in candidates:
+            rule = self.rules[index]
+            if not rule["min_length"] <= len(normalized) <= rule["max_length"]:
+                continue
+            if best is None or (rule["priority"], -rule["index"]) > (best["priority"], -best["index"]):
+                best = rule
+
+        if best is None or not best["responses"]:
+            return None
+
+        self.hits += 1
+        self.hits_by_intent[best["intent"]] = self.hits_by_intent.get(best["intent"], 0) + 1
+        return {
+            "intent": best["intent"],
+            "response": random.choice(best["responses"]),
+            "priority": best["priority"],
+            "source": "intent"
+        }
+
+    def _match_token(self, token: str) -> List[int]:
+        """어절 하나가 token_keywords (+ 허용 어미) 와 정확히 같은지"""
+        for suffix in self.token_suffixes:
+            if len(token) > len(suffix) and token.endswith(suffix):
+                indices = self.token_keywords.get(token[:len(token) - len(suffix)] if suffix else token)
+                if indices:
+                    return indices
+        return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        hit_rate = (self.hits / self.checks * 100) if self.checks else 0
+        return {
+            "rules": len(self.rules),
+            "checks": self.checks,
+            "hits": self.hits,
+            "passthrough": self.passthrough_hits,
+            "hit_rate": f"{hit_rate:.1f}%",
+            "hits_by_intent": dict(self.hits_by_intent)
+        }
+
+
+# 싱글톤 인스턴스
+_intent_engine: Optional[IntentEngine] = None
+
+def get_intent_engine() -> IntentEngine:
+    """인텐트 엔진 인스턴스 가져오기"""
+    global _intent_engine
+    if _intent_engine is None:
+        _intent_engine = IntentEngine()
+    return _intent_engine
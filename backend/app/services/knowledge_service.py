@@ -0,0 +1,252 @@
+"""
+인테리어 지식 검색 서비스
+- app/knowledge/interior_context.json 을 스니펫 단위로 컴파일
+- 시공 단계/자재/하자/안전/품질 키워드 역색인 (Aho-Corasick 으로 한 번에 스캔)
+- 요청마다 관련 스니펫 몇 개만 프롬프트에 주입 (ChatMessage.rag_context 기록)
+- 파일 변경 시 자동 재로딩
+"""
+
+import os
+import json
+import time
+import logging
+from typing import Dict, Optional, List, Any
+
+from app.services.intent_engine import AhoCorasick, normalize_message
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "knowledge", "interior_context.json")
+
+# 영문 키 → 한국어 검색어 (interior_context.json 에 한국어 이름이 없는 항목)
+KEYWORD_ALIASES: Dict[str, List[str]] = {
+    # 자재
+    "flooring": ["바닥재", "바닥", "마루"],
+    "paint": ["페인트", "도장", "도색"],
+    "hardwood": ["원목", "원목마루", "hardwood"],
+    "laminate": ["강화마루", "라미네이트", "laminate"],
+    "tile": ["타일", "tile"],
+    "water_based": ["수성", "수성페인트"],
+    "oil_based": ["유성", "유성페인트"],
+    # 하자/문제
+    "mold": ["곰팡이", "결로"],
+    "cracks": ["균열", "크랙", "갈라"],
+    "water_damage": ["누수", "물샘", "물새"],
+    "noise": ["소음", "층간소음", "민원"],
+    # 안전
+    "general": ["안전", "안전모", "안전화"],
+    "electrical": ["전기", "감전", "누전"],
+    "demolition": ["철거", "분진"],
+    "chemical": ["화학", "약품", "접착제", "본드", "유해"],
+    # 품질 기준
+    "painting": ["도장", "페인트", "도색", "붓자국"],
+}
+
+MATERIAL_NAMES = {
+    "hardwood": "원목마루", "laminate": "강화마루", "tile": "타일",
+    "water_based": "수성 페인트", "oil_based": "유성 페인트",
+}
+
+QUALITY_LABELS = {
+    "levelness": "수평", "gap": "이음새", "moisture": "수분",
+    "coverage": "도막", "finish": "마감", "color": "색상",
+}
+
+
+def _join(items: Optional[List[str]]) -> str:
+    return ", ".join(items or [])
+
+
+def compile_snippets(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """지식 JSON → [{id, category, text, keywords}] 스니펫 목록"""
+    snippets = []
+    stages = data.get("construction_stages", {})
+
+    for key, stage in stages.items():
+        parts = [f"[시공 단계] {stage.get('description', key)}"]
+        if stage.get("duration"):
+            parts.append(f"기간 {stage['duration']}")
+        if stage.get("precautions"):
+            parts.append(f"주의: {_join(stage['precautions'])}")
+        next_stage = stages.get(stage.get("next_stage") or "", {})
+        if next_stage:
+            parts.append(f"다음 단계: {next_stage.get('description')}")
+        snippets.append({
+            "id": f"stage:{key}",
+            "category": "stage",
+            "text": " / ".join(parts),
+            "keywords": stage.get("keywords", []) + [stage.get("description", "")]
+        })
+
+    for key, issue in data.get("common_issues", {}).items():
+        parts = [f"[하자] {issue.get('description', key)}", f"해결: {_join(issue.get('solutions'))}"]
+        for field, label in (("prevention", "예방"), ("emergency", "응급"), ("types", "유형")):
+            if issue.get(field):
+                parts.append(f"{label}: {_join(issue[field])}")
+        snippets.append({
+            "id": f"issue:{key}",
+            "category": "issue",
+            "text": " / ".join(parts),
+            "keywords": KEYWORD_ALIASES.get(key, []) + issue.get("types", [])
+        })
+
+    for category, materials in data.get("materials", {}).items():
+        for key, material in materials.items():
+            name = MATERIAL_NAMES.get(key, key)
+            parts = [f"[자재] {name}", f"장점: {_join(material.get('pros'))}", f"단점: {_join(material.get('cons'))}"]
+            if material.get("lifespan"):
+                parts.append(f"수명 {material['lifespan']}")
+            if material.get("dry_time"):
+                parts.append(f"건조 {material['dry_time']}")
+            snippets.append({
+                "id": f"material:{category}:{key}",
+                "category": "material",
+                "text": " / ".join(parts),
+                "keywords": KEYWORD_ALIASES.get(key, []) + KEYWORD_ALIASES.get(category, [])[:1]
+            })
+
+    for key, rules in data.get("safety_guidelines", {}).items():
+        snippets.append({
+            "id": f"safety:{key}",
+            "category": "safety",
+            "text": f"[안전 수칙] {_join(rules)}",
+            "keywords": KEYWORD_ALIASES.get(key, []) + ["안전"]
+        })
+
+    for key, standards in data.get("quality_standards", {}).items():
+        items = [f"{QUALITY_LABELS.get(k, k)} {v}" for k, v in standards.items()]
+        snippets.append({
+            "id": f"quality:{key}",
+            "category": "quality",
+            "text": f"[품질 기준] {_join(items)}",
+            "keywords": KEYWORD_ALIASES.get(key, []) + [QUALITY_LABELS.get(k, k) for k in standards] + ["품질", "기준", "하자"]
+        })
+
+    return snippets
+
+
+class KnowledgeIndex:
+    """스니펫 역색인 (키워드 → 스니펫)"""
+
+    def __init__(self, snippets: List[Dict[str, Any]]):
+        self.snippets = snippets
+        postings: Dict[str, List[int]] = {}
+        for index, snippet in enumerate(snippets):
+            for keyword in snippet["keywords"]:
+                term = normalize_message(keyword)
+                if term and index not in postings.setdefault(term, []):
+                    postings[term].append(index)
+
+        self.postings = postings
+        # 흔한 키워드일수록 낮은 가중치 (idf)
+        self.weights = {term: 1.0 / len(ids) for term, ids in postings.items()}
+        self.automaton = AhoCorasick([(term, term) for term in postings])
+
+    def search(self, message: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        scores: Dict[int, float] = {}
+        for term in set(self.automaton.search(normalize_message(message))):
+            # 긴 키워드일수록 구체적
+            weight = self.weights[term] * min(len(term), 4)
+            for index in self.postings[term]:
+                scores[index] = scores.get(index, 0.0) + weight
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [
+            {"id": self.snippets[i]["id"], "text": self.snippets[i]["text"], "score": round(score, 3)}
+            for i, score in ranked
+        ]
+
+
+class KnowledgeService:
+    """interior_context.json 기반 검색 (파일 변경 시 재로딩)"""
+
+    def __init__(self, path: str = KNOWLEDGE_PATH, reload_interval: float = 5.0):
+        """
+        Args:
+            path: 지식 JSON 경로
+            reload_interval: 파일 변경 확인 주기 (초)
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self.index = KnowledgeIndex([])
+        self._mtime = 0.0
+        self._checked_at = 0.0
+
+        # 통계
+        self.retrievals = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.reloads = 0
+
+        self._reload_if_changed(force=True)
+
+    def _reload_if_changed(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+            if not force and mtime == self._mtime:
+                return
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.index = KnowledgeIndex(compile_snippets(data))
+            self._mtime = mtime
+            self.reloads += 1
+            logger.info(f"📚 Knowledge index loaded: {len(self.index.snippets)} snippets, {len(self.index.postings)} terms")
+        except Exception as e:
+            # 잘못된 파일이면 기존 인덱스 유지
+            logger.error(f"Knowledge load error: {e}")
+
+    def retrieve(self, message: str, top_k: int = 3) -> Dict[str, Any]:
+        """메시지와 관련된 지식 스니펫 검색
+
+        Returns:
+            {"snippets": [{id, text, score}], "retrieval_ms": float}
+        """
+        start = time.perf_counter()
+        self._reload_if_changed()
+        snippets = self.index.search(message, top_k=top_k)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.retrievals += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+        return {"snippets": snippets, "retrieval_ms": round(elapsed_ms, 3)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "snippets": len(self.index.snippets),
+            "terms": len(self.index.postings),
+            "reloads": self.reloads,
+            "retrievals": self.retrievals,
+            "avg_retrieval_ms": round(self.total_ms / self.retrievals, 3) if self.retrievals else 0.0,
+            "max_retrieval_ms": round(self.max_ms, 3)
+        }
+
+
+def to_rag_context(knowledge: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """ChatMessage.rag_context 에 기록할 내용 (스니펫이 없으면 None)"""
+    if not knowledge.get("snippets"):
+        return None
+    return {
+        "source": "interior_context",
+        "snippet_ids": [s["id"] for s in knowledge["snippets"]],
+        "retrieval_ms": knowledge.get("retrieval_ms")
+    }
+
+
+# 싱글톤 인스턴스
+_knowledge_service: Optional[KnowledgeService] = None
+
+def get_knowledge_service() -> KnowledgeService:
+    """지식 검색 서비스 인스턴스 가져오기"""
+    global _knowledge_service
+    if _knowledge_service is None:
+        _knowledge_service = KnowledgeService(
+            reload_interval=float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", "5"))
+        )
+    return _knowledge_service
@@ -0,0 +1,464 @@
+"""
+LLM 프로바이더 라우터
+- OpenAI(GPTService) / Gemini(UnifiedGeminiService) 통합 라우팅
+- 프로바이더/모델별 EWMA TTFT(첫 토큰 시간) 및 에러율 추적
+- 가장 빠른 정상 프로바이더 우선, 실패 시 다음 프로바이더로 폴백
+- 지연 민감 요청은 p95 기반 지연 후 헤지(hedged) 요청 전송
+- 선택된 스트림의 토큰 프레임은 시간/크기 윈도우로 병합 (stream_coalescer)
+- 라우팅 결정/헤지 결과는 /metrics (tevor_llm_router_decisions_total, tevor_llm_hedges_total)
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Optional, List, Any, AsyncGenerator, Callable, Tuple
+
+from app.services.intent_engine import get_intent_engine
+from app.services.resilience import Deadline, CircuitBreaker, get_breaker
+from app.services.stream_events import StreamEvent, StartEvent, ContentEvent, EndEvent
+from app.services.stream_coalescer import get_stream_coalescer
+from app.services.metrics import get_metrics, llm_ttft, llm_latency, llm_attempts
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_TEXT = "네, 실장님. 말씀하신 내용 확인했어요. 구체적으로 어떤 도움이 필요하신가요?"
+
+_DONE = object()
+_FLUSH = object()
+
+
+def _default_providers() -> Dict[str, Callable[[], Any]]:
+    """기본 프로바이더 팩토리 (지연 import)"""
+    def openai_factory():
+        from app.services.gpt_service import get_gpt_service
+        return get_gpt_service()
+
+    def gemini_factory():
+        from app.services.gemini_service import get_gemini_service
+        return get_gemini_service()
+
+    return {"openai": openai_factory, "gemini": gemini_factory}
+
+
+class ProviderStats:
+    """프로바이더/모델별 지연시간 및 에러율 통계"""
+
+    def __init__(self, alpha: float = 0.2, window: int = 200):
+        """
+        Args:
+            alpha: EWMA 가중치 (클수록 최근 값 반영)
+            window: p95 계산용 TTFT 샘플 수
+        """
+        self.alpha = alpha
+        self.ewma_ttft: Optional[float] = None
+        self.ewma_error_rate = 0.0
+        self.ttft_samples: deque = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+
+    def record_success(self, ttft: float):
+        self.requests += 1
+        self.ttft_samples.append(ttft)
+        if self.ewma_ttft is None:
+            self.ewma_ttft = ttft
+        else:
+            self.ewma_ttft = self.alpha * ttft + (1 - self.alpha) * self.ewma_ttft
+        self.ewma_error_rate = (1 - self.alpha) * self.ewma_error_rate
+
+    def record_lower_bound(self, elapsed: float):
+        """헤지에서 진 시도 - TTFT가 최소 elapsed 이상임만 반영"""
+        if self.ewma_ttft is None or elapsed > self.ewma_ttft:
+            self.ewma_ttft = elapsed if self.ewma_ttft is None else (
+                self.alpha * elapsed + (1 - self.alpha) * self.ewma_ttft
+            )
+
+    def record_error(self):
+        self.requests += 1
+        self.errors += 1
+        self.ewma_error_rate = self.alpha + (1 - self.alpha) * self.ewma_error_rate
+
+    def p95_ttft(self) -> Optional[float]:
+        if not self.ttft_samples:
+            return None
+        samples = sorted(self.ttft_samples)
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        p95 = self.p95_ttft()
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "ewma_ttft_ms": round(self.ewma_ttft * 1000, 1) if self.ewma_ttft is not None else None,
+            "p95_ttft_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "ewma_error_rate": round(self.ewma_error_rate, 3)
+        }
+
+
+class _Attempt:
+    """한 프로바이더에 대한 스트리밍 시도"""
+
+    def __init__(self, name: str, service: Any, args: Tuple):
+        self.name = name
+        self.model = getattr(service, "model_name", "unknown")
+        self.service = service
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.buffer: List[StreamEvent] = []
+        self.started_at = time.perf_counter()
+        self.task = asyncio.create_task(self._pump(args))
+        self._first_token_task: Optional[asyncio.Task] = None
+
+    async def _pump(self, args: Tuple):
+        """프로바이더 스트림을 큐로 전달"""
+        stream = None
+        try:
+            # 빠른 응답 판별은 라우터에서 이미 수행함
+            stream = self.service.generate_stream(*args, skip_quick_patterns=True)
+            async for chunk in stream:
+                await self.queue.put(chunk)
+        except Exception as e:
+            await self.queue.put(e)
+        finally:
+            if stream is not None:
+                await stream.aclose()
+            await self.queue.put(_DONE)
+
+    async def first_token(self) -> str:
+        """첫 컨텐츠까지 이벤트를 버퍼링
+
+        Returns:
+            'content' (정상 첫 토큰) 또는 'failed' (예외/폴백/빈 응답)
+        """
+        while True:
+            item = await self.queue.get()
+            if item is _DONE or isinstance(item, Exception):
+                if isinstance(item, Exception):
+                    logger.warning(f"{self.name} 스트림 오류: {item}")
+                return "failed"
+
+            self.buffer.append(item)
+            if isinstance(item, StartEvent):
+                self.model = item.model
+            elif isinstance(item, ContentEvent):
+                return "failed" if item.fallback else "content"
+
+    def first_token_task(self) -> asyncio.Task:
+        """첫 토큰 대기 태스크 (큐를 읽는 소비자는 항상 하나)"""
+        if self._first_token_task is None:
+            self._first_token_task = asyncio.create_task(self.first_token())
+        return self._first_token_task
+
+    def cancel(self):
+        if self._first_token_task is not None:
+            self._first_token_task.cancel()
+        self.task.cancel()
+
+
+class ProviderRouter:
+    """지연시간 기반 멀티 프로바이더 라우터"""
+
+    def __init__(self, providers: Optional[Dict[str, Callable[[], Any]]] = None):
+        self.providers = providers or _default_providers()
+
+        # 프로바이더 우선순위 (동점일 때 사용)
+        order = os.getenv("LLM_PROVIDERS", "openai,gemini")
+        self.order = [p.strip() for p in order.split(",") if p.strip() in self.providers]
+
+        # 라우팅/헤지 설정
+        self.error_threshold = float(os.getenv("LLM_ERROR_THRESHOLD", "0.5"))
+        self.hedge_enabled = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_min_delay = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.3"))
+        self.hedge_default_delay = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "1.5"))
+        self.retry_unavailable_after = 60.0
+
+        self.stats: Dict[Tuple[str, str], ProviderStats] = {}
+        self._services: Dict[str, Any] = {}
+        self._unavailable: Dict[str, float] = {}
+
+        # 라우팅 메트릭
+        self.decisions: Dict[str, int] = {}
+        self.hedges_launched = 0
+        self.hedge_wins = {"primary": 0, "hedge": 0}
+
+    def _get_service(self, name: str) -> Optional[Any]:
+        """프로바이더 인스턴스 조회 (API 키 미설정 등은 일정 시간 제외)"""
+        if name in self._services:
+            return self._services[name]
+
+        failed_at = self._unavailable.get(name)
+        if failed_at and time.time() - failed_at < self.retry_unavailable_after:
+            return None
+
+        try:
+            service = self.providers[name]()
+        except Exception as e:
+            logger.warning(f"{name} 프로바이더 사용 불가: {e}")
+            self._unavailable[name] = time.time()
+            return None
+
+        self._services[name] = service
+        self._unavailable.pop(name, None)
+        return service
+
+    def _get_stats(self, name: str, model: str) -> ProviderStats:
+        key = (name, model)
+        if key not in self.stats:
+            self.stats[key] = ProviderStats()
+        return self.stats[key]
+
+    def rank(self) -> List[Tuple[str, Any]]:
+        """사용 가능한 프로바이더를 빠른 순으로 정렬 (비정상은 마지막)"""
+        candidates = []
+        for index, name in enumerate(self.order):
+            service = self._get_service(name)
+            if service is None:
+                continue
+            stats = self._get_stats(name, getattr(service, "model_name", "unknown"))
+            unhealthy = (
+                get_breaker(name).state == CircuitBreaker.OPEN
+                or (stats.requests >= 3 and stats.ewma_error_rate > self.error_threshold)
+            )
+            # 측정값이 없는 프로바이더는 0으로 두어 한 번은 시도되도록 함
+            ttft = stats.ewma_ttft if stats.ewma_ttft is not None else 0.0
+            candidates.append(((unhealthy, ttft, index), name, service))
+
+        candidates.sort(key=lambda c: c[0])
+        return [(name, service) for _, name, service in candidates]
+
+    def _hedge_delay(self, name: str, service: Any) -> float:
+        """p95 TTFT 기반 헤지 지연시간"""
+        p95 = self._get_stats(name, getattr(service, "model_name", "unknown")).p95_ttft()
+        if p95 is None:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, p95)
+
+    def _record(self, attempt: _Attempt, outcome: str):
+        """시도 결과 기록 (캐시/빠른 응답은 지연시간 통계 제외)"""
+        if attempt.model == "cache":
+            return
+        stats = self._get_stats(attempt.name, attempt.model)
+        llm_attempts.labels(attempt.name, outcome).inc()
+        if outcome == "content":
+            ttft = time.perf_counter() - attempt.started_at
+            stats.record_success(ttft)
+            llm_ttft.labels(attempt.name).observe(ttft)
+        else:
+            stats.record_error()
+
+    async def _race(self, primary: _Attempt, hedge: _Attempt) -> Tuple[Optional[_Attempt], List[_Attempt]]:
+        """두 시도 중 먼저 첫 토큰을 받은 쪽을 선택"""
+        waiters = {
+            primary.first_token_task(): primary,
+            hedge.first_token_task(): hedge
+        }
+        failed = []
+        while waiters:
+            done, _ = await asyncio.wait(waiters.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for waiter in done:
+                attempt = waiters.pop(waiter)
+                outcome = waiter.result()
+                self._record(attempt, outcome)
+                if outcome == "content":
+                    return attempt, failed
+                failed.append(attempt)
+        return None, failed
+
+    async def generate_stream(self,
+                              user_message: str,
+                              project_context: Optional[Dict] = None,
+                              conversation_history: Optional[List] = None,
+                              hedge: Optional[bool] = None,
+                              deadline: Optional[Deadline] = None) -> AsyncGenerator[StreamEvent, None]:
+        """라우팅된 스트리밍 응답 생성 (GPTService.generate_stream과 동일한 이벤트 형식)
+
+        모든 시도(폴백/헤지 포함)가 하나의 종단 간 데드라인을 공유한다.
+        """
+        # 빠른 응답 판별 (요청당 한 번) - 맞으면 LLM 호출 없이 로컬 응답
+        quick = get_intent_engine().match(user_message)
+        if quick:
+            self.decisions["local"] = self.decisions.get("local", 0) + 1
+            yield StartEvent('cache', intent=quick['intent'])
+            yield ContentEvent(quick['response'])
+            yield EndEvent()
+            return
+
+        deadline = deadline or Deadline.from_env()
+        args = (user_message, project_context, conversation_history, deadline)
+        hedge = self.hedge_enabled if hedge is None else hedge
+
+        candidates = self.rank()
+        attempts: List[_Attempt] = []
+        winner: Optional[_Attempt] = None
+        last_failed: Optional[_Attempt] = None
+
+        try:
+            while candidates and winner is None and not deadline.expired:
+                name, service = candidates.pop(0)
+                primary = _Attempt(name, service, args)
+                attempts.append(primary)
+
+                if hedge and candidates:
+                    delay = min(self._hedge_delay(name, service), deadline.remaining())
+                    done, _ = await asyncio.wait({primary.first_token_task()}, timeout=delay)
+                    outcome = primary.first_token_task().result() if done else None
+
+                    if outcome is None:
+                        # 지연 초과 - 헤지 요청 전송 후 먼저 도착한 쪽 채택
+                        hedge_name, hedge_service = candidates.pop(0)
+                        secondary = _Attempt(hedge_name, hedge_service, args)
+                        attempts.append(secondary)
+                        self.hedges_launched += 1
+
+                        winner, failed = await self._race(primary, secondary)
+                        if failed:
+                            last_failed = failed[-1]
+                        if winner is not None:
+                            self.hedge_wins["primary" if winner is primary else "hedge"] += 1
+                        continue
+                else:
+                    outcome = await primary.first_token_task()
+
+                self._record(primary, outcome)
+                if outcome == "content":
+                    winner = primary
+                else:
+                    last_failed = primary
+
+            if winner is None:
+                # 모든 프로바이더 실패 - 마지막 폴백 응답 또는 기본 폴백
+                self.decisions["fallback"] = self.decisions.get("fallback", 0) + 1
+                if last_failed and any(isinstance(e, ContentEvent) for e in last_failed.buffer):
+                    for event in last_failed.buffer:
+                        yield event
+                else:
+                    yield StartEvent('fallback')
+                    yield ContentEvent(FALLBACK_TEXT, fallback=True)
+                yield EndEvent()
+                return
+
+            decision = "local" if winner.model == "cache" else winner.name
+            self.decisions[decision] = self.decisions.get(decision, 0) + 1
+
+            # 패배한 시도는 즉시 취소 (첫 토큰 전이면 지연시간 하한만 기록)
+            for attempt in attempts:
+                if attempt is not winner:
+                    if not attempt.first_token_task().done():
+                        self._get_stats(attempt.name, attempt.model).record_lower_bound(
+                            time.perf_counter() - attempt.started_at
+                        )
+                    attempt.cancel()
+
+            # 토큰 프레임 병합 - 첫 토큰은 즉시, 이후는 윈도우 마감 타이머가 큐에 _FLUSH 를 넣음
+            batch = get_stream_coalescer().buffer(lambda: winner.queue.put_nowait(_FLUSH))
+            for event in winner.buffer:
+                for out in batch.add(event):
+                    yield out
+
+            while True:
+                item = await winner.queue.get()
+                if item is _FLUSH:
+                    for out in batch.flush():
+                        yield out
+                    continue
+                if item is _DONE:
+                    for out in batch.flush():
+                        yield out
+                    if winner.model != "cache":
+                        llm_latency.labels(winner.name).observe(time.perf_counter() - winner.started_at)
+                    break
+                if isinstance(item, Exception):
+                    logger.warning(f"{winner.name} 스트림 중단: {item}")
+                    for out in batch.add(EndEvent()):
+                        yield out
+                    break
+                for out in batch.add(item):
+                    yield out
+
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def generate_response(self,
+                                user_message: str,
+                                project_context: Optional[Dict] = None,
+                                conversation_history: Optional[List] = None,
+                                hedge: Optional[bool] = None,
+                                deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """라우팅된 일반 응답 생성 (비스트리밍)"""
+        response_text = ""
+        model = "unknown"
+        fallback = False
+        usage = None
+
+        async for event in self.generate_stream(user_message, project_context, conversation_history, hedge, deadline):
+            if isinstance(event, StartEvent):
+                model = event.model
+            elif isinstance(event, ContentEvent):
+                response_text += event.text
+                fallback = fallback or event.fallback
+            elif isinstance(event, EndEvent):
+                usage = event.usage or usage
+
+        return {
+            "success": True,
+            "response": response_text,
+            "model": model,
+            "provider": self._provider_for(model),
+            "quick_response": model == "cache",
+            "fallback": fallback,
+            "usage": usage
+        }
+
+    def _provider_for(self, model: str) -> str:
+        for name, service in self._services.items():
+            if getattr(service, "model_name", None) == model:
+                return name
+        return "local"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """라우팅 통계"""
+        total_hedges = self.hedge_wins["primary"] + self.hedge_wins["hedge"]
+        return {
+            "providers": {
+                f"{name}:{model}": stats.to_dict()
+                for (name, model), stats in self.stats.items()
+            },
+            "decisions": dict(self.decisions),
+            "hedges_launched": self.hedges_launched,
+            "hedge_wins": dict(self.hedge_wins),
+            "hedge_win_rate": f"{(self.hedge_wins['hedge'] / total_hedges * 100) if total_hedges else 0:.1f}%"
+        }
+
+
+# 싱글톤 인스턴스
+_llm_router: Optional[ProviderRouter] = None
+
+def get_llm_router() -> ProviderRouter:
+    """라우터 인스턴스 가져오기"""
+    global _llm_router
+    if _llm_router is None:
+        _llm_router = ProviderRouter()
+    return _llm_router
+
+
+def _register_router_metrics():
+    registry = get_metrics()
+    decisions = registry.counter("tevor_llm_router_decisions_total",
+                                 "Routing decisions (local quick reply, provider, fallback)", ["decision"])
+    hedges = registry.counter("tevor_llm_hedges_total", "Hedged requests by winning attempt", ["winner"])
+    hedges_launched = registry.counter("tevor_llm_hedges_launched_total", "Hedge attempts started")
+
+    def collect():
+        if _llm_router is None:
+            return
+        for decision, count in _llm_router.decisions.items():
+            decisions.labels(decision).set(count)
+        for winner, count in _llm_router.hedge_wins.items():
+            hedges.labels(winner).set(count)
+        hedges_launched.set(_llm_router.hedges_launched)
+
+    registry.add_collector(collect)
+
+
+_register_router_metrics()
@@ -0,0 +1,483 @@
+"""
+메트릭 레지스트리 (Prometheus 텍스트 형식)
+- 카운터/게이지/히스토그램 + 스크레이프 시점에 기존 get_stats() 값을 옮기는 수집기
+- 캐시(적중/실패/크기/축출), DB 풀(체크아웃/대기 시간), LLM 프로바이더별 TTFT/전체 지연,
+  이미지 처리 단계별 시간, 진행 중인 스트림
+- 워커마다 스냅샷 파일을 METRICS_DIR 에 주기적으로 기록하고 /metrics 에서 합산 (gunicorn 다중 워커,
+  같은 PID 네임스페이스의 워커끼리만 공유)
+- 워커 메모리 (rss/pss/private) - --preload fork 후 공유 상태 확인용
+- 종료된 워커의 스냅샷은 바로 삭제 (PID 확인), 응답 없는 워커는 METRICS_STALE_SECONDS 후 제외
+  (카운터는 재시작처럼 보임 - Prometheus 가 처리), 마스터가 끝난 이전 기본 디렉터리도 정리
+- 메모리 상태 수집은 이벤트 루프에서, 스냅샷 파일 쓰기/읽기/합산은 스레드에서 (render_async)
+"""
+
+import os
+import json
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterator, Sequence
+
+logger = logging.getLogger(__name__)
+
+# 기본 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_TTFT_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+LLM_LATENCY_BUCKETS = (0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class _Value:
+    """카운터/게이지 시계열 1개"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        # 카운터는 수집기가 기존 누적값을 옮길 때만 사용
+        self.value = float(value)
+
+    def dump(self) -> float:
+        return self.value
+
+
+class _Histogram:
+    """히스토그램 시계열 1개 (버킷별 개수는 누적 전 값으로 보관)"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = 0
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def dump(self) -> Dict[str, Any]:
+        return {"counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+
+class Metric:
+    """메트릭 패밀리 (레이블 값 조합별 시계열)"""
+
+    def __init__(self, name: str, kind: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Optional[Sequence[float]] = None):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets) if buckets else None
+        self._series: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name}: 레이블 {self.label_names} 값이 필요합니다")
+            series = _Histogram(self.buckets) if self.kind == "histogram" else _Value()
+            self._series[key] = series
+        return series
+
+    # 레이블 없는 메트릭용 단축 메서드
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "type": self.kind,
+            "help": self.help,
+            "labels": list(self.label_names),
+            "buckets": list(self.buckets) if self.buckets else None,
+            "series": [[list(key), series.dump()] for key, series in self._series.items()]
+        }
+
+
+class MetricsRegistry:
+    """프로세스(워커) 단위 메트릭 레지스트리"""
+
+    def __init__(self, directory: Optional[str] = None, interval: float = 5.0, stale_after: float = 60.0):
+        """
+        Args:
+            directory: 워커 스냅샷 디렉터리 (없으면 마스터 프로세스별 임시 디렉터리)
+            interval: 스냅샷 기록 주기 (초)
+            stale_after: 이 시간 동안 갱신되지 않은 스냅샷은 종료된 워커로 보고 제외
+        """
+        self._directory = directory
+        self.interval = interval
+        self.stale_after = stale_after
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+        self.caches: Dict[str, Any] = {}
+        self.pools: Dict[str, Any] = {}
+        self._publisher: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "MetricsRegistry":
+        return cls(
+            directory=os.getenv("METRICS_DIR") or None,
+            interval=float(os.getenv("METRICS_PUSH_INTERVAL", "5")),
+            stale_after=float(os.getenv("METRICS_STALE_SECONDS", "60"))
+        )
+
+    @property
+    def directory(self) -> str:
+        # 워커에서 처음 사용할 때 결정 (--preload 로 마스터에서 import 되어도 같은 워커 그룹끼리 공유)
+        if self._directory is None:
+            self._directory = os.path.join(tempfile.gettempdir(), f"tevor-metrics-{os.getppid()}")
+            _remove_dead_directories(tempfile.gettempdir())
+        os.makedirs(self._directory, exist_ok=True)
+        return self._directory
+
+    # =========================
+    # 등록
+    # =========================
+
+    def _register(self, name: str, kind: str, help_text: str, labels: Sequence[str],
+                  buckets: Optional[Sequence[float]] = None) -> Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = Metric(name, kind, help_text, labels, buckets)
+            self.metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Metric:
+        return self._register(name, "counter", help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Metric:
+        return self._register(name, "gauge", help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Metric:
+        return self._register(name, "histogram", help_text, labels, buckets)
+
+    def add_collector(self, collector: Callable[[], None]):
+        """스크레이프/스냅샷 직전에 호출 - 기존 get_stats() 값을 메트릭으로 옮김"""
+        self.collectors.append(collector)
+
+    def track_cache(self, name: str, cache: Any):
+        """get_stats() 에 size/hits/misses/evictions 를 내는 캐시 등록"""
+        self.caches[name] = cache
+
+    def track_pool(self, name: str, engine: Any):
+        """DB 엔진 풀 등록 (dispose 후 새 풀도 따라가도록 엔진을 보관)"""
+        self.pools[name] = engine
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {name: cache.get_stats() for name, cache in self.caches.items()}
+
+    def pool_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for name, engine in self.pools.items():
+            pool = engine.pool
+            stats[name] = {
+                "class": type(pool).__name__,
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                "checkouts": int(_pool_checkouts.labels(name).value),
+                "avg_wait_ms": _avg_ms(_pool_wait.labels(name))
+            }
+        return stats
+
+    # =========================
+    # 스냅샷 / 출력
+    # =========================
+
+    def collect(self):
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"메트릭 수집기 오류: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.collect()
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "metrics": {name: metric.dump() for name, metric in self.metrics.items()}
+        }
+
+    def write_snapshot(self, snapshot: Optional[Dict[str, Any]] = None):
+        """이 워커의 스냅샷을 원자적으로 교체 (snapshot 은 이벤트 루프에서 미리 만든 값)"""
+        directory = self.directory
+        path = os.path.join(directory, f"worker-{os.getpid()}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot or self.snapshot(), f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def _read_snapshots(self) -> List[Dict[str, Any]]:
+        directory = self.directory
+        now = time.time()
+        snapshots = []
+        for filename in os.listdir(directory):
+            if not filename.startswith("worker-"):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                pid = int(filename[len("worker-"):].split(".", 1)[0])
+                if not _pid_alive(pid) or now - os.path.getmtime(path) > self.stale_after:
+                    os.remove(path)
+                    continue
+                if not filename.endswith(".json"):
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
+        """모든 워커를 합산한 Prometheus 텍스트 (카운터/히스토그램/게이지 모두 합계)"""
+        self.write_snapshot(snapshot)
+        snapshots = self._read_snapshots()
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for snapshot in snapshots:
+            for name, family in snapshot["metrics"].items():
+                target = merged.setdefault(name, {**family, "series": {}})
+                for labels, value in family["series"]:
+                    key = tuple(labels)
+                    current = target["series"].get(key)
+                    if family["type"] == "histogram":
+                        if current is None or len(current["counts"]) != len(value["counts"]):
+                            target["series"][key] = value
+                        else:
+                            current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                            current["sum"] += value["sum"]
+                            current["count"] += value["count"]
+                    else:
+                        target["series"][key] = (current or 0.0) + value
+
+        lines = [
+            "# HELP tevor_metrics_workers Worker processes included in this scrape",
+            "# TYPE tevor_metrics_workers gauge",
+            f"tevor_metrics_workers {len(snapshots)}"
+        ]
+        for name in sorted(merged):
+            family = merged[name]
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            label_names = family["labels"]
+            for key, value in family["series"].items():
+                if family["type"] == "histogram":
+                    cumulative = 0
+                    bounds = [_format_value(b) for b in family["buckets"]] + ["+Inf"]
+                    for bound, count in zip(bounds, value["counts"]):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(label_names, key, le=bound)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(label_names, key)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(label_names, key)} {value['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(label_names, key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    async def render_async(self) -> str:
+        """이벤트 루프를 막지 않는 render - 수집은 루프에서 (상태 변경과 겹치지 않게), 파일 IO 는 스레드에서"""
+        return await asyncio.to_thread(self.render, self.snapshot())
+
+    # =========================
+    # 주기적 기록 (워커 수명 동안)
+    # =========================
+
+    def start(self):
+        if self._publisher is None:
+            self._publisher = asyncio.create_task(self._publish_loop())
+
+    async def _publish_loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.write_snapshot, self.snapshot())
+            except Exception as e:
+                logger.warning(f"메트릭 스냅샷 기록 실패: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        """워커 종료 - 기록 중단 후 스냅샷 삭제 (다른 워커 합계에서 빠짐)"""
+        if self._publisher is not None:
+            self._publisher.cancel()
+            self._publisher = None
+        try:
+            os.remove(os.path.join(self.directory, f"worker-{os.getpid()}.json"))
+        except OSError:
+            pass
+
+
+def process_memory(pid: str = "self") -> Dict[str, int]:
+    """프로세스 메모리 (bytes, Linux /proc 기준 - 없으면 빈 dict)
+
+    rss: 상주 메모리 전체 / pss: 공유 페이지를 나눠 가진 몫 / private: 이 프로세스만 쓰는 페이지
+    (fork 후 copy-on-write 로 복사된 페이지는 private 로 옮겨감)
+    """
+    fields = {"Rss:": "rss", "Pss:": "pss", "Private_Clean:": "private", "Private_Dirty:": "private"}
+    memory: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                key = fields.get(parts[0]) if parts else None
+                if key:
+                    memory[key] = memory.get(key, 0) + int(parts[1]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_dead_directories(root: str):
+    """마스터 프로세스가 끝난 이전 실행의 기본 스냅샷 디렉터리 삭제"""
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return
+    for name in names:
+        if not name.startswith("tevor-metrics-"):
+            continue
+        try:
+            pid = int(name[len("tevor-metrics-"):])
+        except ValueError:
+            continue
+        if not _pid_alive(pid):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _avg_ms(histogram: _Histogram) -> float:
+    return round(histogram.sum / histogram.count * 1000, 3) if histogram.count else 0.0
+
+
+# 싱글톤 인스턴스
+_metrics: Optional[MetricsRegistry] = None
+
+def get_metrics() -> MetricsRegistry:
+    """메트릭 레지스트리 인스턴스 가져오기"""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry.from_env()
+        _register_builtin_collectors(_metrics)
+    return _metrics
+
+
+def _register_builtin_collectors(registry: MetricsRegistry):
+    cache_hits = registry.counter("tevor_cache_hits_total", "Cache hits", ["cache"])
+    cache_misses = registry.counter("tevor_cache_misses_total", "Cache misses", ["cache"])
+    cache_evictions = registry.counter("tevor_cache_evictions_total", "Entries evicted for capacity or TTL", ["cache"])
+    cache_entries = registry.gauge("tevor_cache_entries", "Entries currently cached", ["cache"])
+    pool_size = registry.gauge("tevor_db_pool_size", "Configured DB pool size", ["pool"])
+    pool_checked_out = registry.gauge("tevor_db_pool_checked_out", "DB connections currently checked out", ["pool"])
+
+    def collect_caches():
+        for name, stats in registry.cache_stats().items():
+            cache_hits.labels(name).set(stats.get("hits", 0))
+            cache_misses.labels(name).set(stats.get("misses", 0))
+            cache_evictions.labels(name).set(stats.get("evictions", 0))
+            cache_entries.labels(name).set(stats.get("size", 0))
+
+    def collect_pools():
+        for name, engine in registry.pools.items():
+            pool = engine.pool
+            if hasattr(pool, "size"):
+                pool_size.labels(name).set(pool.size())
+            if hasattr(pool, "checkedout"):
+                pool_checked_out.labels(name).set(pool.checkedout())
+
+    memory_gauge = registry.gauge("tevor_process_memory_bytes",
+                                  "Worker memory (rss, pss, private) summed over workers", ["kind"])
+
+    def collect_memory():
+        for kind, value in process_memory().items():
+            memory_gauge.labels(kind).set(value)
+
+    registry.add_collector(collect_caches)
+    registry.add_collector(collect_pools)
+    registry.add_collector(collect_memory)
+
+
+# =========================
+# 공용 메트릭 (계측 지점에서 import)
+# =========================
+
+_registry = get_metrics()
+
+_pool_checkouts = _registry.counter("tevor_db_pool_checkouts_total", "DB connection checkouts", ["pool"])
+_pool_wait = _registry.histogram("tevor_db_pool_wait_seconds", "Time spent waiting for a pooled DB connection",
+                                 ["pool"], POOL_WAIT_BUCKETS)
+
+llm_ttft = _registry.histogram("tevor_llm_ttft_seconds", "Time to first token per provider",
+                               ["provider"], LLM_TTFT_BUCKETS)
+llm_latency = _registry.histogram("tevor_llm_latency_seconds", "Total streamed response time per provider",
+                                  ["provider"], LLM_LATENCY_BUCKETS)
+llm_attempts = _registry.counter("tevor_llm_attempts_total", "Provider attempts by outcome",
+                                 ["provider", "outcome"])
+image_stage = _registry.histogram("tevor_image_stage_seconds", "Image pipeline stage duration", ["stage"])
+streams_in_flight = _registry.gauge("tevor_chat_streams_in_flight", "Chat responses currently streaming",
+                                    ["transport"])
+
+
+def record_pool_checkout(pool: str, wait: float):
+    _pool_checkouts.labels(pool).inc()
+    _pool_wait.labels(pool).observe(wait)
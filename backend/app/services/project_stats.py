@@ -0,0 +1,339 @@
+"""
+프로젝트별 통계 (project_stats 테이블)
+- 채팅 저장 / 이미지 저장 / 이미지 삭제 시 매퍼 이벤트로 같은 트랜잭션 안에서 증분 갱신
+- 요약 API 는 projects + project_stats 한 행 조회 (아카이브 폴더 스캔/채팅 COUNT 없음)
+- 이미지 파일 크기는 DB 컬럼이 없으므로 저장/삭제 시 ImageRecord.file_size (비매핑 속성) 로 전달
+- 주기적 정합성 검사: 원본 테이블 GROUP BY + 아카이브 폴더 크기로 다시 계산해 어긋난 행만 수정
+  - 시작 후 한 주기 기다린 뒤 첫 검사, 머신당 워커 하나만 실행 (flock), PostgreSQL 은 인스턴스 하나만 (advisory lock)
+  - 통계 행을 먼저 잠근 뒤 재계산 → 검사 중 들어온 증분 갱신은 잠금을 기다렸다가 새 값 위에 적용 (유실 없음)
+  - bytes_stored 는 디스크 스캔 값이라 검사와 겹친 업로드는 다음 검사에서 맞춰질 수 있음
+"""
+
+import os
+import time
+import zlib
+import fcntl
+import asyncio
+import logging
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+
+from sqlalchemy import event, inspect, select, func
+from sqlalchemy.engine import Connection
+
+from app.models.project import Project
+from app.models.image_record import ImageRecord, ChatMessage
+from app.models.project_stats import ProjectStats
+from app.services.archive_service import archive_service
+
+logger = logging.getLogger(__name__)
+
+project_stats = ProjectStats.__table__
+
+STATS_CHECK_INTERVAL = float(os.getenv("PROJECT_STATS_CHECK_SECONDS", "3600"))
+# 검사 담당 워커 선출용 잠금 파일 (같은 머신의 워커끼리)
+STATS_CHECK_LOCK = os.getenv("PROJECT_STATS_LOCK", os.path.join(tempfile.gettempdir(), "tevor-project-stats.lock"))
+# PostgreSQL advisory lock 키 (여러 인스턴스 중 하나만 검사)
+_ADVISORY_KEY = zlib.crc32(b"tevor.project_stats")
+
+
+def _bump(buckets: Optional[Dict[str, int]], key: Optional[str], delta: int) -> Dict[str, int]:
+    buckets = dict(buckets or {})
+    if key:
+        count = buckets.get(key, 0) + delta
+        if count > 0:
+            buckets[key] = count
+        else:
+            buckets.pop(key, None)
+    return buckets
+
+
+def _apply(connection: Connection, project_id: Optional[str], messages: int = 0, images: int = 0,
+           space: Optional[str] = None, stage: Optional[str] = None, nbytes: int = 0):
+    """통계 행 증분 갱신 (PostgreSQL 은 행 잠금, SQLite 는 쓰기 잠금 안이라 그대로 안전)"""
+    if not project_id:
+        return
+    now = datetime.now(timezone.utc)
+    row = connection.execute(
+        select(project_stats).where(project_stats.c.project_id == project_id).with_for_update()
+    ).mappings().first()
+    if row is None:
+        connection.execute(project_stats.insert().values(
+            project_id=project_id,
+            message_count=max(messages, 0),
+            image_count=max(images, 0),
+            images_by_space=_bump({}, space, images) if images > 0 else {},
+            images_by_stage=_bump({}, stage, images) if images > 0 else {},
+            bytes_stored=max(nbytes, 0),
+            last_activity_at=now
+        ))
+        return
+
+    values: Dict[str, Any] = {"last_activity_at": now}
+    if messages:
+        values["message_count"] = max(row["message_count"] + messages, 0)
+    if images:
+        values["image_count"] = max(row["image_count"] + images, 0)
+        values["images_by_space"] = _bump(row["images_by_space"], space, images)
+        values["images_by_stage"] = _bump(row["images_by_stage"], stage, images)
+    if nbytes:
+        values["bytes_stored"] = max(row["bytes_stored"] + nbytes, 0)
+    connection.execute(project_stats.update().where(project_stats.c.project_id == project_id).values(**values))
+
+
+@event.listens_for(Project, "after_insert")
+def _stats_project_insert(mapper, connection, target):
+    _apply(connection, target.project_id)
+
+
+@event.listens_for(Project, "after_delete")
+def _stats_project_delete(mapper, connection, target):
+    connection.execute(project_stats.delete().where(project_stats.c.project_id == target.project_id))
+
+
+@event.listens_for(ChatMessage, "after_insert")
+def _stats_chat_insert(mapper, connection, target):
+    _apply(connection, target.project_id, messages=1)
+
+
+@event.listens_for(ChatMessage, "after_delete")
+def _stats_chat_delete(mapper, connection, target):
+    _apply(connection, target.project_id, messages=-1)
+
+
+@event.listens_for(ImageRecord, "after_insert")
+def _stats_image_insert(mapper, connection, target):
+    _apply(connection, target.project_id, images=1, space=target.space_value, stage=target.stage_value,
+           nbytes=target.file_size or 0)
+
+
+@event.listens_for(ImageRecord, "after_delete")
+def _stats_image_delete(mapper, connection, target):
+    _apply(connection, target.project_id, images=-1, space=target.space_value, stage=target.stage_value,
+           nbytes=-(target.file_size or 0))
+
+
+# =========================
+# 재계산 / 정합성 검사
+# =========================
+
+def archive_bytes() -> Dict[str, int]:
+    """아카이브 폴더의 프로젝트별 파일 크기 합 (파일 시스템 스캔 - 이벤트 루프 밖에서 실행)"""
+    totals: Dict[str, int] = {}
+    root = archive_service.archive_path
+    if not os.path.isdir(root):
+        return totals
+    with os.scandir(root) as projects:
+        for project_dir in projects:
+            if not project_dir.is_dir():
+                continue
+            total = 0
+            with os.scandir(project_dir.path) as files:
+                for entry in files:
+                    if entry.is_file():
+                        total += entry.stat().st_size
+            totals[project_dir.name] = total
+    return totals
+
+
+def compute_stats(connection: Connection, disk_bytes: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+    """원본 테이블에서 프로젝트별 통계 전체 재계산 (GROUP BY 두 번)"""
+    expected: Dict[str, Dict[str, Any]] = {}
+    for (project_id,) in connection.execute(select(Project.project_id)):
+        expected[project_id] = {
+            "message_count": 0, "image_count": 0, "images_by_space": {}, "images_by_stage": {},
+            "bytes_stored": disk_bytes.get(project_id, 0), "last_activity_at": None
+        }
+
+    def touch(stats: Dict[str, Any], at: Optional[datetime]):
+        if at is not None and (stats["last_activity_at"] is None or at > stats["last_activity_at"]):
+            stats["last_activity_at"] = at
+
+    messages = select(ChatMessage.project_id, func.count(), func.max(ChatMessage.created_at)).group_by(ChatMessage.project_id)
+    for project_id, count, last_at in connection.execute(messages):
+        if project_id in expected:
+            expected[project_id]["message_count"] = count
+            touch(expected[project_id], last_at)
+
+    images = select(
+        ImageRecord.project_id, ImageRecord.space_value, ImageRecord.stage_value,
+        func.count(), func.max(ImageRecord.created_at)
+    ).group_by(ImageRecord.project_id, ImageRecord.space_value, ImageRecord.stage_value)
+    for project_id, space, stage, count, last_at in connection.execute(images):
+        stats = expected.get(project_id)
+        if stats is None:
+            continue
+        stats["image_count"] += count
+        stats["images_by_space"] = _bump(stats["images_by_space"], space, count)
+        stats["images_by_stage"] = _bump(stats["images_by_stage"], stage, count)
+        touch(stats, last_at)
+    return expected
+
+
+_COUNTERS = ("message_count", "image_count", "bytes_stored")
+_BUCKETS = ("images_by_space", "images_by_stage")
+
+
+def _differs(row: Any, values: Dict[str, Any]) -> bool:
+    return (any((row[key] or 0) != values[key] for key in _COUNTERS)
+            or any(dict(row[key] or {}) != values[key] for key in _BUCKETS))
+
+
+def reconcile(connection: Connection, disk_bytes: Dict[str, int]) -> Dict[str, Any]:
+    """저장된 통계를 재계산 값과 비교해 어긋난 행만 고침 (없는 행은 생성, 삭제된 프로젝트 행은 제거)
+
+    통계 행을 FOR UPDATE 로 먼저 잠그고 재계산: 아직 커밋 안 된 쓰기는 _apply 에서 잠금을 기다린 뒤
+    고쳐진 값에 증분을 더함 (SQLite 는 FOR UPDATE 가 없으므로 호출한 쪽이 BEGIN IMMEDIATE 로 실행)
+    """
+    stored = {row["project_id"]: row for row in connection.execute(
+        select(project_stats).order_by(project_stats.c.project_id).with_for_update()
+    ).mappings()}
+    expected = compute_stats(connection, disk_bytes)
+
+    drifted: List[str] = []
+    for project_id, values in expected.items():
+        row = stored.get(project_id)
+        if row is None:
+            connection.execute(project_stats.insert().values(project_id=project_id, **values))
+            drifted.append(project_id)
+        elif _differs(row, values):
+            update = {key: values[key] for key in _COUNTERS + _BUCKETS}
+            if row["last_activity_at"] is None:
+                update["last_activity_at"] = values["last_activity_at"]
+            connection.execute(project_stats.update().where(project_stats.c.project_id == project_id).values(**update))
+            drifted.append(project_id)
+
+    orphans = [project_id for project_id in stored if project_id not in expected]
+    if orphans:
+        connection.execute(project_stats.delete().where(project_stats.c.project_id.in_(orphans)))
+    return {"projects": len(expected), "drifted": drifted, "orphans": len(orphans)}
+
+
+@event.listens_for(project_stats, "after_create")
+def _backfill_stats(target, connection, **kw):
+    """통계 테이블이 처음 생성될 때 기존 프로젝트 집계"""
+    inspector = inspect(connection)
+    if all(inspector.has_table(table) for table in ("projects", "chat_messages", "image_records")):
+        result = reconcile(connection, archive_bytes())
+        if result["drifted"]:
+            logger.info(f"📊 Project stats backfilled: {len(result['drifted'])} projects")
+
+
+def _reconcile_once(connection: Connection, disk_bytes: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """다른 인스턴스가 검사 중이면 None (PostgreSQL 트랜잭션 advisory lock)"""
+    if connection.dialect.name == "postgresql":
+        if not connection.execute(select(func.pg_try_advisory_xact_lock(_ADVISORY_KEY))).scalar():
+            return None
+    return reconcile(connection, disk_bytes)
+
+
+class ProjectStatsChecker:
+    """주기적 정합성 검사 (잠금 파일을 잡은 워커 하나만 실행, 그 워커가 죽으면 다른 워커가 이어받음)"""
+
+    def __init__(self, interval: float = STATS_CHECK_INTERVAL, lock_path: str = STATS_CHECK_LOCK):
+        self.interval = interval
+        self.lock_path = lock_path
+        self.checks = 0
+        self.skipped = 0
+        self.drift_total = 0
+        self.last_check: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock_file = None
+
+    def _is_leader(self) -> bool:
+        """검사 담당 워커인지 (잠금은 프로세스가 끝날 때까지 유지)"""
+        if self._lock_file is not None:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def check(self) -> Optional[Dict[str, Any]]:
+        from app.database import engine, IS_ASYNC, SessionLocal, SerializedAsyncSession, sqlite_writer
+
+        start = time.perf_counter()
+        disk_bytes = await asyncio.to_thread(archive_bytes)
+        if IS_ASYNC:
+            # SQLite: 재계산~갱신을 한 쓰기 단위로 (프로세스 안은 SerializedWriter 순서, 다른 워커는 BEGIN IMMEDIATE)
+            async def unit():
+                async with engine.connect() as conn:
+                    await conn.exec_driver_sql("BEGIN IMMEDIATE")
+                    checked = await conn.run_sync(reconcile, disk_bytes)
+                    await conn.commit()
+                    return checked
+
+            if SessionLocal.class_ is SerializedAsyncSession:
+                result = await sqlite_writer.run(unit)
+            else:
+                result = await unit()
+        else:
+            def run():
+                with engine.begin() as conn:
+                    return _reconcile_once(conn, disk_bytes)
+            result = await asyncio.to_thread(run)
+            if result is None:
+                self.skipped += 1
+                return None
+
+        self.checks += 1
+        self.drift_total += len(result["drifted"])
+        self.last_check = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+            "projects": result["projects"],
+            "drifted": len(result["drifted"]),
+            "orphans": result["orphans"]
+        }
+        if result["drifted"]:
+            logger.warning(f"📊 Project stats drift fixed: {result['drifted'][:10]}")
+        return result
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def _loop(self):
+        # 부팅 직후에는 검사하지 않음 (워커마다 GROUP BY + 폴더 스캔 방지)
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self._is_leader():
+                self.skipped += 1
+                continue
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Project stats check error: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "leader": self._lock_file is not None,
+            "checks": self.checks,
+            "skipped": self.skipped,
+            "drift_total": self.drift_total,
+            "last_check": self.last_check
+        }
+
+
+_checker: Optional[ProjectStatsChecker] = None
+
+def get_stats_checker() -> ProjectStatsChecker:
+    """정합성 검사기 인스턴스 가져오기"""
+    global _checker
+    if _checker is None:
+        _checker = ProjectStatsChecker()
+    return _checker
@@ -0,0 +1,210 @@
+"""
+프롬프트 조립 엔진
+- 템플릿은 한 번만 컴파일 (요청마다 80줄짜리 f-string 재렌더링 없음)
+- 정적 시스템 프롬프트를 항상 맨 앞에 바이트 단위로 동일하게 배치 → 프로바이더 프롬프트 캐시 적중
+- 프로젝트 컨텍스트 / 검색 지식 / 대화 히스토리 / 사용자 메시지는 그 뒤에 추가
+- 요청별 프롬프트 토큰 / 캐시 토큰 집계, 중간 취소로 절약된 생성 토큰 추정
+"""
+
+import re
+import hashlib
+import logging
+from typing import Dict, Optional, List, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+_FIELD_RE = re.compile(r"\{(\w+)\}")
+
+DEFAULT_SPACES = ["거실", "주방", "침실", "욕실"]
+
+CONTEXT_TEMPLATE = """현재 프로젝트 정보:
+- 프로젝트 타입: {project_type}
+- 현재 단계: {current_stage}
+- 예상 공간: {expected_spaces}"""
+
+
+class PromptTemplate:
+    """{name} 자리표시자 템플릿 (생성 시 한 번 컴파일)"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._parts: List[Tuple[str, Optional[str]]] = []
+        position = 0
+        for match in _FIELD_RE.finditer(source):
+            self._parts.append((source[position:match.start()], match.group(1)))
+            position = match.end()
+        self._tail = source[position:]
+        self.fields = [field for _, field in self._parts]
+
+    def render(self, **values: Any) -> str:
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            out.append(str(values[field]))
+        out.append(self._tail)
+        return "".join(out)
+
+
+class ChatPromptLayout:
+    """정적 프리픽스 우선 채팅 프롬프트 레이아웃
+
+    [정적 시스템 프롬프트 (고정)] → [프로젝트 컨텍스트 + 참고 지식] → [최근 대화] → [사용자 메시지]
+    """
+
+    def __init__(self, name: str, static_prefix: str,
+                 context_template: str = CONTEXT_TEMPLATE, history_turns: int = 3):
+        """
+        Args:
+            name: 레이아웃 이름 (프로바이더)
+            static_prefix: 요청과 무관한 시스템 프롬프트 - 절대 요청별로 바꾸지 않음
+            context_template: 프로젝트 컨텍스트 템플릿
+            history_turns: 포함할 최근 대화 수
+        """
+        self.name = name
+        self.static_prefix = static_prefix
+        self.prefix_hash = hashlib.sha1(static_prefix.encode("utf-8")).hexdigest()[:12]
+        self.context_template = PromptTemplate(context_template)
+        self.history_turns = history_turns
+
+    def render_context(self, project_context: Optional[Dict] = None) -> str:
+        """프로젝트 컨텍스트 + 검색된 지식 스니펫"""
+        context = project_context or {}
+        text = self.context_template.render(
+            project_type=context.get("project_type", "일반 주택"),
+            current_stage=context.get("current_stage", "시공 전"),
+            expected_spaces=", ".join(context.get("expected_spaces") or DEFAULT_SPACES)
+        )
+        knowledge = context.get("knowledge")
+        if knowledge:
+            text += "\n\n참고 지식:\n" + "\n".join(f"- {snippet}" for snippet in knowledge)
+        return text
+
+    def _recent(self, conversation_history: Optional[List]) -> List[Dict]:
+        if not conversation_history:
+            return []
+        return [h for h in conversation_history[-self.history_turns:] if h.get("role") in ("user", "assistant")]
+
+    def build_messages(self, user_message: str, project_context: Optional[Dict] = None,
+                       conversation_history: Optional[List] = None) -> List[Dict[str, str]]:
+        """Chat Completions 메시지 목록 (OpenAI)"""
+        messages = [{"role": "system", "content": self.static_prefix}]
+        if project_context:
+            messages.append({"role": "system", "content": self.render_context(project_context)})
+        for h in self._recent(conversation_history):
+            messages.append({"role": h["role"], "content": h.get("content", "")})
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def build_text(self, user_message: str, project_context: Optional[Dict] = None,
+                   conversation_history: Optional[List] = None) -> str:
+        """단일 텍스트 프롬프트 (Gemini) - 정적 프리픽스가 항상 맨 앞"""
+        history_lines = "".join(
+            f"{'사용자' if h['role'] == 'user' else 'TEVOR'}: {h.get('content', '')}\n"
+            for h in self._recent(conversation_history)
+        )
+        return (
+            f"{self.static_prefix}\n\n"
+            f"{self.render_context(project_context)}\n\n"
+            f"{history_lines}사용자: {user_message}\nTEVOR:"
+        )
+
+
+def usage_from_openai(usage: Any) -> Optional[Dict[str, int]]:
+    """OpenAI usage 객체 → {prompt_tokens, cached_tokens, completion_tokens}"""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0
+    }
+
+
+def usage_from_gemini(usage_metadata: Any) -> Optional[Dict[str, int]]:
+    """Gemini usage_metadata → {prompt_tokens, cached_tokens, completion_tokens}"""
+    if usage_metadata is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage_metadata, "prompt_token_count", 0) or 0,
+        "cached_tokens": getattr(usage_metadata, "cached_content_token_count", 0) or 0,
+        "completion_tokens": getattr(usage_metadata, "candidates_token_count", 0) or 0
+    }
+
+
+class PromptEngine:
+    """프로바이더별 레이아웃 레지스트리 + 토큰 사용량 집계"""
+
+    def __init__(self):
+        self.layouts: Dict[str, ChatPromptLayout] = {}
+        self.usage: Dict[str, Dict[str, int]] = {}
+        self.cancelled: Dict[str, Dict[str, int]] = {}
+
+    def register(self, name: str, static_prefix: str, **kwargs) -> ChatPromptLayout:
+        """레이아웃 등록 (같은 프리픽스면 기존 레이아웃 재사용)"""
+        layout = self.layouts.get(name)
+        if layout is None or layout.static_prefix != static_prefix:
+            layout = ChatPromptLayout(name, static_prefix, **kwargs)
+            self.layouts[name] = layout
+            logger.info(f"🧩 Prompt layout registered: {name} (prefix {layout.prefix_hash}, {len(static_prefix)} chars)")
+        return layout
+
+    def record_usage(self, name: str, usage: Optional[Dict[str, int]]):
+        """요청 1건의 토큰 사용량 기록"""
+        if not usage:
+            return
+        totals = self.usage.setdefault(name, {
+            "requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0
+        })
+        totals["requests"] += 1
+        for key in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+            totals[key] += usage.get(key, 0)
+        logger.info(
+            f"🧮 {name} prompt {usage.get('prompt_tokens', 0)} tokens "
+            f"(cached {usage.get('cached_tokens', 0)}), completion {usage.get('completion_tokens', 0)}"
+        )
+
+    def record_cancelled(self, name: str, completion_tokens: int, max_tokens: int):
+        """업스트림 생성이 중간에 취소된 요청 기록
+
+        절약된 토큰은 해당 프로바이더의 평균 응답 길이(없으면 max_tokens)에서
+        취소 전까지 받은 토큰을 뺀 추정치
+        """
+        totals = self.usage.get(name)
+        expected = totals["completion_tokens"] / totals["requests"] if totals and totals["requests"] else max_tokens
+        saved = max(0, min(int(expected), max_tokens) - completion_tokens)
+
+        cancelled = self.cancelled.setdefault(name, {
+            "streams": 0, "completion_tokens": 0, "tokens_saved_est": 0
+        })
+        cancelled["streams"] += 1
+        cancelled["completion_tokens"] += completion_tokens
+        cancelled["tokens_saved_est"] += saved
+        logger.info(f"✂️ {name} generation cancelled after {completion_tokens} tokens (~{saved} saved)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "layouts": {
+                name: {"prefix_hash": layout.prefix_hash, "prefix_chars": len(layout.static_prefix)}
+                for name, layout in self.layouts.items()
+            },
+            "usage": {
+                name: {
+                    **totals,
+                    "cached_ratio": f"{(totals['cached_tokens'] / totals['prompt_tokens'] * 100) if totals['prompt_tokens'] else 0:.1f}%"
+                }
+                for name, totals in self.usage.items()
+            },
+            "cancelled": {name: dict(totals) for name, totals in self.cancelled.items()}
+        }
+
+
+# 싱글톤 인스턴스
+_prompt_engine: Optional[PromptEngine] = None
+
+def get_prompt_engine() -> PromptEngine:
+    """프롬프트 엔진 인스턴스 가져오기"""
+    global _prompt_engine
+    if _prompt_engine is None:
+        _prompt_engine = PromptEngine()
+    return _prompt_engine
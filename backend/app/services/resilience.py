@@ -0,0 +1,263 @@
+"""
+업스트림 LLM 호출 보호
+- 프로바이더별 서킷 브레이커 (closed / open / half-open)
+- 요청 단위 종단 간 데드라인 → 연결/첫 토큰 타임아웃으로 분배 (폴백 포함 첫 토큰까지의 예산)
+- 첫 토큰 이후 스트림은 별도 전체 예산(LLM_STREAM_DEADLINE) 안에서 토큰 간 타임아웃만 적용
+- 장애 시 고정된 지연 예산 안에서 폴백 응답으로 degrade
+- 서킷 상태/개방 횟수/차단 수는 /metrics (tevor_circuit_*)
+"""
+
+import os
+import time
+import asyncio
+import inspect
+import logging
+from typing import Dict, Optional, Any, AsyncIterator, Callable
+
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """요청 데드라인 또는 단계별 타임아웃 초과"""
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 업스트림 호출을 건너뜀"""
+
+
+class CircuitBreaker:
+    """프로바이더별 서킷 브레이커"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        """
+        Args:
+            name: 프로바이더 이름
+            failure_threshold: 연속 실패 몇 번에 서킷을 열지
+            recovery_timeout: open 상태 유지 시간 (초) - 이후 half-open 으로 전환
+            half_open_max_calls: half-open 상태에서 허용할 시험 호출 수
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_since = 0.0
+
+        self.total_failures = 0
+        self.total_successes = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        now = time.monotonic()
+        if self._state == self.OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+            self._half_open_since = now
+        elif self._state == self.HALF_OPEN and now - self._half_open_since >= self.recovery_timeout:
+            # 결과를 보고하지 못한 시험 호출(취소 등)이 슬롯을 계속 점유하지 않도록 재개방
+            self._half_open_calls = 0
+            self._half_open_since = now
+        return self._state
+
+    def allow_request(self) -> bool:
+        """호출 허용 여부 (half-open 에서는 시험 호출 슬롯을 소비)"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.total_successes += 1
+        self._consecutive_failures = 0
+        if self._state != self.CLOSED:
+            logger.info(f"🟢 Circuit closed: {self.name}")
+        self._state = self.CLOSED
+
+    def record_failure(self):
+        self.total_failures += 1
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"🔴 Circuit opened: {self.name} ({self._consecutive_failures} failures)")
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "failures": self.total_failures,
+            "successes": self.total_successes,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened
+        }
+
+
+class Deadline:
+    """종단 간 요청 데드라인
+
+    budget 은 첫 토큰까지(연결, 폴백 시도 포함), stream_budget 은 응답 스트림 전체 (둘 다 요청 시작 기준).
+    긴 답변이 budget 을 넘겨도 토큰이 계속 오면 끊지 않음.
+    """
+
+    def __init__(self, budget: float,
+                 connect_timeout: float = 3.0,
+                 first_token_timeout: float = 8.0,
+                 inter_token_timeout: float = 5.0,
+                 stream_budget: float = 120.0):
+        """
+        Args:
+            budget: 첫 토큰까지의 지연 예산 (초)
+            connect_timeout: 연결 타임아웃 상한
+            first_token_timeout: 첫 토큰까지 타임아웃 상한
+            inter_token_timeout: 토큰 사이 타임아웃 상한
+            stream_budget: 스트리밍 응답 전체 예산 (초, budget 보다 작으면 budget)
+        """
+        now = time.monotonic()
+        self.budget = budget
+        self.expires_at = now + budget
+        self.stream_expires_at = now + max(budget, stream_budget)
+        self._connect_timeout = connect_timeout
+        self._first_token_timeout = first_token_timeout
+        self._inter_token_timeout = inter_token_timeout
+
+    @classmethod
+    def from_env(cls) -> "Deadline":
+        """환경변수 기반 기본 데드라인"""
+        return cls(
+            budget=float(os.getenv("LLM_DEADLINE", "25")),
+            connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", "3")),
+            first_token_timeout=float(os.getenv("LLM_FIRST_TOKEN_TIMEOUT", "8")),
+            inter_token_timeout=float(os.getenv("LLM_INTER_TOKEN_TIMEOUT", "5")),
+            stream_budget=float(os.getenv("LLM_STREAM_DEADLINE", "120"))
+        )
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def stream_remaining(self) -> float:
+        return max(0.0, self.stream_expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def connect_timeout(self) -> float:
+        return min(self._connect_timeout, self.remaining())
+
+    def first_token_timeout(self) -> float:
+        return min(self._first_token_timeout, self.remaining())
+
+    def inter_token_timeout(self) -> float:
+        return min(self._inter_token_timeout, self.stream_remaining())
+
+
+async def timed_stream(stream: AsyncIterator, deadline: Deadline,
+                       is_token: Callable[[Any], bool] = lambda chunk: True,
+                       started_at: Optional[float] = None) -> AsyncIterator:
+    """업스트림 스트림에 첫 토큰/토큰 간 타임아웃 적용 (첫 토큰 이후는 스트림 예산 기준)
+
+    Args:
+        stream: 업스트림 async 이터레이터
+        deadline: 요청 데드라인
+        is_token: 실제 토큰을 담은 청크인지 판별 (역할/메타 청크 제외)
+        started_at: 업스트림 호출 시작 시각 (time.monotonic) - 첫 토큰 타임아웃 기준
+    """
+    iterator = stream.__aiter__()
+    first_token_by = (started_at or time.monotonic()) + deadline.first_token_timeout()
+    got_token = False
+
+    try:
+        while True:
+            if got_token:
+                timeout = deadline.inter_token_timeout()
+            else:
+                timeout = min(first_token_by - time.monotonic(), deadline.remaining())
+            if timeout <= 0:
+                raise DeadlineExceeded("first token" if not got_token else "stream deadline")
+
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                if not got_token:
+                    raise DeadlineExceeded("first token")
+                raise DeadlineExceeded("stream deadline" if deadline.stream_remaining() <= 0 else "inter-token")
+
+            if not got_token and is_token(chunk):
+                got_token = True
+            yield chunk
+    finally:
+        # 타임아웃/취소로 중간에 빠져나가면 업스트림 연결을 바로 닫음 (끝까지 읽지 않음)
+        await close_stream(stream, iterator)
+
+
+async def close_stream(stream: Any, iterator: Any = None):
+    """업스트림 스트림 닫기 (OpenAI AsyncStream.close / async generator aclose)"""
+    close = getattr(stream, "close", None) or getattr(iterator, "aclose", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.debug(f"스트림 종료 중 오류 무시: {e}")
+
+
+# 프로바이더별 서킷 브레이커 레지스트리
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """프로바이더 서킷 브레이커 가져오기"""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            recovery_timeout=float(os.getenv("LLM_BREAKER_RECOVERY", "30"))
+        )
+    return _breakers[name]
+
+def get_breaker_stats() -> Dict[str, Any]:
+    """전체 서킷 브레이커 상태"""
+    return {name: breaker.get_stats() for name, breaker in _breakers.items()}
+
+
+def _register_breaker_metrics():
+    registry = get_metrics()
+    # 워커 합계 = 서킷이 열린 워커 수
+    open_gauge = registry.gauge("tevor_circuit_open", "Workers whose circuit is open (half-open counts as open)",
+                                ["provider"])
+    opened = registry.counter("tevor_circuit_opened_total", "Times a circuit opened", ["provider"])
+    rejected = registry.counter("tevor_circuit_rejected_total", "Calls skipped because the circuit was open",
+                                ["provider"])
+
+    def collect():
+        for name, breaker in _breakers.items():
+            open_gauge.labels(name).set(0 if breaker.state == CircuitBreaker.CLOSED else 1)
+            opened.labels(name).set(breaker.times_opened)
+            rejected.labels(name).set(breaker.rejected)
+
+    registry.add_collector(collect)
+
+
+_register_breaker_metrics()
@@ -0,0 +1,123 @@
+"""
+리소스 버전 카운터 (resource_versions 테이블)
+- 프로젝트마다 kind 별 버전: project(프로젝트 행) / chat(채팅 기록) / images(아카이브 이미지)
+- 프로젝트/채팅/이미지 쓰기 시 매퍼 이벤트로 같은 트랜잭션 안에서 +1 → 커밋과 버전이 항상 함께 보임
+- 프로젝트 생성 시 모든 kind 행 생성, 삭제 시 함께 삭제 → 행이 없으면 "없는 프로젝트" (304 금지)
+- 프로젝트 목록 세대: project_id "*" 의 projects 버전 - 프로젝트 생성/수정/삭제마다 +1 (목록 캐시 키)
+- 워커/레플리카가 여러 개여도 DB 한 곳이 기준이라 ETag 가 어긋나지 않음
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.dialects import sqlite, postgresql
+
+from app.models.project import Project
+from app.models.image_record import ImageRecord, ChatMessage
+from app.models.resource_version import ResourceVersion
+
+logger = logging.getLogger(__name__)
+
+resource_versions = ResourceVersion.__table__
+
+KINDS = ("project", "chat", "images")
+
+# 프로젝트 목록 전체의 버전 행 (실제 프로젝트 id 와 겹치지 않는 키)
+PROJECT_LIST = ("*", "projects")
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def bump_statement(dialect_name: str, project_id: str, kind: str):
+    """버전 +1 (행이 없으면 1 로 생성) - 한 문장 upsert 라 동시 쓰기에도 안전"""
+    insert = _INSERTS[dialect_name](resource_versions).values(project_id=project_id, kind=kind, version=1)
+    return insert.on_conflict_do_update(
+        index_elements=[resource_versions.c.project_id, resource_versions.c.kind],
+        set_={"version": resource_versions.c.version + 1}
+    )
+
+
+def _bump(connection: Connection, project_id: Optional[str], kind: str):
+    if project_id:
+        connection.execute(bump_statement(connection.dialect.name, project_id, kind))
+
+
+async def touch(db, project_id: str, kind: str):
+    """ORM 이벤트가 없는 변경(DB 기록 없는 파일 삭제 등)을 직접 반영 - 커밋은 호출한 쪽에서"""
+    from app.database import engine, IS_ASYNC
+
+    statement = bump_statement(engine.dialect.name, project_id, kind)
+    if IS_ASYNC:
+        await db.execute(statement)
+    else:
+        db.execute(statement)
+
+
+def versions_query(project_id: str, kinds: Iterable[str]):
+    return select(resource_versions.c.kind, resource_versions.c.version).where(
+        (resource_versions.c.project_id == project_id) & resource_versions.c.kind.in_(list(kinds))
+    )
+
+
+async def get_list_version(db) -> int:
+    """프로젝트 목록 세대 (행이 아직 없으면 0)"""
+    project_id, kind = PROJECT_LIST
+    return (await get_versions(db, project_id, (kind,))).get(kind, 0)
+
+
+async def get_versions(db, project_id: str, kinds: Iterable[str]) -> Dict[str, int]:
+    """kind → 버전 (프로젝트가 없으면 빈 dict) - 인덱스 한 번 조회"""
+    from app.database import IS_ASYNC
+
+    query = versions_query(project_id, kinds)
+    result = (await db.execute(query)) if IS_ASYNC else db.execute(query)
+    return {kind: version for kind, version in result.all()}
+
+
+@event.listens_for(Project, "after_insert")
+def _versions_project_insert(mapper, connection, target):
+    for kind in KINDS:
+        _bump(connection, target.project_id, kind)
+    _bump(connection, *PROJECT_LIST)
+
+
+@event.listens_for(Project, "after_update")
+def _versions_project_update(mapper, connection, target):
+    _bump(connection, target.project_id, "project")
+    _bump(connection, *PROJECT_LIST)
+
+
+@event.listens_for(Project, "after_delete")
+def _versions_project_delete(mapper, connection, target):
+    connection.execute(resource_versions.delete().where(resource_versions.c.project_id == target.project_id))
+    _bump(connection, *PROJECT_LIST)
+
+
+@event.listens_for(ChatMessage, "after_insert")
+@event.listens_for(ChatMessage, "after_update")
+@event.listens_for(ChatMessage, "after_delete")
+def _versions_chat_write(mapper, connection, target):
+    _bump(connection, target.project_id, "chat")
+
+
+@event.listens_for(ImageRecord, "after_insert")
+@event.listens_for(ImageRecord, "after_update")
+@event.listens_for(ImageRecord, "after_delete")
+def _versions_image_write(mapper, connection, target):
+    _bump(connection, target.project_id, "images")
+
+
+@event.listens_for(resource_versions, "after_create")
+def _backfill_versions(target, connection, **kw):
+    """버전 테이블이 처음 생성될 때 기존 프로젝트 행 생성"""
+    if not inspect(connection).has_table("projects"):
+        return
+    project_ids = [row[0] for row in connection.execute(select(Project.project_id))]
+    if project_ids:
+        connection.execute(resource_versions.insert(), [
+            {"project_id": project_id, "kind": kind, "version": 1}
+            for project_id in project_ids for kind in KINDS
+        ])
+        logger.info(f"🏷️ Resource versions backfilled: {len(project_ids)} projects")
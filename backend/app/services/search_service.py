@@ -0,0 +1,267 @@
+"""
+채팅/사진 전문 검색 서비스
+- 한국어 바이그램 토크나이저 (형태소 분석기 없이 부분 일치 검색)
+- SQLite: FTS5 가상 테이블 (bm25 랭킹), PostgreSQL: tsvector GIN 인덱스 (ts_rank_cd 랭킹)
+- ChatMessage / ImageRecord 쓰기 시 매퍼 이벤트로 search_documents 자동 갱신
+"""
+
+import re
+import json
+import logging
+import unicodedata
+from typing import Dict, Optional, List, Any, Tuple
+
+from sqlalchemy import event, inspect, text, DDL
+from sqlalchemy.engine import Connection
+
+from app.models.image_record import ImageRecord, ChatMessage
+from app.models.search_document import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+search_documents = SearchDocument.__table__
+
+_RUN_RE = re.compile(r"[^\W_]+")
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㆎ]")
+
+
+def _is_hangul(run: str) -> bool:
+    return bool(_HANGUL_RE.match(run))
+
+
+def _word_tokens(run: str) -> List[str]:
+    """한 단어(연속 문자열)의 토큰: 한글은 바이그램, 그 외는 단어 그대로"""
+    if not _is_hangul(run) or len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def split_words(value: str) -> List[str]:
+    """NFKC + 소문자 정규화 후 단어 단위로 분리 (한글/영문/숫자 경계도 분리)"""
+    normalized = unicodedata.normalize("NFKC", value or "").lower()
+    words = []
+    for run in _RUN_RE.findall(normalized):
+        # "3mm타일" → "3mm", "타일"
+        words.extend(re.findall(r"[가-힣ㄱ-ㆎ]+|[^\W_가-힣ㄱ-ㆎ]+", run))
+    return words
+
+
+def tokenize(value: str) -> str:
+    """색인용 토큰 문자열 ("욕실타일" → "욕실 실타 타일")"""
+    tokens = []
+    for word in split_words(value):
+        tokens.extend(_word_tokens(word))
+    return " ".join(tokens)
+
+
+def _keywords_text(keywords: Any) -> str:
+    if not keywords:
+        return ""
+    if isinstance(keywords, str):
+        try:
+            keywords = json.loads(keywords)
+        except ValueError:
+            return keywords
+    if isinstance(keywords, (list, tuple)):
+        return " ".join(str(k) for k in keywords)
+    return str(keywords)
+
+
+def chat_document_text(user_message: Optional[str], ai_response: Optional[str]) -> str:
+    return f"{user_message or ''}\n{ai_response or ''}"
+
+
+def image_document_text(description_ko: Optional[str], keywords_json: Any) -> str:
+    return f"{description_ko or ''}\n{_keywords_text(keywords_json)}"
+
+
+def build_match_query(query: str, dialect: str) -> Optional[str]:
+    """검색어 → FTS5 MATCH / to_tsquery 식
+
+    단어마다 바이그램을 인접 구문으로 묶고(순서 보장), 단어끼리는 AND.
+    한 글자 한글 단어는 접두 검색으로 처리한다.
+    """
+    clauses = []
+    for word in split_words(query):
+        tokens = _word_tokens(word)
+        prefix = len(word) == 1 and _is_hangul(word)
+        if dialect == "postgresql":
+            clause = " <-> ".join(tokens) + (":*" if prefix else "")
+        else:
+            clause = '"' + " ".join(tokens) + '"' + ("*" if prefix else "")
+        clauses.append(clause)
+
+    if not clauses:
+        return None
+    return " & ".join(clauses) if dialect == "postgresql" else " AND ".join(clauses)
+
+
+def build_search_sql(match: str, dialect: str, project_id: Optional[str] = None,
+                     doc_type: Optional[str] = None, limit: int = 20,
+                     offset: int = 0) -> Tuple[Any, Any, Dict[str, Any]]:
+    """랭킹된 검색 쿼리와 전체 건수 쿼리
+
+    Returns:
+        (search_sql, count_sql, params) - 결과 행은 (doc_type, doc_key, project_id, score)
+        score 는 클수록 관련도가 높음
+    """
+    params: Dict[str, Any] = {"match": match, "limit": limit, "offset": offset}
+    filters = ""
+    if project_id:
+        filters += " AND d.project_id = :project_id"
+        params["project_id"] = project_id
+        if dialect != "postgresql":
+            # FTS5 안에서 프로젝트로 먼저 좁혀 bm25 계산 대상을 줄임
+            params["match"] = f'({match}) AND project_id : "{" ".join(split_words(project_id))}"'
+    if doc_type:
+        filters += " AND d.doc_type = :doc_type"
+        params["doc_type"] = doc_type
+
+    if dialect == "postgresql":
+        source = (
+            "FROM search_documents d, to_tsquery('simple', :match) q "
+            f"WHERE to_tsvector('simple', d.tokens) @@ q{filters}"
+        )
+        score = "ts_rank_cd(to_tsvector('simple', d.tokens), q)"
+    else:
+        source = (
+            "FROM search_fts JOIN search_documents d ON d.id = search_fts.rowid "
+            f"WHERE search_fts MATCH :match{filters}"
+        )
+        # bm25 는 작을수록 관련도가 높음
+        score = "-bm25(search_fts, 1.0, 0.0)"
+
+    search_sql = text(
+        f"SELECT d.doc_type, d.doc_key, d.project_id, {score} AS score {source} "
+        "ORDER BY score DESC, d.id DESC LIMIT :limit OFFSET :offset"
+    )
+    count_sql = text(f"SELECT count(*) {source}")
+    return search_sql, count_sql, params
+
+
+def make_snippet(value: Optional[str], query: str, width: int = 80) -> str:
+    """원문에서 검색어가 처음 등장하는 부분 주변을 잘라낸 미리보기"""
+    if not value:
+        return ""
+    lowered = unicodedata.normalize("NFKC", value).lower()
+    positions = [lowered.find(word) for word in split_words(query)]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    snippet = value[start:start + width].replace("\n", " ").strip()
+    return ("…" if start > 0 else "") + snippet + ("…" if start + width < len(value) else "")
+
+
+# =========================
+# 쓰기 시 색인 갱신
+# =========================
+
+def _upsert_document(connection: Connection, doc_type: str, doc_key: Optional[str],
+                     project_id: Optional[str], content: str, replace: bool = False):
+    if not doc_key:
+        return
+    if replace:
+        _delete_document(connection, doc_type, doc_key)
+    tokens = tokenize(content)
+    if tokens:
+        connection.execute(search_documents.insert().values(
+            doc_type=doc_type, doc_key=doc_key, project_id=project_id, tokens=tokens
+        ))
+
+
+def _delete_document(connection: Connection, doc_type: str, doc_key: Optional[str]):
+    connection.execute(search_documents.delete().where(
+        (search_documents.c.doc_type == doc_type) & (search_documents.c.doc_key == doc_key)
+    ))
+
+
+@event.listens_for(ChatMessage, "after_insert")
+def _index_chat_insert(mapper, connection, target):
+    _upsert_document(connection, "chat", target.message_id, target.project_id,
+                     chat_document_text(target.user_message, target.ai_response))
+
+
+@event.listens_for(ChatMessage, "after_update")
+def _index_chat_update(mapper, connection, target):
+    _upsert_document(connection, "chat", target.message_id, target.project_id,
+                     chat_document_text(target.user_message, target.ai_response), replace=True)
+
+
+@event.listens_for(ChatMessage, "after_delete")
+def _index_chat_delete(mapper, connection, target):
+    _delete_document(connection, "chat", target.message_id)
+
+
+@event.listens_for(ImageRecord, "after_insert")
+def _index_image_insert(mapper, connection, target):
+    _upsert_document(connection, "image", target.image_id, target.project_id,
+                     image_document_text(target.description_ko, target.keywords_json))
+
+
+@event.listens_for(ImageRecord, "after_update")
+def _index_image_update(mapper, connection, target):
+    _upsert_document(connection, "image", target.image_id, target.project_id,
+                     image_document_text(target.description_ko, target.keywords_json), replace=True)
+
+
+@event.listens_for(ImageRecord, "after_delete")
+def _index_image_delete(mapper, connection, target):
+    _delete_document(connection, "image", target.image_id)
+
+
+# =========================
+# 스키마 (SQLite FTS5) 및 기존 데이터 색인
+# =========================
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "tokens, project_id, content='search_documents', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 0')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_fts(rowid, tokens, project_id) VALUES (new.id, new.tokens, new.project_id); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, tokens, project_id) VALUES ('delete', old.id, old.tokens, old.project_id); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, tokens, project_id) VALUES ('delete', old.id, old.tokens, old.project_id); "
+    "INSERT INTO search_fts(rowid, tokens, project_id) VALUES (new.id, new.tokens, new.project_id); END",
+]
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(search_documents, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+@event.listens_for(search_documents, "after_create")
+def _backfill_documents(target, connection, **kw):
+    """검색 테이블이 처음 생성될 때 기존 채팅/이미지 기록 색인"""
+    rebuild_documents(connection)
+
+
+def rebuild_documents(connection: Connection, batch_size: int = 1000) -> int:
+    """기존 ChatMessage / ImageRecord 전체를 search_documents 에 색인"""
+    inspector = inspect(connection)
+    indexed = 0
+    sources = [
+        ("chat", "chat_messages", "message_id, project_id, user_message, ai_response",
+         lambda row: chat_document_text(row[2], row[3])),
+        ("image", "image_records", "image_id, project_id, description_ko, keywords_json",
+         lambda row: image_document_text(row[2], row[3])),
+    ]
+
+    for doc_type, table, columns, to_text in sources:
+        if not inspector.has_table(table):
+            continue
+        batch = []
+        for row in connection.execute(text(f"SELECT {columns} FROM {table}")):
+            tokens = tokenize(to_text(row))
+            if row[0] and tokens:
+                batch.append({"doc_type": doc_type, "doc_key": row[0], "project_id": row[1], "tokens": tokens})
+            if len(batch) >= batch_size:
+                connection.execute(search_documents.insert(), batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            connection.execute(search_documents.insert(), batch)
+            indexed += len(batch)
+
+    if indexed:
+        logger.info(f"🔍 Search index backfilled: {indexed} documents")
+    return indexed
@@ -0,0 +1,119 @@
+"""
+스트리밍 토큰 프레임 병합 (coalescing)
+- OpenAI 델타는 보통 한글 1~3자 - 델타마다 프레임을 쓰면 JSON/SSE 오버헤드와 소켓 쓰기가 토큰 수만큼 발생
+- 첫 토큰은 즉시 전송 (체감 TTFT 유지), 이후 토큰은 N ms 또는 N 바이트 중 먼저 도달하는 시점에 한 프레임으로 전송
+- 시작/종료/폴백 이벤트는 버퍼를 먼저 비운 뒤 그대로 전달
+- 라우터의 스트림 큐에 연결해 사용 (윈도우 마감 타이머가 큐에 flush 신호를 넣음 - 추가 태스크 없음)
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, Optional, Any, List, Callable
+
+from app.services.stream_events import StreamEvent, ContentEvent
+
+logger = logging.getLogger(__name__)
+
+
+class StreamCoalescer:
+    """시간/크기 윈도우 기반 컨텐츠 이벤트 병합기"""
+
+    def __init__(self, window_ms: float = 50, max_bytes: int = 1024):
+        """
+        Args:
+            window_ms: 버퍼에 첫 조각이 들어온 뒤 최대 대기 시간 (0 이하면 병합 안 함)
+            max_bytes: 버퍼가 이 크기(UTF-8 바이트)에 도달하면 즉시 전송
+        """
+        self.window = window_ms / 1000
+        self.max_bytes = max_bytes
+        self.events_in = 0
+        self.frames_out = 0
+
+    @classmethod
+    def from_env(cls) -> "StreamCoalescer":
+        return cls(
+            window_ms=float(os.getenv("STREAM_COALESCE_MS", "50")),
+            max_bytes=int(os.getenv("STREAM_COALESCE_BYTES", "1024"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def buffer(self, schedule_flush: Callable[[], None]) -> "CoalescingBuffer":
+        """스트림 1개용 버퍼
+
+        Args:
+            schedule_flush: 윈도우 마감 시 (이벤트 루프 타이머에서) 호출 - 소비자가 flush() 하도록 알림
+        """
+        return CoalescingBuffer(self, schedule_flush)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000,
+            "max_bytes": self.max_bytes,
+            "events_in": self.events_in,
+            "frames_out": self.frames_out,
+            "frames_saved": f"{(1 - self.frames_out / self.events_in) * 100 if self.events_in else 0:.1f}%"
+        }
+
+
+class CoalescingBuffer:
+    """스트림 1개의 병합 상태 - 타이머는 윈도우당 1개 (이벤트마다 타임아웃 대기를 만들지 않음)"""
+
+    __slots__ = ("coalescer", "schedule_flush", "parts", "size", "first_sent", "timer")
+
+    def __init__(self, coalescer: StreamCoalescer, schedule_flush: Callable[[], None]):
+        self.coalescer = coalescer
+        self.schedule_flush = schedule_flush
+        self.parts: List[str] = []
+        self.size = 0
+        self.first_sent = False
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def add(self, event: StreamEvent) -> List[StreamEvent]:
+        """이벤트 1개 추가 - 지금 보낼 이벤트 목록 반환"""
+        coalescer = self.coalescer
+        coalescer.events_in += 1
+        if isinstance(event, ContentEvent) and not event.fallback and coalescer.enabled:
+            if not self.first_sent:
+                # 첫 토큰은 즉시
+                self.first_sent = True
+                coalescer.frames_out += 1
+                return [event]
+            if not self.parts:
+                self.timer = asyncio.get_running_loop().call_later(coalescer.window, self.schedule_flush)
+            self.parts.append(event.text)
+            self.size += len(event.text.encode("utf-8"))
+            return self.flush() if self.size >= coalescer.max_bytes else []
+
+        # 시작/종료/폴백 등 - 버퍼를 먼저 비우고 그대로 전달
+        out = self.flush()
+        out.append(event)
+        coalescer.frames_out += 1
+        return out
+
+    def flush(self) -> List[StreamEvent]:
+        """버퍼에 모인 조각을 한 프레임으로"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.parts:
+            return []
+        text = "".join(self.parts)
+        self.parts = []
+        self.size = 0
+        self.coalescer.frames_out += 1
+        return [ContentEvent(text)]
+
+
+# 싱글톤 인스턴스
+_stream_coalescer: Optional[StreamCoalescer] = None
+
+def get_stream_coalescer() -> StreamCoalescer:
+    """스트림 병합기 인스턴스 가져오기"""
+    global _stream_coalescer
+    if _stream_coalescer is None:
+        _stream_coalescer = StreamCoalescer.from_env()
+    return _stream_coalescer
@@ -0,0 +1,155 @@
+"""
+채팅 스트리밍 이벤트
+- 프로바이더 → 라우터 → API 까지 타입이 있는 이벤트 객체를 그대로 전달 (중간 JSON 왕복 없음)
+- SSE 직렬화는 응답 가장자리에서 한 번만 수행 (orjson 이 있으면 사용)
+- WebSocket 은 짧은 키의 압축 프레임 사용 (to_frame)
+"""
+
+import json
+from typing import Dict, Optional, Any
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성 - 없으면 표준 json 사용
+    orjson = None
+
+
+class StreamEvent:
+    """스트림 이벤트 기본 클래스"""
+    __slots__ = ()
+    type = ""
+
+    frame_type = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type}
+
+    def to_frame(self) -> Dict[str, Any]:
+        """WebSocket 압축 프레임 (짧은 키)"""
+        return {"t": self.frame_type}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()})"
+
+
+class StartEvent(StreamEvent):
+    """응답 시작 (모델 이름, 로컬 응답이면 인텐트)"""
+    __slots__ = ("model", "intent")
+    type = "start"
+    frame_type = "s"
+
+    def __init__(self, model: str, intent: Optional[str] = None):
+        self.model = model
+        self.intent = intent
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"type": self.type, "model": self.model}
+        if self.intent:
+            data["intent"] = self.intent
+        return data
+
+    def to_frame(self) -> Dict[str, Any]:
+        data = {"t": self.frame_type, "m": self.model}
+        if self.intent:
+            data["i"] = self.intent
+        return data
+
+
+class ContentEvent(StreamEvent):
+    """응답 텍스트 조각 (fallback: 업스트림 실패로 대체된 응답)"""
+    __slots__ = ("text", "fallback")
+    type = "content"
+    frame_type = "d"
+
+    def __init__(self, text: str, fallback: bool = False):
+        self.text = text
+        self.fallback = fallback
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"type": self.type, "text": self.text}
+        if self.fallback:
+            data["fallback"] = True
+        return data
+
+    def to_frame(self) -> Dict[str, Any]:
+        data = {"t": self.frame_type, "x": self.text}
+        if self.fallback:
+            data["f"] = 1
+        return data
+
+
+class EndEvent(StreamEvent):
+    """응답 종료 (토큰 사용량, 저장된 메시지 ID)"""
+    __slots__ = ("usage", "message_id")
+    type = "end"
+    frame_type = "e"
+
+    def __init__(self, usage: Optional[Dict[str, int]] = None, message_id: Optional[str] = None):
+        self.usage = usage
+        self.message_id = message_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"type": self.type}
+        if self.message_id:
+            data["message_id"] = self.message_id
+        if self.usage:
+            data["usage"] = self.usage
+        return data
+
+    def to_frame(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"t": self.frame_type}
+        if self.message_id:
+            data["mid"] = self.message_id
+        if self.usage:
+            data["u"] = self.usage
+        return data
+
+
+class ErrorEvent(StreamEvent):
+    """스트림 처리 오류"""
+    __slots__ = ("error",)
+    type = "error"
+    frame_type = "x"
+
+    def __init__(self, error: str):
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "error": self.error}
+
+    def to_frame(self) -> Dict[str, Any]:
+        return {"t": self.frame_type, "e": self.error}
+
+
+class TimingEvent(StreamEvent):
+    """스트림 마지막 구간 타이밍 (Server-Timing 헤더는 본문보다 먼저 나가므로)"""
+    __slots__ = ("phases",)
+    type = "timing"
+    frame_type = "tm"
+
+    def __init__(self, phases: Dict[str, Any]):
+        self.phases = phases
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "phases": self.phases}
+
+    def to_frame(self) -> Dict[str, Any]:
+        return {"t": self.frame_type, "p": self.phases}
+
+
+def encode_json(data: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_sse(event: StreamEvent) -> bytes:
+    """이벤트 → SSE 프레임 (응답 가장자리에서 한 번만 호출)"""
+    return b"data: " + encode_json(event.to_dict()) + b"\n\n"
+
+
+def encode_frame(event: StreamEvent, stream_id: str) -> str:
+    """이벤트 → WebSocket 텍스트 프레임 (다중화용 스트림 ID 포함)"""
+    data = event.to_frame()
+    data["id"] = stream_id
+    return encode_json(data).decode("utf-8")
@@ -0,0 +1,93 @@
+"""
+요청 단위 구간(span) 타이밍
+- 요청마다 RequestTimings 하나를 contextvar 로 전달 (TimingMiddleware 가 생성)
+- span("db") 처럼 감싸면 현재 요청의 구간별 누적 시간/횟수에 기록 (요청 밖에서는 아무것도 안 함)
+- 스트리밍 시도 태스크/SQLAlchemy greenlet 도 컨텍스트를 물려받아 같은 요청에 기록
+- 결과는 Server-Timing 헤더, 스트림 마지막 timing 이벤트, 샘플링된 구조화 로그로 출력
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Any, Iterator, List
+
+
+class RequestTimings:
+    """요청 1건의 구간별 시간 (같은 이름은 합산)"""
+
+    __slots__ = ("started_at", "phases")
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float):
+        phase = self.phases.get(name)
+        if phase is None:
+            self.phases[name] = [seconds, 1]
+        else:
+            phase[0] += seconds
+            phase[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """구간별 {ms, n} + 전체 ms"""
+        data: Dict[str, Any] = {
+            name: {"ms": round(seconds * 1000, 2), "n": int(count)}
+            for name, (seconds, count) in self.phases.items()
+        }
+        data["total"] = {"ms": round(self.elapsed() * 1000, 2), "n": 1}
+        return data
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (현재까지 기록된 구간 + total)"""
+        parts = []
+        for name, (seconds, count) in self.phases.items():
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                part += f';desc="x{int(count)}"'
+            parts.append(part)
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def record(name: str, seconds: float):
+    """이미 잰 시간을 현재 요청에 기록"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def span(name: str, metric: Any = None) -> Iterator[None]:
+    """구간 측정
+
+    Args:
+        name: 구간 이름 (Server-Timing 에 그대로 노출 - 영문 토큰)
+        metric: 레이블 1개짜리 히스토그램 메트릭 (구간 이름을 레이블로 함께 기록)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings = _current.get()
+        if timings is not None:
+            timings.add(name, elapsed)
+        if metric is not None:
+            metric.labels(name).observe(elapsed)
@@ -0,0 +1,419 @@
+"""
+현장 사진 의미 검색용 벡터 인덱스
+- float32 임베딩을 메모리 맵 파일로 저장 → 모든 워커가 같은 페이지 캐시를 공유
+- 추가 전용(append-only) 로그 + 삭제/교체 누적 시 세대(generation) 단위 압축
+- 프로젝트/공간/단계 필터를 적용한 벡터화 top-k 검색
+- 임베딩 프로바이더 교체 가능 (기본: 오프라인 해싱 임베더)
+"""
+
+import os
+import json
+import zlib
+import fcntl
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional, List, Any, Tuple
+
+import numpy as np
+
+from app.services.search_service import split_words, tokenize
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# 임베딩 프로바이더
+# =========================
+
+class HashingEmbedder:
+    """오프라인 기본 임베더 - 단어/바이그램 feature hashing (외부 호출 없음)"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-v1:{dim}"
+
+    def _embed_one(self, value: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        features = split_words(value) + tokenize(value).split()
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self._embed_one(t) for t in texts])
+
+
+class OpenAIEmbedder:
+    """OpenAI 임베딩 API (text-embedding-3-* 의 dimensions 축소 사용)"""
+
+    def __init__(self, model: str = "text-embedding-3-small", dim: int = 256):
+        self.model = model
+        self.dim = dim
+        self.name = f"openai:{model}:{dim}"
+        self._client = None
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if self._client is None:
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        response = await self._client.embeddings.create(model=self.model, input=texts, dimensions=self.dim)
+        vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+EMBEDDERS = {
+    "hashing": lambda dim: HashingEmbedder(dim=dim),
+    "openai": lambda dim: OpenAIEmbedder(model=os.getenv("IMAGE_EMBEDDING_MODEL", "text-embedding-3-small"), dim=dim),
+}
+
+def get_embedder():
+    """환경변수 IMAGE_EMBEDDER (hashing / openai) 로 임베더 선택"""
+    name = os.getenv("IMAGE_EMBEDDER", "hashing")
+    dim = int(os.getenv("IMAGE_EMBEDDING_DIM", "256"))
+    if name not in EMBEDDERS:
+        logger.warning(f"Unknown IMAGE_EMBEDDER '{name}', falling back to hashing")
+        name = "hashing"
+    return EMBEDDERS[name](dim)
+
+
+# =========================
+# 메모리 맵 벡터 인덱스
+# =========================
+
+FILTER_FIELDS = ("project_id", "space", "stage")
+
+
+class VectorIndex:
+    """메모리 맵 float32 벡터 + id 맵
+
+    디렉터리 구성:
+        meta.json            현재 세대, 차원, 임베더 이름
+        vectors.{gen}.f32    행 단위 float32 벡터 (추가 전용)
+        log.{gen}.jsonl      행 로그 {"op": "add", "id", "project_id", "space", "stage"} / {"op": "del", "id"}
+        .lock                워커 간 쓰기 잠금 (flock)
+
+    쓰기는 벡터를 먼저 붙인 뒤 로그를 기록하므로, 로그에 있는 행은 항상 벡터가 존재한다.
+    다른 워커의 쓰기/압축은 검색 시 파일 크기와 meta.json 변경으로 감지한다.
+    """
+
+    def __init__(self, path: str, dim: int, embedder_name: str, compact_ratio: float = 0.3):
+        """
+        Args:
+            path: 인덱스 디렉터리
+            dim: 벡터 차원
+            embedder_name: 임베더 식별자 (바뀌면 인덱스를 비우고 재색인)
+            compact_ratio: 죽은 행 비율이 이 값을 넘으면 압축
+        """
+        self.path = path
+        self.dim = dim
+        self.embedder_name = embedder_name
+        self.compact_ratio = compact_ratio
+        os.makedirs(path, exist_ok=True)
+
+        self._meta_stat: Optional[Tuple[int, int]] = None
+        self._reset_state(generation=0)
+
+        with self._locked():
+            meta = self._read_meta()
+            if meta is None or meta.get("dim") != dim or meta.get("embedder") != embedder_name:
+                if meta is not None:
+                    logger.warning(f"🧭 Vector index embedder changed ({meta.get('embedder')} → {embedder_name}), resetting")
+                self._write_generation(meta.get("generation", 0) + 1 if meta else 1, np.zeros((0, dim), np.float32), [])
+        self.refresh()
+
+    # ---------- 파일 경로 / 잠금 ----------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _vectors_file(self, generation: int) -> str:
+        return self._file(f"vectors.{generation}.f32")
+
+    def _log_file(self, generation: int) -> str:
+        return self._file(f"log.{generation}.jsonl")
+
+    @contextmanager
+    def _locked(self):
+        with open(self._file(".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_generation(self, generation: int, vectors: np.ndarray, rows: List[Dict[str, Any]]):
+        """새 세대 파일을 쓰고 meta.json 을 원자적으로 교체 (잠금 상태에서 호출)"""
+        vectors.astype(np.float32).tofile(self._vectors_file(generation))
+        with open(self._log_file(generation), "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps({"op": "add", **row}, ensure_ascii=False) + "\n")
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"generation": generation, "dim": self.dim, "embedder": self.embedder_name}, f)
+        os.replace(tmp, self._file("meta.json"))
+
+        # 이전 세대 파일 정리 (이미 열린 메모리 맵은 그대로 유효)
+        for name in os.listdir(self.path):
+            if name.startswith(("vectors.", "log.")) and not name.startswith((f"vectors.{generation}.", f"log.{generation}.")):
+                try:
+                    os.remove(self._file(name))
+                except OSError:
+                    pass
+
+    # ---------- 메모리 상태 ----------
+
+    def _reset_state(self, generation: int):
+        self.generation = generation
+        self._log_offset = 0
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.ids: List[str] = []
+        self.id_map: Dict[str, int] = {}
+        self._alive: List[bool] = []
+        self._codes: Dict[str, Dict[str, int]] = {field: {} for field in FILTER_FIELDS}
+        self._columns: Dict[str, List[int]] = {field: [] for field in FILTER_FIELDS}
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+
+    def _code(self, field: str, value: Optional[str]) -> int:
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _apply(self, entry: Dict[str, Any]):
+        image_id = entry["id"]
+        previous = self.id_map.pop(image_id, None)
+        if previous is not None:
+            self._alive[previous] = False
+        if entry["op"] == "add":
+            row = len(self.ids)
+            self.ids.append(image_id)
+            self.id_map[image_id] = row
+            self._alive.append(True)
+            for field in FILTER_FIELDS:
+                self._columns[field].append(self._code(field, entry.get(field)))
+        self._arrays = None
+
+    def refresh(self):
+        """다른 워커의 추가/압축 반영 (변경 없으면 stat 두 번으로 끝남)"""
+        try:
+            stat = os.stat(self._file("meta.json"))
+        except OSError:
+            return
+        meta_stat = (stat.st_ino, stat.st_mtime_ns)
+        if meta_stat != self._meta_stat:
+            meta = self._read_meta() or {}
+            self._meta_stat = meta_stat
+            if meta.get("generation") != self.generation:
+                self._reset_state(meta.get("generation", 0))
+
+        log_path = self._log_file(self.generation)
+        try:
+            size = os.path.getsize(log_path)
+        except OSError:
+            return
+        if size == self._log_offset:
+            return
+
+        with open(log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # 아직 기록 중인 마지막 줄은 다음 refresh 에서 처리
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        self._log_offset += len(complete)
+
+        rows = len(self.ids)
+        if rows > len(self._vectors):
+            self._vectors = np.memmap(self._vectors_file(self.generation), dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def _filter_arrays(self) -> Dict[str, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = {field: np.asarray(values, dtype=np.int32) for field, values in self._columns.items()}
+            self._arrays["alive"] = np.asarray(self._alive, dtype=bool)
+        return self._arrays
+
+    # ---------- 쓰기 ----------
+
+    def add(self, image_id: str, vector: np.ndarray, project_id: Optional[str] = None,
+            space: Optional[str] = None, stage: Optional[str] = None):
+        """벡터 추가 (같은 id 가 있으면 새 행으로 교체)"""
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._locked():
+            self.refresh()
+            with open(self._vectors_file(self.generation), "ab") as f:
+                f.write(vector.tobytes())
+            entry = {"op": "add", "id": image_id, "project_id": project_id, "space": space, "stage": stage}
+            with open(self._log_file(self.generation), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.refresh()
+            if self._should_compact():
+                self._compact_locked()
+
+    def remove(self, image_id: str) -> bool:
+        with self._locked():
+            self.refresh()
+            if image_id not in self.id_map:
+                return False
+            with open(self._log_file(self.generation), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"op": "del", "id": image_id}) + "\n")
+            self.refresh()
+            if self._should_compact():
+                self._compact_locked()
+        return True
+
+    def _should_compact(self) -> bool:
+        total = len(self.ids)
+        return total >= 64 and (total - len(self.id_map)) / total > self.compact_ratio
+
+    def compact(self):
+        """죽은 행을 제거한 새 세대로 재작성"""
+        with self._locked():
+            self.refresh()
+            self._compact_locked()
+
+    def _compact_locked(self):
+        live = sorted(self.id_map.values())
+        reverse = {field: {code: value for value, code in self._codes[field].items()} for field in FILTER_FIELDS}
+        rows = [
+            {"id": self.ids[i], **{field: reverse[field][self._columns[field][i]] for field in FILTER_FIELDS}}
+            for i in live
+        ]
+        vectors = np.asarray(self._vectors[live]) if live else np.zeros((0, self.dim), np.float32)
+        dropped = len(self.ids) - len(live)
+        self._write_generation(self.generation + 1, vectors, rows)
+        self.refresh()
+        logger.info(f"🧹 Vector index compacted: {len(live)} rows kept, {dropped} dropped (generation {self.generation})")
+
+    # ---------- 검색 ----------
+
+    def search(self, query: np.ndarray, top_k: int = 10, project_id: Optional[str] = None,
+               space: Optional[str] = None, stage: Optional[str] = None) -> List[Tuple[str, float]]:
+        """코사인 유사도 top-k (필터는 AND)
+
+        Returns:
+            [(image_id, score)] 점수 내림차순
+        """
+        self.refresh()
+        rows = len(self.ids)
+        if not rows:
+            return []
+
+        arrays = self._filter_arrays()
+        mask = arrays["alive"].copy()
+        for field, value in (("project_id", project_id), ("space", space), ("stage", stage)):
+            if not value:
+                continue
+            code = self._codes[field].get(value)
+            if code is None:
+                return []
+            mask &= arrays[field] == code
+
+        candidates = np.flatnonzero(mask)
+        if not candidates.size:
+            return []
+
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        if candidates.size > rows // 2:
+            # 대부분이 후보면 전체 행렬곱 후 마스킹 (연속 메모리 접근)
+            scores = self._vectors[:rows] @ query
+            scores = scores[candidates]
+        else:
+            scores = self._vectors[candidates] @ query
+
+        k = min(top_k, candidates.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[candidates[i]], float(scores[i])) for i in top]
+
+    def get_stats(self) -> Dict[str, Any]:
+        self.refresh()
+        return {
+            "embedder": self.embedder_name,
+            "dim": self.dim,
+            "generation": self.generation,
+            "rows": len(self.ids),
+            "live": len(self.id_map),
+            "mapped_mb": round(self._vectors.nbytes / 1e6, 2)
+        }
+
+
+# =========================
+# 이미지 벡터 검색 서비스
+# =========================
+
+def image_embedding_text(record) -> str:
+    """ImageRecord → 임베딩 입력 텍스트"""
+    keywords = record.keywords_json or []
+    if isinstance(keywords, str):
+        try:
+            keywords = json.loads(keywords)
+        except ValueError:
+            keywords = [keywords]
+    parts = [record.description_ko, record.reasoning, " ".join(map(str, keywords)),
+             record.space_value, record.stage_value, record.trade_primary, record.caption]
+    return "\n".join(p for p in parts if p)
+
+
+class ImageVectorService:
+    """ImageRecord 임베딩 색인/검색"""
+
+    def __init__(self, path: str, embedder=None):
+        self.embedder = embedder or get_embedder()
+        self.index = VectorIndex(path, dim=self.embedder.dim, embedder_name=self.embedder.name)
+
+    async def index_record(self, record):
+        vector = (await self.embedder.embed([image_embedding_text(record)]))[0]
+        self.index.add(record.image_id, vector, project_id=record.project_id,
+                       space=record.space_value, stage=record.stage_value)
+
+    def remove(self, image_id: str) -> bool:
+        return self.index.remove(image_id)
+
+    async def search(self, query: str, top_k: int = 10, project_id: Optional[str] = None,
+                     space: Optional[str] = None, stage: Optional[str] = None) -> List[Tuple[str, float]]:
+        vector = (await self.embedder.embed([query]))[0]
+        return self.index.search(vector, top_k=top_k, project_id=project_id, space=space, stage=stage)
+
+    async def sync_records(self, records) -> int:
+        """아직 색인되지 않은 ImageRecord 일괄 색인 (시작 시 / 임베더 변경 후)"""
+        self.index.refresh()
+        missing = [r for r in records if r.image_id and r.image_id not in self.index.id_map]
+        for start in range(0, len(missing), 64):
+            batch = missing[start:start + 64]
+            vectors = await self.embedder.embed([image_embedding_text(r) for r in batch])
+            for record, vector in zip(batch, vectors):
+                self.index.add(record.image_id, vector, project_id=record.project_id,
+                               space=record.space_value, stage=record.stage_value)
+        if missing:
+            logger.info(f"🧭 Vector index synced: {len(missing)} images")
+        return len(missing)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.index.get_stats()
+
+
+# 싱글톤 인스턴스
+_image_vectors: Optional[ImageVectorService] = None
+
+def get_image_vectors() -> ImageVectorService:
+    """사진 벡터 검색 서비스 인스턴스 가져오기"""
+    global _image_vectors
+    if _image_vectors is None:
+        _image_vectors = ImageVectorService(os.getenv("VECTOR_INDEX_PATH", "db/image_vectors"))
+    return _image_vectors
@@ -1,43 +1,212 @@
+"""
+Startup sequence
+- One idempotent path: lifespan calls startup_event() once; calling it again is a no-op
+- Critical phase (before the port opens): create tables
+- Warm-up phase (in the background after the port opens): pool connections, in-memory
+  services used by every chat, then readiness flips
+- Vector index catch-up runs after readiness (search works without it, just incomplete),
+  then the periodic project stats consistency check starts
+- /ready reports 503 until warm-up is done and the database answers
+- gunicorn --preload: before_fork() builds read-only services once in the master and
+  freezes them for copy-on-write sharing; after_fork() gives each worker its own
+  connection pool and API clients (see gunicorn.conf.py)
+"""
+
+import os
+import gc
+import sys
+import time
 import asyncio
-from app.database import engine, init_db, get_db
-from app.models.project import Project
-from sqlalchemy import select
+from typing import Dict, Any, List, Optional, Tuple
+from app.database import engine, read_engine, init_db, SessionLocal, IS_ASYNC, sqlite_writer
+from app.models.image_record import ImageRecord
+from app.services.vector_index import get_image_vectors
+from app.services.intent_engine import get_intent_engine
+from app.services.knowledge_service import get_knowledge_service
+from app.services.prompt_engine import get_prompt_engine
+from app.services.metrics import process_memory
+from app.services.project_stats import get_stats_checker
+from sqlalchemy import select, text
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def warmup_db():
-    """Warm up database connections and cache"""
+# Connections opened during warm-up (cheap on SQLite, saves a TLS handshake per connection on Postgres)
+WARM_CONNECTIONS = int(os.getenv("STARTUP_WARM_CONNECTIONS", "2"))
+READY_DB_TIMEOUT = float(os.getenv("READY_DB_TIMEOUT", "2"))
+
+_state: Dict[str, Any] = {
+    "phase": "not_started",
+    "ready": False,
+    "error": None,
+    "durations_ms": {},
+}
+_started_at: Optional[float] = None
+_background: Optional[asyncio.Task] = None
+
+
+async def _run_phase(name: str, func):
+    """Run one startup phase and record its duration"""
+    _state["phase"] = name
+    start = time.perf_counter()
+    try:
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+    finally:
+        _state["durations_ms"][name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def _engines() -> List[Any]:
+    """Primary engine plus the read engine when it is a separate pool"""
+    return [engine] if read_engine is engine else [engine, read_engine]
+
+
+async def _touch(pool_engine):
+    """Check out one connection from pool_engine and run SELECT 1"""
+    if IS_ASYNC:
+        async with pool_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    else:
+        await asyncio.to_thread(_touch_sync, pool_engine)
+
+
+def _touch_sync(pool_engine=engine):
+    with pool_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def warm_pool(connections: int = WARM_CONNECTIONS):
+    """Open pool connections concurrently so the first requests don't pay for connect"""
+    await asyncio.gather(*(_touch(e) for e in _engines() for _ in range(max(1, connections))))
+
+
+def warm_services():
+    """Load in-memory services every chat request needs (rules, knowledge, prompts)"""
+    get_intent_engine()
+    get_knowledge_service()
+    get_prompt_engine()
+
+
+async def sync_vector_index():
+    """Index ImageRecords missing from the photo vector index"""
+    try:
+        service = get_image_vectors()
+        indexed_ids = set(service.index.id_map)
+        records = []
+        if IS_ASYNC:
+            async with SessionLocal() as db:
+                all_ids = (await db.execute(select(ImageRecord.image_id))).scalars().all()
+                missing = [i for i in all_ids if i and i not in indexed_ids]
+                for start in range(0, len(missing), 500):
+                    query = select(ImageRecord).where(ImageRecord.image_id.in_(missing[start:start + 500]))
+                    records.extend((await db.execute(query)).scalars().all())
+        else:
+            with SessionLocal() as db:
+                all_ids = db.execute(select(ImageRecord.image_id)).scalars().all()
+                missing = [i for i in all_ids if i and i not in indexed_ids]
+                for start in range(0, len(missing), 500):
+                    query = select(ImageRecord).where(ImageRecord.image_id.in_(missing[start:start + 500]))
+                    records.extend(db.execute(query).scalars().all())
+        await service.sync_records(records)
+    except Exception as e:
+        logger.error(f"Error syncing vector index: {e}")
+
+
+async def _warm_up():
     try:
-        # Initialize database tables
-        await init_db()
-        
-        # Pre-create connection pool
-        async with engine.begin() as conn:
-            # Simple query to establish connections
-            await conn.execute(select(1))
-        
-        # Warm up the connection pool with multiple connections
-        tasks = []
-        for _ in range(3):
-            async def test_connection():
-                async for db in get_db():
-                    try:
-                        # Simple query to warm up connection
-                        result = await db.execute(select(Project).limit(1))
-                        result.scalar()
-                    except Exception:
-                        pass  # Ignore if no projects exist
-                    break
-            
-            tasks.append(test_connection())
-        
-        await asyncio.gather(*tasks)
-        logger.info("Database connection pool warmed up successfully")
-        
+        await _run_phase("warm_pool", warm_pool)
+        await _run_phase("warm_services", warm_services)
+        _state["ready"] = True
+        _state["durations_ms"]["ready"] = round((time.perf_counter() - _started_at) * 1000, 1)
+        memory = process_memory()
+        logger.info(f"Ready in {_state['durations_ms']['ready']} ms (rss {memory.get('rss', 0) // 1048576} MB, "
+                    f"private {memory.get('private', 0) // 1048576} MB)")
+        await _run_phase("vector_sync", sync_vector_index)
+        get_stats_checker().start()
+        _state["phase"] = "done"
     except Exception as e:
-        logger.error(f"Error warming up database: {e}")
+        _state["phase"] = "failed"
+        _state["error"] = str(e)
+        logger.error(f"Startup warm-up failed: {e}")
+
 
 async def startup_event():
-    """Run startup tasks"""
-    await warmup_db()
\ No newline at end of file
+    """Run the startup sequence once (later calls return immediately)"""
+    global _started_at, _background
+    if _started_at is not None:
+        return
+    _started_at = time.perf_counter()
+    await _run_phase("init_db", init_db)
+    _background = asyncio.create_task(_warm_up())
+
+
+async def shutdown_event():
+    """Stop the warm-up task and close pooled connections (aiosqlite threads keep the process alive otherwise)"""
+    if _background is not None and not _background.done():
+        _background.cancel()
+    await get_stats_checker().stop()
+    await sqlite_writer.stop()
+    for pool_engine in {engine, read_engine}:
+        if IS_ASYNC:
+            await pool_engine.dispose()
+        else:
+            pool_engine.dispose()
+
+
+# Lazily created per-process singletons that hold network clients (module, global name)
+_WORKER_CLIENTS = (
+    ("app.services.gpt_service", "_gpt_service"),
+    ("app.services.llm_router", "_llm_router"),
+)
+
+
+def _dispose_engine(close: bool):
+    for pool_engine in {engine, read_engine}:
+        (pool_engine.sync_engine if IS_ASYNC else pool_engine).dispose(close=close)
+
+
+def before_fork() -> Dict[str, int]:
+    """Prepare the preloaded master for forking a worker (gunicorn pre_fork; idempotent)
+
+    Builds the read-only services once so workers share their pages, drops any pooled
+    connection, then moves every live object to the permanent GC generation so worker
+    collections never write to (and thereby copy) the shared pages.
+    """
+    warm_services()
+    _dispose_engine(close=True)
+    gc.collect()
+    gc.freeze()
+    return process_memory()
+
+
+def after_fork() -> Dict[str, int]:
+    """Reset per-process resources inherited from the master (gunicorn post_fork)
+
+    The pool is replaced without closing inherited connections (the master owns those
+    sockets); API clients are rebuilt on first use so no HTTP/gRPC connection is shared.
+    """
+    _dispose_engine(close=False)
+    for module_name, attr in _WORKER_CLIENTS:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            setattr(module, attr, None)
+    gemini = sys.modules.get("app.services.gemini_service")
+    if gemini is not None:
+        gemini.UnifiedGeminiService._instance = None
+    return process_memory()
+
+
+async def check_ready() -> Tuple[bool, Dict[str, Any]]:
+    """Ready = warm-up finished and the databases (primary and read pool) answer right now"""
+    status = {**_state, "durations_ms": dict(_state["durations_ms"]), "memory": process_memory()}
+    if not _state["ready"]:
+        return False, status
+    try:
+        # Reads go to the read pool (replica), so it has to answer too
+        await asyncio.wait_for(asyncio.gather(*(_touch(e) for e in _engines())), READY_DB_TIMEOUT)
+    except Exception as e:
+        status["database"] = f"error: {e}"
+        return False, status
+    status["database"] = "ok"
+    return True, status
@@ -0,0 +1,110 @@
+"""
+API 캐시 벤치마크 (기존 SimpleCache vs APICache)
+- 키 변동(churn): 매번 다른 쿼리 파라미터로 set → 남은 항목 수, 캐시가 붙잡고 있는 메모리(tracemalloc)
+- 동시 미스(stampede): 같은 키를 동시에 요청 → 로더(DB 조회) 실행 횟수, 전체 소요 시간
+- 키 생성 비용: make_key 호출당 시간
+- legacy 는 기존 SimpleCache 동작을 그대로 옮긴 것 (dict + datetime TTL, 읽힐 때만 만료 제거, json+MD5 키)
+
+실행: cd backend && python -m benchmarks.bench_cache [--keys 200000] [--concurrency 200]
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.middleware.cache import APICache
+
+
+class LegacyCache:
+    """기존 SimpleCache (비교용)"""
+
+    def __init__(self):
+        self.cache = {}
+
+    def get(self, key):
+        if key in self.cache:
+            entry = self.cache[key]
+            if datetime.now() < entry['expires_at']:
+                return entry['value']
+            del self.cache[key]
+        return None
+
+    def set(self, key, value, ttl_seconds=60):
+        self.cache[key] = {'value': value, 'expires_at': datetime.now() + timedelta(seconds=ttl_seconds)}
+
+    def make_key(self, prefix, params):
+        return f"{prefix}:{hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()}"
+
+
+def _payload(i: int):
+    # list_projects 응답 한 페이지 정도 (프로젝트 20개)
+    return [{"project_id": f"proj_{i:08x}", "name": f"현장 {j}", "description": None} for j in range(20)]
+
+
+def bench_churn(cache, keys: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(keys):
+        key = cache.make_key("projects", {"skip": i, "limit": 20})
+        cache.set(key, _payload(i), ttl_seconds=30)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(cache.cache), current, elapsed
+
+
+async def bench_stampede(cache, concurrency: int, load_ms: float):
+    calls = 0
+    key = cache.make_key("projects", {"skip": 0, "limit": 50})
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(load_ms / 1000)
+        return _payload(0)
+
+    async def request():
+        if isinstance(cache, APICache):
+            return await cache.get_or_load(key, loader, 30, ("projects",))
+        value = cache.get(key)
+        if value is None:
+            value = await loader()
+            cache.set(key, value, ttl_seconds=30)
+        return value
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(concurrency)))
+    return calls, (time.perf_counter() - start) * 1000
+
+
+def bench_make_key(cache, n: int = 100000):
+    start = time.perf_counter()
+    for i in range(n):
+        cache.make_key("projects", {"skip": i, "limit": 50})
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=200000, help="churn 단계에서 set 할 서로 다른 키 수")
+    parser.add_argument("--concurrency", type=int, default=200, help="같은 키 동시 요청 수")
+    parser.add_argument("--load-ms", type=float, default=50, help="로더(DB 조회) 소요 시간")
+    parser.add_argument("--max-entries", type=int, default=512)
+    args = parser.parse_args()
+
+    print(f"churn {args.keys} keys, stampede {args.concurrency} concurrent misses ({args.load_ms:.0f} ms loader)")
+    print(f"{'cache':>8} {'entries':>9} {'held MB':>8} {'set us':>7} {'loads':>6} {'stampede ms':>12} {'key ns':>7}")
+    for label, factory in (("legacy", LegacyCache), ("api", lambda: APICache(max_entries=args.max_entries))):
+        entries, held, elapsed = bench_churn(factory(), args.keys)
+        calls, stampede_ms = asyncio.run(bench_stampede(factory(), args.concurrency, args.load_ms))
+        key_ns = bench_make_key(factory())
+        print(f"{label:>8} {entries:9d} {held / 1048576:8.1f} {elapsed / args.keys * 1e6:7.2f} "
+              f"{calls:6d} {stampede_ms:12.1f} {key_ns:7.0f}")
+
+
+if __name__ == "__main__":
+    main()
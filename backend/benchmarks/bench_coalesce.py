@@ -0,0 +1,158 @@
+"""
+SSE 토큰 프레임 병합 벤치마크
+- OpenAI 와 비슷한 델타 스트림 (한글 1~3자, 토큰 간격 지터) 을 가짜 프로바이더로 재현
+- 병합 설정마다 실제 uvicorn 서버 프로세스를 띄우고 HTTP 로 동시 스트리밍
+- 응답당 프레임(소켓 쓰기) 수, 전송 바이트, 서버 CPU 시간, 첫 토큰 시간(TTFT), 완료 시간 비교
+- 서버 CPU 는 /proc/<pid>/stat 기준 (Linux)
+
+실행: cd backend && python -m benchmarks.bench_coalesce [--streams 100] [--tokens 200]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+import httpx
+
+SYLLABLES = "욕실타일줄눈시공전에방수층양생을충분히확인해주세요바닥수평철거설비목공도장마감"
+CONFIGS = [(0, 0), (20, 1024), (50, 1024), (100, 1024), (50, 64)]
+
+
+class DeltaProvider:
+    """OpenAI 스트림처럼 짧은 델타를 지터가 있는 간격으로 내보내는 가짜 업스트림"""
+    model_name = "bench-model"
+
+    def __init__(self, tokens: int, interval_ms: float):
+        self.tokens = tokens
+        self.interval = interval_ms / 1000
+
+    async def generate_stream(self, message, project_context=None, conversation_history=None,
+                              deadline=None, skip_quick_patterns=False):
+        from app.services.stream_events import StartEvent, ContentEvent, EndEvent
+        rng = random.Random(message)
+        yield StartEvent(self.model_name)
+        for _ in range(self.tokens):
+            await asyncio.sleep(rng.expovariate(1 / self.interval))
+            delta = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+            yield ContentEvent(delta + (" " if rng.random() < 0.3 else ""))
+        yield EndEvent()
+
+
+def serve(args):
+    """벤치마크용 서버 프로세스 (가짜 프로바이더 주입)"""
+    import logging
+    import uvicorn
+    logging.disable(logging.INFO)
+
+    from app.main import app
+    from app.database import engine
+    from app.services.llm_router import get_llm_router
+
+    engine.echo = False
+    router = get_llm_router()
+    router.providers = {"openai": lambda: DeltaProvider(args.tokens, args.interval_ms)}
+    router.order = ["openai"]
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def run_stream(client: httpx.AsyncClient, project_id: str, index: int):
+    """스트리밍 요청 1건 - (바이트, TTFT, 완료 시간)"""
+    start = time.perf_counter()
+    size = 0
+    first_token = None
+    last_token = 0.0
+    payload = {"project_id": project_id, "message": f"욕실 방수 공정 순서 {index}"}
+    async with client.stream("POST", "/api/v2/chat/stream", json=payload) as response:
+        async for line in response.aiter_lines():
+            size += len(line.encode("utf-8")) + 1
+            if line.startswith('data: {"type":"content"'):
+                last_token = time.perf_counter() - start
+                if first_token is None:
+                    first_token = last_token
+    return size, first_token or 0.0, last_token
+
+
+async def bench_config(args, window_ms: int, max_bytes: int, port: int):
+    tmp = tempfile.mkdtemp()
+    os.makedirs(os.path.join(tmp, "db"))
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp}/db/bench.db",
+        STREAM_COALESCE_MS=str(window_ms),
+        STREAM_COALESCE_BYTES=str(max_bytes),
+        CHAT_MAX_CONCURRENT=str(args.streams),
+        CHAT_MAX_PER_PROJECT=str(args.streams),
+        CHAT_MAX_QUEUE=str(args.streams),
+        PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_coalesce", "--serve", "--port", str(port),
+         "--tokens", str(args.tokens), "--interval-ms", str(args.interval_ms)],
+        cwd=tmp, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.streams + 10)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            for _ in range(200):
+                try:
+                    await client.get("/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            project_id = (await client.post("/api/v1/projects/", json={"name": "bench"})).json()["project_id"]
+            await run_stream(client, project_id, -1)  # 워밍업
+
+            frames_before = (await client.get("/cache-stats")).json()["stream_coalescer"]["frames_out"]
+            cpu_before = cpu_seconds(server.pid)
+            results = await asyncio.gather(*(run_stream(client, project_id, i) for i in range(args.streams)))
+            cpu_ms = (cpu_seconds(server.pid) - cpu_before) * 1000 / args.streams
+            frames = ((await client.get("/cache-stats")).json()["stream_coalescer"]["frames_out"] - frames_before)
+    finally:
+        server.terminate()
+        server.wait()
+
+    ttfts = sorted(r[1] * 1000 for r in results)
+    label = "off" if window_ms == 0 else f"{window_ms}ms/{max_bytes}B"
+    print(f"{label:>11} {frames / args.streams:12.1f} {statistics.mean(r[0] for r in results):11.0f} "
+          f"{cpu_ms:12.2f} {statistics.median(ttfts):8.1f}ms {ttfts[int(len(ttfts) * 0.99) - 1]:8.1f}ms "
+          f"{statistics.median(r[2] * 1000 for r in results):8.0f}ms")
+
+
+async def bench(args):
+    print(f"{args.streams} concurrent responses x {args.tokens} deltas, mean interval {args.interval_ms}ms")
+    print(f"{'window':>11} {'frames/resp':>12} {'bytes/resp':>11} {'cpu ms/resp':>12} "
+          f"{'ttft p50':>9} {'ttft p99':>9} {'done p50':>9}")
+    for window_ms, max_bytes in CONFIGS:
+        await bench_config(args, window_ms, max_bytes, args.port)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=100)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--interval-ms", type=float, default=15)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help="내부용: 벤치마크 서버 프로세스로 실행")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+    else:
+        asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+조건부 GET 벤치마크 (폴링)
+- 클라이언트가 프로젝트 화면을 주기적으로 다시 불러오는 상황: 프로젝트 / 채팅 기록 / 아카이브 목록
+- plain: 매번 전체 JSON 다시 받기 / conditional: 직전 ETag 로 If-None-Match → 변화 없으면 304
+- 요청당 지연(p50/p95), 응답 바이트, 서버 DB 쿼리 수(Server-Timing db 구간) 비교
+- 데이터는 bench_dashboard 의 --seed 로 생성 (프로젝트당 채팅/사진 수 조절)
+
+실행: cd backend && python -m benchmarks.bench_conditional [--projects 20] [--messages 50] [--images 30]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.bench_e2e import percentile
+from benchmarks.bench_dashboard import BACKEND_DIR, _free_port, db_queries
+
+
+def poll_paths(project_id: str) -> List[str]:
+    return [
+        f"/api/v1/projects/{project_id}",
+        f"/api/v2/chat/history/{project_id}?limit=50",
+        f"/api/v2/images/archive/{project_id}",
+    ]
+
+
+async def poll(client: httpx.AsyncClient, paths: List[str], rounds: int, conditional: bool) -> Dict[str, float]:
+    etags: Dict[str, str] = {}
+    latencies, nbytes, queries, not_modified = [], 0, 0, 0
+    for _ in range(rounds):
+        for path in paths:
+            headers = {"If-None-Match": etags[path]} if conditional and path in etags else {}
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code == 304:
+                not_modified += 1
+            else:
+                response.raise_for_status()
+                etags[path] = response.headers.get("etag", "")
+            nbytes += len(response.content)
+            queries += db_queries(response)
+    n = len(latencies)
+    return {
+        "p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+        "bytes": nbytes / n, "queries": queries / n, "not_modified": not_modified / n * 100
+    }
+
+
+async def bench(args, port: int):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+        for _ in range(300):
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+
+        paths = [path for p in range(args.projects) for path in poll_paths(f"proj_{p:05d}")]
+        print(f"\n🔁 폴링: 프로젝트 {args.projects}개 x 3 엔드포인트 x {args.rounds}회 "
+              f"(채팅 {args.messages}, 사진 {args.images}개씩)")
+        print(f"{'mode':<12}{'p50 ms':>9}{'p95 ms':>9}{'bytes/req':>11}{'db q/req':>10}{'304 %':>8}")
+        results = {}
+        for name, conditional in (("plain", False), ("conditional", True)):
+            results[name] = r = await poll(client, paths, args.rounds, conditional)
+            print(f"{name:<12}{r['p50']:>9.2f}{r['p95']:>9.2f}{r['bytes']:>11.0f}{r['queries']:>10.2f}"
+                  f"{r['not_modified']:>8.1f}")
+        print(f"\n⚡ p50 {results['plain']['p50'] / results['conditional']['p50']:.1f}x faster, "
+              f"{results['plain']['bytes'] / max(results['conditional']['bytes'], 1):.0f}x fewer bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조건부 GET 폴링 벤치마크")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=50, help="프로젝트별 채팅 수")
+    parser.add_argument("--images", type=int, default=30, help="프로젝트별 사진 수")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="tevor-conditional-")
+    os.makedirs(os.path.join(workdir, "db"))
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{workdir}/db/conditional.db",
+        STORAGE_PATH=os.path.join(workdir, "storage", "projects"),
+        METRICS_DIR=os.path.join(workdir, "metrics"),
+        TIMING_LOG_SAMPLE="0",
+        PYTHONPATH=BACKEND_DIR,
+    )
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_dashboard", "--seed", "--projects", str(args.projects),
+         "--messages", str(args.messages), "--images", str(args.images)],
+        cwd=workdir, env=env, check=True
+    )
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=open(os.path.join(workdir, "server.log"), "w")
+    )
+    try:
+        asyncio.run(bench(args, port))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+대시보드 벤치마크 (프로젝트 500개)
+- 기존: 프로젝트 목록 1회 + 프로젝트마다 요약/아카이브 요청 (2N+1 요청, 프로젝트마다 조회 + 폴더 스캔)
+- 신규: /api/v1/dashboard 페이지 단위 요청 (페이지당 쿼리 4번)
+- 브라우저처럼 호스트당 동시 6개로 요청, 전체 시간과 요청 수, 서버 DB 쿼리 수(Server-Timing db 구간) 비교
+- 데이터는 서버 시작 전에 DB 에 직접 생성 (통계는 쓰기 이벤트로 채워짐) + 아카이브 폴더에 작은 PNG
+
+실행: cd backend && python -m benchmarks.bench_dashboard [--projects 500] [--page-size 100]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, Any, List, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ["철거", "설비", "전기", "목공", "타일", "도장", "마감"]
+SPACES = ["거실", "주방", "욕실", "침실", "현관"]
+DB_SPAN = re.compile(r'(?:^|, )db;dur=[\d.]+(?:;desc="x(\d+)")?')
+
+
+def seed(args):
+    """벤치마크 DB/아카이브 생성 (서버와 같은 작업 디렉터리에서 실행)"""
+    import io
+    import asyncio
+    import logging
+    from PIL import Image
+    logging.disable(logging.INFO)
+
+    from app.database import SessionLocal, engine, init_db, IS_ASYNC
+    from app.models.project import Project
+    from app.models.image_record import ImageRecord, ChatMessage
+    from app.services import project_stats  # noqa: F401  (통계 이벤트 등록)
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 24), (120, 130, 140)).save(buffer, "PNG")
+    png = buffer.getvalue()
+    rng = random.Random(7)
+
+    async def run():
+        await init_db()
+        async with SessionLocal() as db:
+            for p in range(args.projects):
+                project_id = f"proj_{p:05d}"
+                db.add(Project(project_id=project_id, name=f"현장 {p}", description="벤치마크"))
+                for m in range(args.messages):
+                    db.add(ChatMessage(message_id=f"msg_{p:05d}_{m}", project_id=project_id,
+                                       user_message=f"{rng.choice(STAGES)} 공정 질문 {m}",
+                                       ai_response="확인했습니다. " * 20))
+                os.makedirs(os.path.join("archive", project_id), exist_ok=True)
+                for i in range(args.images):
+                    space, stage = rng.choice(SPACES), rng.choice(STAGES)
+                    filename = f"{space}_{stage}_20250101_000000_{p:05d}{i:03d}.png"
+                    with open(os.path.join("archive", project_id, filename), "wb") as f:
+                        f.write(png)
+                    record = ImageRecord(image_id=f"img_{p:05d}_{i}", project_id=project_id,
+                                         space_value=space, stage_value=stage,
+                                         storage_path=f"/archive/{project_id}/{filename}")
+                    record.file_size = len(png)
+                    db.add(record)
+                if p % 100 == 99:
+                    await db.commit()
+            await db.commit()
+        await engine.dispose()
+
+    assert IS_ASYNC, "SQLite 로 실행"
+    asyncio.run(run())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def db_queries(response: httpx.Response) -> int:
+    """Server-Timing 의 db 구간 횟수"""
+    match = DB_SPAN.search(response.headers.get("server-timing", ""))
+    if not match:
+        return 0
+    return int(match.group(1) or 1)
+
+
+async def fetch_all(client: httpx.AsyncClient, paths: List[str], concurrency: int) -> List[httpx.Response]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(path: str) -> httpx.Response:
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+            return response
+
+    return await asyncio.gather(*(fetch(path) for path in paths))
+
+
+async def legacy_dashboard(client: httpx.AsyncClient, args) -> Tuple[int, int]:
+    listing = await client.get("/api/v1/projects/", params={"limit": args.projects})
+    project_ids = [project["project_id"] for project in listing.json()]
+    paths = []
+    for project_id in project_ids:
+        paths += [f"/api/v1/projects/{project_id}/summary", f"/api/v1/projects/{project_id}/archive"]
+    responses = [listing] + await fetch_all(client, paths, args.concurrency)
+    return len(responses), sum(db_queries(r) for r in responses)
+
+
+async def batched_dashboard(client: httpx.AsyncClient, args) -> Tuple[int, int]:
+    pages = -(-args.projects // args.page_size)
+    paths = [f"/api/v1/dashboard/?page={page}&page_size={args.page_size}" for page in range(1, pages + 1)]
+    responses = await fetch_all(client, paths, args.concurrency)
+    assert sum(len(r.json()["projects"]) for r in responses) == args.projects
+    return len(responses), sum(db_queries(r) for r in responses)
+
+
+async def bench(args, port: int):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+        for _ in range(300):
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+
+        print(f"\n📋 대시보드: 프로젝트 {args.projects}개 (채팅 {args.messages}, 사진 {args.images}개씩), "
+              f"동시 요청 {args.concurrency}")
+        print(f"{'mode':<10}{'requests':>10}{'db queries':>12}{'p50 ms':>10}{'min ms':>10}")
+        results: Dict[str, Any] = {}
+        for name, run in (("legacy", legacy_dashboard), ("batched", batched_dashboard)):
+            times = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                requests, queries = await run(client, args)
+                times.append((time.perf_counter() - start) * 1000)
+            times.sort()
+            results[name] = times[len(times) // 2]
+            print(f"{name:<10}{requests:>10}{queries:>12}{times[len(times) // 2]:>10.0f}{times[0]:>10.0f}")
+        print(f"\n⚡ {results['legacy'] / results['batched']:.1f}x faster")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 N+1 벤치마크")
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=5, help="프로젝트별 채팅 수")
+    parser.add_argument("--images", type=int, default=3, help="프로젝트별 사진 수")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=6, help="브라우저 호스트당 동시 연결 수")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", action="store_true", help="내부용: 데이터 생성만 실행")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="tevor-dashboard-")
+    os.makedirs(os.path.join(workdir, "db"))
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{workdir}/db/dashboard.db",
+        STORAGE_PATH=os.path.join(workdir, "storage", "projects"),
+        METRICS_DIR=os.path.join(workdir, "metrics"),
+        TIMING_LOG_SAMPLE="0",
+        PYTHONPATH=BACKEND_DIR,
+    )
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_dashboard", "--seed", "--projects", str(args.projects),
+         "--messages", str(args.messages), "--images", str(args.images)],
+        cwd=workdir, env=env, check=True
+    )
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=open(os.path.join(workdir, "server.log"), "w")
+    )
+    try:
+        asyncio.run(bench(args, port))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
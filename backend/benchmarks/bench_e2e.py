@@ -0,0 +1,371 @@
+"""
+종단 간(E2E) 부하 벤치마크
+- 로컬 LLM 대역 서버(benchmarks.fake_llm)와 실제 uvicorn 앱 프로세스를 띄우고 HTTP 로만 구동
+- 실제 사용 비율의 요청 혼합: 프로젝트 목록, 아카이브 조회, 일반 채팅, 스트리밍 채팅, 사진 업로드
+- 동시성 단계를 올려가며 처리량, 엔드포인트별 p50/p95/p99, 스트림 TTFT, 서버 메모리(RSS) 측정
+- 결과를 benchmarks/baselines/<이름>.json 으로 저장하고 이전 기준과 비교 (회귀 시 종료 코드 1)
+
+실행: cd backend && python -m benchmarks.bench_e2e [--levels 1,4,16,32] [--duration 20]
+      [--ttft-ms 400 --tokens-per-s 40 --error-rate 0.02] [--save main] [--compare main]
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_llm import add_arguments as add_fake_arguments
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "projects=30,archive=20,message=15,stream=25,upload=10"
+
+QUESTIONS = [
+    "욕실 방수 공정 순서 알려줘", "타일 줄눈 시공은 언제 하는게 좋아?", "바닥 수평 작업 양생 기간이 얼마나 필요해?",
+    "도배 전에 퍼티 작업 몇 번 해야 해?", "주방 상부장 설치 높이 기준이 뭐야?", "전기 배선 교체할 때 체크할 것",
+    "베란다 확장 단열 어떻게 해?", "철거 후 폐기물 처리 일정 잡아줘", "마루 시공 전에 습도 몇 % 이하여야 돼?",
+    "실리콘 코킹 경화 시간은?", "욕실 타일 덧방 해도 괜찮아?", "창호 교체 실측할 때 주의사항",
+    "도장 작업 환기 시간은 얼마나?", "목공 몰딩 마감 순서 정리해줘", "설비 배관 누수 테스트 방법",
+]
+GREETINGS = ["안녕", "고마워", "수고했어"]
+STAGES = ["철거", "설비", "전기", "목공", "타일", "도장", "마감"]
+
+
+def sample_photo(width: int = 1600, height: int = 1200) -> bytes:
+    """휴대폰 사진과 비슷한 크기의 JPEG (그라디언트 + 노이즈)"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(7)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([(x / width) * 200, (y / height) * 180, ((x + y) / (width + height)) * 160], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 18, base.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """서버 프로세스 메모리 (Linux /proc)"""
+    result = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, value = line.split(":", 1)
+                    result[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return {"rss_mb": round(result.get("VmRSS", 0) / 1024, 1), "peak_rss_mb": round(result.get("VmHWM", 0) / 1024, 1)}
+
+
+class Stack:
+    """대역 서버 + 앱 서버 프로세스"""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix="tevor-bench-")
+        self.fake: Optional[subprocess.Popen] = None
+        self.app: Optional[subprocess.Popen] = None
+
+    def start(self):
+        args = self.args
+        fake_cmd = [
+            sys.executable, "-m", "benchmarks.fake_llm", "--port", str(args.fake_port),
+            "--grpc-port", str(args.grpc_port), "--ttft-ms", str(args.ttft_ms),
+            "--tokens-per-s", str(args.tokens_per_s), "--tokens", str(args.tokens),
+            "--error-rate", str(args.error_rate), "--abort-rate", str(args.abort_rate)
+        ]
+        if args.seed is not None:
+            fake_cmd += ["--seed", str(args.seed)]
+        self.fake = subprocess.Popen(fake_cmd, cwd=BACKEND_DIR, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, text=True)
+        fake_env = json.loads(self.fake.stdout.readline())
+
+        os.makedirs(os.path.join(self.workdir, "db"))
+        env = dict(
+            os.environ,
+            **fake_env,
+            DATABASE_URL=f"sqlite:///{self.workdir}/db/bench.db",
+            STORAGE_PATH=os.path.join(self.workdir, "storage", "projects"),
+            LLM_PROVIDERS=args.providers,
+            METRICS_DIR=os.path.join(self.workdir, "metrics"),
+            TIMING_LOG_SAMPLE="0",
+            PYTHONPATH=BACKEND_DIR,
+        )
+        self.app = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+             "--port", str(args.port), "--log-level", "warning", "--no-access-log"],
+            cwd=self.workdir, env=env, stdout=subprocess.DEVNULL,
+            stderr=open(os.path.join(self.workdir, "app.log"), "w")
+        )
+
+    def stop(self):
+        for process in (self.app, self.fake):
+            if process is not None and process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+class Workload:
+    """요청 혼합 실행기"""
+
+    def __init__(self, client: httpx.AsyncClient, project_ids: List[str], photo: bytes, mix: Dict[str, float]):
+        self.client = client
+        self.project_ids = project_ids
+        self.photo = photo
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.rng = random.Random(11)
+
+    def _message(self) -> str:
+        if self.rng.random() < 0.1:
+            return self.rng.choice(GREETINGS)
+        return f"{self.rng.choice(QUESTIONS)} ({self.rng.randint(1, 40)}번 현장)"
+
+    async def run_op(self, op: str) -> Tuple[int, Optional[float]]:
+        """요청 1건 → (상태 코드, 스트림 TTFT)"""
+        project_id = self.rng.choice(self.project_ids)
+        if op == "projects":
+            response = await self.client.get("/api/v1/projects/")
+        elif op == "archive":
+            response = await self.client.get(f"/api/v2/images/archive/{project_id}")
+        elif op == "message":
+            response = await self.client.post("/api/v2/chat/message",
+                                              json={"project_id": project_id, "message": self._message()})
+        elif op == "upload":
+            response = await self.client.post(
+                "/api/v2/images/analyze-and-save",
+                data={"project_id": project_id, "stage": self.rng.choice(STAGES), "caption": "현장 사진"},
+                files={"image_file": ("site.jpg", self.photo, "image/jpeg")}
+            )
+        elif op == "stream":
+            return await self._stream(project_id)
+        else:
+            raise ValueError(op)
+        return response.status_code, None
+
+    async def _stream(self, project_id: str) -> Tuple[int, Optional[float]]:
+        start = time.perf_counter()
+        ttft = None
+        ended = False
+        payload = {"project_id": project_id, "message": self._message()}
+        async with self.client.stream("POST", "/api/v2/chat/stream", json=payload) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return response.status_code, None
+            async for line in response.aiter_lines():
+                if ttft is None and line.startswith('data: {"type":"content"'):
+                    ttft = time.perf_counter() - start
+                elif line.startswith('data: {"type":"end"'):
+                    ended = True
+        # 종료 이벤트 없이 끊긴 스트림은 오류로 집계
+        return (200 if ended else 599), ttft
+
+
+async def run_level(workload: Workload, concurrency: int, duration: float) -> Dict[str, Any]:
+    samples: Dict[str, List[float]] = {op: [] for op in workload.ops}
+    ttfts: List[float] = []
+    errors: Dict[str, int] = {op: 0 for op in workload.ops}
+    rejected: Dict[str, int] = {op: 0 for op in workload.ops}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            op = workload.rng.choices(workload.ops, workload.weights)[0]
+            start = time.perf_counter()
+            try:
+                status, ttft = await workload.run_op(op)
+            except httpx.HTTPError:
+                status, ttft = 598, None
+            elapsed = time.perf_counter() - start
+            if status == 429:
+                rejected[op] += 1
+            elif status >= 400:
+                errors[op] += 1
+            else:
+                samples[op].append(elapsed)
+                if ttft is not None:
+                    ttfts.append(ttft)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    ops = {}
+    for op in workload.ops:
+        values = samples[op]
+        ops[op] = {
+            "ok": len(values),
+            "errors": errors[op],
+            "rejected": rejected[op],
+            "rps": round(len(values) / wall, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(wall, 2),
+        "rps": round(sum(len(v) for v in samples.values()) / wall, 2),
+        "stream_ttft_p50_ms": round(percentile(ttfts, 50) * 1000, 1),
+        "stream_ttft_p95_ms": round(percentile(ttfts, 95) * 1000, 1),
+        "ops": ops,
+    }
+
+
+async def bench(args) -> Dict[str, Any]:
+    mix = {k: float(v) for k, v in (item.split("=") for item in args.mix.split(","))}
+    stack = Stack(args)
+    stack.start()
+    levels = []
+    try:
+        limits = httpx.Limits(max_connections=max(args.levels) + 10, max_keepalive_connections=max(args.levels) + 10)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120, limits=limits) as client:
+            for _ in range(300):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError(f"앱 서버가 시작되지 않았습니다 (로그: {stack.workdir}/app.log)")
+
+            # 시드 데이터: 프로젝트 + 프로젝트당 사진 2장
+            photo = sample_photo()
+            project_ids = []
+            for index in range(args.projects):
+                response = await client.post("/api/v1/projects/", json={"name": f"현장 {index + 1}"})
+                project_ids.append(response.json()["project_id"])
+            workload = Workload(client, project_ids, photo, mix)
+            for project_id in project_ids:
+                for _ in range(2):
+                    await workload.run_op("upload")
+            baseline_memory = memory_kb(stack.app.pid)
+
+            print(f"{'conc':>5} {'rps':>7} {'ttft p50':>9} {'rss MB':>7}  "
+                  + "  ".join(f"{op + ' p50/p95/p99 ms':>26}" for op in workload.ops))
+            for concurrency in args.levels:
+                result = await run_level(workload, concurrency, args.duration)
+                result["memory"] = memory_kb(stack.app.pid)
+                levels.append(result)
+                print(f"{concurrency:>5} {result['rps']:>7.1f} {result['stream_ttft_p50_ms']:>8.0f}ms "
+                      f"{result['memory']['rss_mb']:>7.1f}  " + "  ".join(
+                          f"{o['p50_ms']:>8.0f}/{o['p95_ms']:>6.0f}/{o['p99_ms']:>6.0f}"
+                          + (f" e{o['errors']}" if o["errors"] else "") + (f" r{o['rejected']}" if o["rejected"] else "")
+                          for o in result["ops"].values()))
+
+            fake_stats = (await client.get(f"http://127.0.0.1:{args.fake_port}/_stats")).json()
+    finally:
+        stack.stop()
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_rev": _git_rev(),
+        "machine": {"python": platform.python_version(), "cpus": os.cpu_count(), "platform": platform.platform()},
+        "config": {
+            "mix": mix, "duration_s": args.duration, "projects": args.projects, "providers": args.providers,
+            "fake_llm": {"ttft_ms": args.ttft_ms, "tokens_per_s": args.tokens_per_s, "tokens": args.tokens,
+                         "error_rate": args.error_rate, "abort_rate": args.abort_rate},
+        },
+        "memory_after_seed": baseline_memory,
+        "fake_llm_stats": fake_stats,
+        "levels": levels,
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """기준 대비 회귀 목록 (p95 증가 또는 처리량 감소가 threshold 초과)"""
+    regressions = []
+    baseline_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    print(f"\n기준 비교 ({baseline.get('git_rev')} @ {baseline.get('created_at')}, 허용 {threshold:.0%})")
+    for level in result["levels"]:
+        old = baseline_levels.get(level["concurrency"])
+        if old is None:
+            continue
+        rps_change = (level["rps"] - old["rps"]) / old["rps"] if old["rps"] else 0.0
+        line = [f"conc {level['concurrency']:>3}: rps {old['rps']:.1f} → {level['rps']:.1f} ({rps_change:+.0%})"]
+        if rps_change < -threshold:
+            regressions.append(f"conc {level['concurrency']} rps {rps_change:+.0%}")
+        for op, stats in level["ops"].items():
+            old_stats = old["ops"].get(op)
+            if not old_stats or not old_stats["p95_ms"] or not stats["ok"]:
+                continue
+            change = (stats["p95_ms"] - old_stats["p95_ms"]) / old_stats["p95_ms"]
+            marker = " !" if change > threshold else ""
+            line.append(f"{op} p95 {change:+.0%}{marker}")
+            if change > threshold:
+                regressions.append(f"conc {level['concurrency']} {op} p95 {change:+.0%}")
+        print("  " + ", ".join(line))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=lambda v: [int(x) for x in v.split(",")], default=[1, 4, 16, 32])
+    parser.add_argument("--duration", type=float, default=20, help="동시성 단계별 측정 시간 (초)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="요청 비율 (op=가중치,...)")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--providers", default="openai,gemini", help="앱의 LLM_PROVIDERS")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--grpc-port", type=int, default=9101)
+    parser.add_argument("--save", metavar="NAME", help="결과를 baselines/NAME.json 으로 저장")
+    parser.add_argument("--compare", metavar="NAME", help="baselines/NAME.json 과 비교")
+    parser.add_argument("--threshold", type=float, default=0.15, help="회귀로 볼 변화율")
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+
+    result = asyncio.run(bench(args))
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n저장: {path}")
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json"), encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print("회귀: " + "; ".join(regressions))
+            sys.exit(1)
+        print("회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
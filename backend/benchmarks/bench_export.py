@@ -0,0 +1,187 @@
+"""
+프로젝트 내보내기 벤치마크 (스트리밍 zip)
+- 사진 N장(압축 안 되는 무작위 바이트, 장당 --photo-kb) + 채팅 M개 프로젝트를 만들고 실제 uvicorn 서버에서 내보내기
+- streaming: /api/v1/projects/{id}/export 를 청크로 받기 → 첫 바이트 시간, 처리량, 서버 최대 RSS 증가량(VmHWM)
+- in-memory: 같은 내용을 zipfile + BytesIO 로 메모리에 만드는 방식 (기존에 쓰던 방법) → 최대 RSS 증가량
+- resume: 절반 받은 뒤 끊고 Range + If-Range 로 이어받아 전체와 바이트 비교
+
+실행: cd backend && python -m benchmarks.bench_export [--photos 300] [--photo-kb 1024] [--messages 5000]
+"""
+
+import os
+import io
+import sys
+import time
+import asyncio
+import zipfile
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+
+from benchmarks.bench_dashboard import BACKEND_DIR, _free_port
+
+PROJECT_ID = "proj_export"
+
+
+def seed(args):
+    """프로젝트/채팅/사진 생성 (서버와 같은 작업 디렉터리에서 실행)"""
+    import logging
+    logging.disable(logging.INFO)
+
+    from app.database import SessionLocal, engine, init_db, IS_ASYNC
+    from app.models.project import Project
+    from app.models.image_record import ImageRecord, ChatMessage
+
+    async def run():
+        await init_db()
+        async with SessionLocal() as db:
+            db.add(Project(project_id=PROJECT_ID, name="내보내기 현장", description="벤치마크"))
+            for m in range(args.messages):
+                db.add(ChatMessage(message_id=f"msg_{m:06d}", project_id=PROJECT_ID,
+                                   user_message=f"타일 공정 질문 {m}", ai_response="확인했습니다. " * 40))
+            os.makedirs(os.path.join("archive", PROJECT_ID), exist_ok=True)
+            for i in range(args.photos):
+                filename = f"욕실_마감 중_20250101_000000_{i:05d}.png"
+                with open(os.path.join("archive", PROJECT_ID, filename), "wb") as f:
+                    f.write(os.urandom(args.photo_kb * 1024))
+                db.add(ImageRecord(image_id=f"img_{i:05d}", project_id=PROJECT_ID, space_value="욕실",
+                                   stage_value="마감 중", description_ko="타일 마감 상태",
+                                   storage_path=f"/archive/{PROJECT_ID}/{filename}"))
+            await db.commit()
+        await engine.dispose()
+
+    assert IS_ASYNC, "SQLite 로 실행"
+    asyncio.run(run())
+
+
+def peak_rss(pid: int) -> int:
+    """프로세스 최대 RSS (VmHWM, 바이트)"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def in_memory_zip(workdir: str) -> int:
+    """기존 방식: zipfile 로 BytesIO 에 전부 만든 뒤 응답 (최대 RSS 증가량 반환)"""
+    before = peak_rss(os.getpid())
+    buffer = io.BytesIO()
+    archive_dir = os.path.join(workdir, "archive", PROJECT_ID)
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("chat.jsonl", "x" * 1024)
+        for name in sorted(os.listdir(archive_dir)):
+            zf.write(os.path.join(archive_dir, name), f"photos/{name}")
+    body = buffer.getvalue()
+    assert body
+    return peak_rss(os.getpid()) - before
+
+
+async def bench(args, port: int, server_pid: int, workdir: str):
+    url = f"/api/v1/projects/{PROJECT_ID}/export"
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=600) as client:
+        for _ in range(300):
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+        await client.get(f"/api/v1/projects/{PROJECT_ID}")
+
+        rss_before = peak_rss(server_pid)
+        start = time.perf_counter()
+        ttfb = None
+        received = 0
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            etag = response.headers["etag"]
+            total = int(response.headers["content-length"])
+            with open(os.path.join(workdir, "full.zip"), "wb") as out:
+                async for chunk in response.aiter_bytes():
+                    if ttfb is None:
+                        ttfb = (time.perf_counter() - start) * 1000
+                    received += len(chunk)
+                    out.write(chunk)
+        elapsed = time.perf_counter() - start
+        stream_growth = peak_rss(server_pid) - rss_before
+        assert received == total
+        with zipfile.ZipFile(os.path.join(workdir, "full.zip")) as zf:
+            assert zf.testzip() is None
+            entries = len(zf.infolist())
+
+        # 이어받기: 절반에서 끊고 나머지를 Range 로
+        half = total // 2
+        partial = bytearray()
+        async with client.stream("GET", url) as response:
+            async for chunk in response.aiter_bytes():
+                partial += chunk
+                if len(partial) >= half:
+                    break
+        resume_start = time.perf_counter()
+        resumed = await client.get(url, headers={"Range": f"bytes={len(partial)}-", "If-Range": etag})
+        resume_ms = (time.perf_counter() - resume_start) * 1000
+        with open(os.path.join(workdir, "full.zip"), "rb") as f:
+            identical = bytes(partial) + resumed.content == f.read()
+
+    print(f"\n📦 내보내기: 사진 {args.photos}장 x {args.photo_kb} KB, 채팅 {args.messages}개 "
+          f"→ zip {total / 1048576:.0f} MB ({entries} files)")
+    print(f"streaming   TTFB {ttfb:.0f} ms, {total / 1048576 / elapsed:.0f} MB/s, "
+          f"서버 최대 RSS 증가 {stream_growth / 1048576:.1f} MB")
+    baseline = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_export", "--in-memory", workdir],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    print(f"in-memory   최대 RSS 증가 {int(baseline.stdout) / 1048576:.1f} MB (zipfile + BytesIO, 별도 프로세스)")
+    print(f"resume      {resumed.status_code} {resumed.headers.get('content-range')} in {resume_ms:.0f} ms, "
+          f"bytes identical: {identical}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프로젝트 내보내기 벤치마크")
+    parser.add_argument("--photos", type=int, default=300)
+    parser.add_argument("--photo-kb", type=int, default=1024)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--seed", action="store_true", help="내부용: 데이터 생성만 실행")
+    parser.add_argument("--in-memory", metavar="WORKDIR", help="내부용: 메모리 zip 방식만 측정")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args)
+        return
+    if args.in_memory:
+        print(in_memory_zip(args.in_memory))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="tevor-export-")
+    os.makedirs(os.path.join(workdir, "db"))
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{workdir}/db/export.db",
+        STORAGE_PATH=os.path.join(workdir, "storage", "projects"),
+        METRICS_DIR=os.path.join(workdir, "metrics"),
+        TIMING_LOG_SAMPLE="0",
+        PYTHONPATH=BACKEND_DIR,
+    )
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_export", "--seed", "--photos", str(args.photos),
+         "--photo-kb", str(args.photo_kb), "--messages", str(args.messages)],
+        cwd=workdir, env=env, check=True
+    )
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=open(os.path.join(workdir, "server.log"), "w")
+    )
+    try:
+        asyncio.run(bench(args, port, server.pid, workdir))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+--preload fork 메모리 벤치마크
+- gunicorn --preload 처럼 app.main 을 한 번 import 한 프로세스에서 워커 N 개를 os.fork
+- plain: 훅 없음 (워커마다 서비스 생성, 워커 GC 가 공유 객체 헤더를 건드려 페이지 복사)
+- hooks: 마스터에서 startup.before_fork (서비스 선생성 + gc.freeze), 워커에서 startup.after_fork
+- 워커는 요청 처리 흉내 (인텐트 판별/지식 검색 + DB 조회 + GC) 후 메모리 보고
+- 워커당 private(복사된 페이지)와 pss, 전체 합 비교 (Linux /proc/<pid>/smaps_rollup)
+
+실행: cd backend && python -m benchmarks.bench_fork [--workers 4]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, Any, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MESSAGES = ["안녕하세요", "욕실 타일 줄눈 시공 순서 알려줘", "누수 발생했는데 어떻게 해야 돼?",
+            "바닥 수평이 3mm 넘게 차이나는데 재시공 해야 하나요", "전기 공사 끝나고 바로 설비 들어가도 되나요"]
+
+
+def worker_main(use_hooks: bool, write_fd: int, go_fd: int):
+    """fork 된 워커: 요청 처리 흉내 후 메모리를 파이프로 보고"""
+    import gc
+    import asyncio
+    from sqlalchemy import text
+    from app import startup
+    from app.database import engine, IS_ASYNC
+    from app.services.metrics import process_memory
+
+    if use_hooks:
+        startup.after_fork()
+    after_fork = process_memory()
+
+    async def serve():
+        if IS_ASYNC:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        else:
+            startup._touch_sync()
+
+    startup.warm_services()
+    for _ in range(50):
+        for message in MESSAGES:
+            startup.get_intent_engine().match(message)
+            startup.get_knowledge_service().retrieve(message)
+    asyncio.run(serve())
+    gc.collect()
+
+    # 모든 워커가 끝날 때까지 대기 (형제 워커가 살아 있는 상태에서 pss 측정)
+    os.write(write_fd, (json.dumps({"after_fork": after_fork, "steady": process_memory()}) + "\n").encode())
+    os.read(go_fd, 1)
+    os._exit(0)
+
+
+def run_master(use_hooks: bool, workers: int) -> Dict[str, Any]:
+    """마스터 역할 (하위 프로세스 안에서 실행)"""
+    import logging
+    logging.disable(logging.INFO)
+    import app.main  # noqa: F401  (--preload)
+    from app import startup
+    from app.database import engine
+    from app.services.metrics import process_memory
+
+    engine.echo = False
+    master = startup.before_fork() if use_hooks else process_memory()
+
+    read_fd, write_fd = os.pipe()
+    go_read, go_write = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                worker_main(use_hooks, write_fd, go_read)
+            finally:
+                os._exit(1)
+        pids.append(pid)
+    os.close(write_fd)
+
+    reports: List[Dict[str, Any]] = []
+    with os.fdopen(read_fd) as reader:
+        for _ in range(workers):
+            reports.append(json.loads(reader.readline()))
+    os.write(go_write, b"x" * workers)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return {"master": master, "workers": reports}
+
+
+def measure(use_hooks: bool, workers: int) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="tevor-fork-")
+    os.makedirs(os.path.join(workdir, "db"))
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/db/fork.db",
+               STORAGE_PATH=os.path.join(workdir, "storage", "projects"),
+               METRICS_DIR=os.path.join(workdir, "metrics"), PYTHONPATH=BACKEND_DIR)
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_fork", "--master", "hooks" if use_hooks else "plain",
+         "--workers", str(workers)],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="--preload fork 메모리 벤치마크")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--master", choices=["plain", "hooks"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.master:
+        print(json.dumps(run_master(args.master == "hooks", args.workers)))
+        return
+
+    mb = 1048576
+    print(f"\n🍴 워커 {args.workers}개 fork (app.main preload)")
+    print(f"{'mode':<8}{'master rss':>12}{'fork private':>14}{'steady private':>16}{'steady pss':>12}{'total pss':>11}")
+    for use_hooks in (False, True):
+        result = measure(use_hooks, args.workers)
+        workers = result["workers"]
+        avg = lambda phase, key: sum(w[phase].get(key, 0) for w in workers) / len(workers) / mb
+        total_pss = (sum(w["steady"].get("pss", 0) for w in workers) + result["master"].get("pss", 0)) / mb
+        print(f"{'hooks' if use_hooks else 'plain':<8}"
+              f"{result['master'].get('rss', 0) / mb:>10.1f}MB"
+              f"{avg('after_fork', 'private'):>12.1f}MB"
+              f"{avg('steady', 'private'):>14.1f}MB"
+              f"{avg('steady', 'pss'):>10.1f}MB"
+              f"{total_pss:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
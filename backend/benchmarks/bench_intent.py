@@ -0,0 +1,89 @@
+"""
+인텐트 엔진 벤치마크
+- 기존 any(word in msg) 리스트 스캔 vs Aho-Corasick 오토마톤
+- 메시지당 판별 시간과 로컬 응답 적중률 비교
+- 오탐 검사: 하자/긴급 신고나 질문이 빠른 응답으로 새면 안 됨 (하나라도 걸리면 종료 코드 1)
+
+실행: cd backend && python -m benchmarks.bench_intent
+"""
+
+import sys
+import time
+import random
+
+from app.services.intent_engine import IntentEngine
+
+SAMPLE_MESSAGES = [
+    "안녕하세요", "안녕하세요 실장님!", "하이", "감사합니다!!!", "고마워요 ㅎㅎ", "수고하셨습니다~",
+    "오늘도 고생 많았어", "네", "넵", "알겠습니다", "ㅋㅋㅋㅋ", "급해요!!", "ok",
+    "내일 철거 작업 있어", "욕실 타일 줄눈 시공 순서 알려줘", "거실 벽지 도배 일정 잡아줘",
+    "누수 발생했는데 어떻게 해야 돼?", "전기 공사 끝나고 바로 설비 들어가도 되나요",
+    "프리미엄철거 서비스 뭐야?", "안녕하세요 주방 상판 견적 문의드립니다",
+    "바닥 수평이 3mm 넘게 차이나는데 재시공 해야 하나요", "현장 사진 정리 부탁해",
+]
+
+# 짧은 키워드가 부분 문자열로 걸리던 실제 신고/질문 - 반드시 LLM 으로 가야 함
+NEGATIVE_MESSAGES = [
+    "누수됐네", "타일 깨졌네", "응급상황", "감사 일정 언제?", "가스 새요 빨리", "벽에 금갔네",
+    "천장에서 물새요", "욕실 곰팡이 생겼네", "불났어 빨리", "누전인가봐", "네 근데 언제 와?",
+    "이거 좋아 보여?", "하이라이트 벽지", "준비됐네", "응답이 없네",
+]
+
+
+def legacy_check(message: str) -> bool:
+    """기존 UnifiedGeminiService._check_quick_patterns 스캔 방식"""
+    msg_lower = message.lower().strip()
+    greetings = ['하이', '안녕', '안녕하세요', 'hi', 'hello', '헬로', '반가워',
+                 '좋은 아침', '안녕히', '어이', '여기', '테스트', '테버']
+    if len(msg_lower) < 20 and any(g in msg_lower for g in greetings):
+        return True
+    if any(w in msg_lower for w in ['감사', '고마워', '고맙', 'thanks', 'thank']):
+        return True
+    if any(w in msg_lower for w in ['오케이', 'ok', '알았', '알겠', '네', '응', '그래']) and len(msg_lower) < 10:
+        return True
+    if any(w in msg_lower for w in ['급해', '빨리', '긴급', '시급', '당장']):
+        return True
+    return False
+
+
+def bench(name, fn, messages, rounds=20):
+    start = time.perf_counter()
+    hits = 0
+    for _ in range(rounds):
+        for message in messages:
+            if fn(message):
+                hits += 1
+    elapsed = time.perf_counter() - start
+    total = rounds * len(messages)
+    print(f"{name:<12} {elapsed / total * 1e6:8.2f} µs/msg   hit rate {hits / total * 100:5.1f}%")
+
+
+def main():
+    random.seed(0)
+    messages = [random.choice(SAMPLE_MESSAGES) for _ in range(5000)]
+    engine = IntentEngine()
+
+    print(f"messages: {len(messages)}")
+    bench("legacy", legacy_check, messages)
+    bench("automaton", lambda m: engine.match(m) is not None, messages)
+
+    print("\n판별 결과 비교 (legacy → automaton):")
+    for message in SAMPLE_MESSAGES:
+        match = engine.match(message)
+        print(f"  {message:<40} {str(legacy_check(message)):<6} → {match['intent'] if match else '-'}")
+
+    print("\n오탐 검사 (LLM 으로 가야 하는 메시지):")
+    leaked = []
+    for message in NEGATIVE_MESSAGES:
+        match = engine.match(message)
+        if match:
+            leaked.append(message)
+        print(f"  {message:<40} {str(legacy_check(message)):<6} → {match['intent'] if match else '-'}")
+    if leaked:
+        print(f"\n❌ 빠른 응답으로 샌 메시지 {len(leaked)}개: {leaked}")
+        sys.exit(1)
+    print(f"\n✅ {len(NEGATIVE_MESSAGES)}개 모두 LLM 으로 전달")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+전문 검색 벤치마크 (SQLite FTS5 + 한국어 바이그램)
+- 합성 채팅 메시지 N건 색인 (기본 100만 건, 프로젝트 500개)
+- 검색어별 1페이지 조회 / 건수 조회 지연 (p50, p95)
+
+실행: cd backend && python -m benchmarks.bench_search [--messages 1000000]
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from sqlalchemy import create_engine
+
+from app.models.search_document import SearchDocument
+from app.services.search_service import (
+    search_documents, tokenize, chat_document_text, build_match_query, build_search_sql
+)
+
+SPACES = ["거실", "주방", "욕실", "안방", "작은방", "현관", "베란다", "드레스룸"]
+WORKS = ["타일", "도배", "도장", "마루", "줄눈", "방수", "전기 배선", "설비 배관", "목공 몰딩", "실리콘", "상판", "철거"]
+ISSUES = ["누수", "균열", "들뜸", "곰팡이", "소음 민원", "수평 불량", "자재 입고 지연", "일정 변경"]
+TEMPLATES = [
+    "{space} {work} 작업 오늘 진행했어요",
+    "{space} {work} 시공 순서 알려줘",
+    "{space}에 {issue} 생겼는데 어떻게 하죠",
+    "내일 {space} {work} 일정 잡아줘",
+    "{work} 끝나고 {space} 청소 부탁해",
+    "{space} {work} 견적 다시 확인해줘",
+]
+RESPONSES = [
+    "{work} 작업 전에 바탕면 상태를 먼저 확인하세요.",
+    "{issue} 원인을 먼저 파악하고 사진을 남겨두세요.",
+    "{space} {work}은 보통 1-2일 정도 걸립니다.",
+]
+QUERIES = ["타일", "욕실 누수", "줄눈", "곰팡이", "드레스룸 실리콘", "배관", "수평 불량", "방", "자재 입고 지연"]
+
+
+def make_document(i: int, projects: int) -> dict:
+    values = {"space": random.choice(SPACES), "work": random.choice(WORKS), "issue": random.choice(ISSUES)}
+    user_message = random.choice(TEMPLATES).format(**values)
+    ai_response = random.choice(RESPONSES).format(**values)
+    return {
+        "doc_type": "chat",
+        "doc_key": f"msg_{i:08x}",
+        "project_id": f"proj_{i % projects:04d}",
+        "tokens": tokenize(chat_document_text(user_message, ai_response))
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def timed(conn, sql, params, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        conn.execute(sql, params).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    path = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+    engine = create_engine(f"sqlite:///{path}")
+    SearchDocument.__table__.create(engine)
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        batch = []
+        for i in range(args.messages):
+            batch.append(make_document(i, args.projects))
+            if len(batch) == 10_000:
+                conn.execute(search_documents.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(search_documents.insert(), batch)
+    elapsed = time.perf_counter() - start
+    print(f"indexed {args.messages:,} messages in {elapsed:.1f}s "
+          f"({args.messages / elapsed:,.0f} docs/s, db {os.path.getsize(path) / 1e6:.0f} MB)")
+
+    print(f"{'query':<16} {'filter':<8} {'hits':>9} {'page p50':>9} {'page p95':>9} {'count p50':>10}")
+    with engine.connect() as conn:
+        for query in QUERIES:
+            match = build_match_query(query, "sqlite")
+            for project_id in (None, "proj_0042"):
+                search_sql, count_sql, params = build_search_sql(match, "sqlite", project_id=project_id, limit=20)
+                page = timed(conn, search_sql, params, args.rounds)
+                counts = timed(conn, count_sql, params, max(3, args.rounds // 4))
+                hits = conn.execute(count_sql, params).scalar()
+                print(f"{query:<16} {'project' if project_id else 'all':<8} {hits:>9,} "
+                      f"{statistics.median(page):>7.1f}ms {percentile(page, 0.95):>7.1f}ms "
+                      f"{statistics.median(counts):>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
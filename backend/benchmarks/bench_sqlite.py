@@ -0,0 +1,165 @@
+"""
+SQLite 프로파일 벤치마크 (혼합 부하)
+- basic: 기존 설정 (pragma 없음 - rollback 저널, 쓰기/읽기 같은 풀, SQL 로그 출력)
+- production: WAL + synchronous=NORMAL + mmap/cache/busy_timeout, 읽기 전용 풀, 쓰기 직렬화
+- 설정마다 실제 uvicorn 서버를 띄우고 채팅 저장(POST /chat/message)과 기록 조회(GET /chat/history),
+  프로젝트 조회를 동시에 실행 - LLM 은 즉시 응답하는 가짜 프로바이더 (DB 비용만 남김)
+- 작업별 처리량, p50/p95/p99 지연, 실패(database is locked 등) 비교
+
+실행: cd backend && python -m benchmarks.bench_sqlite [--concurrency 32] [--duration 15] [--write-ratio 0.3]
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Any
+
+import httpx
+
+from benchmarks.bench_e2e import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = {
+    "basic": {"SQLITE_PROFILE": "basic", "SQL_ECHO": "1"},
+    "production": {"SQLITE_PROFILE": "production", "SQL_ECHO": "0"},
+}
+
+
+class InstantProvider:
+    """DB 경합만 보이도록 바로 응답하는 가짜 프로바이더"""
+    model_name = "bench-model"
+
+    async def generate_stream(self, message, project_context=None, conversation_history=None,
+                              deadline=None, skip_quick_patterns=False):
+        from app.services.stream_events import StartEvent, ContentEvent, EndEvent
+        yield StartEvent(self.model_name)
+        yield ContentEvent("확인했습니다. 욕실 방수층 양생 후 타일 시공 진행하세요. " * 4)
+        yield EndEvent()
+
+
+def serve(args):
+    """벤치마크용 서버 프로세스 (가짜 프로바이더 주입, SQL 로그는 환경변수 그대로)"""
+    import logging
+    import uvicorn
+    logging.getLogger("uvicorn.access").disabled = True
+
+    from app.main import app
+    from app.services.llm_router import get_llm_router
+
+    router = get_llm_router()
+    router.providers = {"openai": lambda: InstantProvider()}
+    router.order = ["openai"]
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+async def run_profile(args, profile: str) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="tevor-sqlite-")
+    os.makedirs(os.path.join(workdir, "db"))
+    env = dict(
+        os.environ,
+        **PROFILES[profile],
+        DATABASE_URL=f"sqlite:///{workdir}/db/bench.db",
+        STORAGE_PATH=os.path.join(workdir, "storage", "projects"),
+        METRICS_DIR=os.path.join(workdir, "metrics"),
+        CHAT_MAX_CONCURRENT=str(args.concurrency),
+        CHAT_MAX_PER_PROJECT=str(args.concurrency),
+        CHAT_MAX_QUEUE=str(args.concurrency * 2),
+        TIMING_LOG_SAMPLE="0",
+        PYTHONPATH=BACKEND_DIR,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_sqlite", "--serve", "--port", str(args.port)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=open(os.path.join(workdir, "server.log"), "w")
+    )
+    latencies: Dict[str, List[float]] = {"write": [], "history": [], "project": []}
+    errors: Dict[str, int] = {"write": 0, "history": 0, "project": 0}
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency + 10)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+            for _ in range(300):
+                try:
+                    if (await client.get("/ready")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            project_ids = [
+                (await client.post("/api/v1/projects/", json={"name": f"bench {i}"})).json()["project_id"]
+                for i in range(args.projects)
+            ]
+            for project_id in project_ids:
+                for i in range(args.seed_messages):
+                    await client.post("/api/v2/chat/message", json={"project_id": project_id, "message": f"기록 {i}"})
+
+            rng = random.Random(1)
+            deadline = time.perf_counter() + args.duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    project_id = rng.choice(project_ids)
+                    roll = rng.random()
+                    start = time.perf_counter()
+                    if roll < args.write_ratio:
+                        op = "write"
+                        request = client.post("/api/v2/chat/message",
+                                              json={"project_id": project_id, "message": f"현장 메모 {rng.random()}"})
+                    elif roll < args.write_ratio + (1 - args.write_ratio) * 0.7:
+                        op = "history"
+                        request = client.get(f"/api/v2/chat/history/{project_id}")
+                    else:
+                        op = "project"
+                        request = client.get(f"/api/v1/projects/{project_id}")
+                    try:
+                        response = await request
+                        ok = response.status_code == 200
+                    except httpx.HTTPError:
+                        ok = False
+                    if ok:
+                        latencies[op].append((time.perf_counter() - start) * 1000)
+                    else:
+                        errors[op] += 1
+
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    finally:
+        server.terminate()
+        server.wait()
+    return {"latencies": latencies, "errors": errors}
+
+
+async def bench(args):
+    print(f"\n🗄️  SQLite 혼합 부하: 동시 {args.concurrency}, {args.duration:.0f}초, 쓰기 비율 {args.write_ratio:.0%}")
+    print(f"{'profile':<11}{'op':<9}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for profile in args.profiles.split(","):
+        result = await run_profile(args, profile)
+        for op, values in result["latencies"].items():
+            values.sort()
+            print(f"{profile:<11}{op:<9}{len(values) / args.duration:>8.1f}"
+                  f"{percentile(values, 50):>7.1f}ms{percentile(values, 95):>7.1f}ms"
+                  f"{percentile(values, 99):>7.1f}ms{result['errors'][op]:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 프로파일 혼합 부하 벤치마크")
+    parser.add_argument("--profiles", default="basic,production")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--seed-messages", type=int, default=20, help="프로젝트별 초기 채팅 수")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--serve", action="store_true", help="내부용: 벤치마크 서버 프로세스로 실행")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+    else:
+        asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+SSE 스트리밍 벤치마크
+- 청크당 CPU: 기존 경로 (dumps → loads → dumps + f-string) vs 이벤트 객체 1회 직렬화
+- 워커 1개가 버티는 동시 스트림 수: 가짜 프로바이더로 ASGI 앱을 직접 구동하며
+  동시 스트림 수를 늘려가고 토큰 간 지연 p99 가 목표를 넘는 지점 측정
+
+실행: cd backend && python -m benchmarks.bench_sse [--max-streams 1600] [--target-ms 50]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+TOKENS = ["욕실 ", "타일은 ", "줄눈 ", "시공 ", "전에 ", "방수층 ", "양생을 ", "충분히 ", "확인해 ", "주세요."]
+
+
+def bench_encoding(rounds: int):
+    from app.services.stream_events import ContentEvent, encode_sse
+
+    def legacy(text):
+        chunk_json = json.dumps({"type": "content", "text": text})  # 서비스
+        chunk_data = json.loads(chunk_json)                          # chat_stream
+        return f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+    def typed(text):
+        return encode_sse(ContentEvent(text))
+
+    for name, fn in (("legacy dumps/loads/dumps", legacy), ("typed encode_sse", typed)):
+        start = time.perf_counter()
+        for i in range(rounds):
+            fn(TOKENS[i % len(TOKENS)])
+        per_chunk = (time.perf_counter() - start) / rounds * 1e6
+        print(f"{name:<26} {per_chunk:6.2f} µs/chunk")
+
+
+class FakeProvider:
+    """일정 간격으로 토큰을 내보내는 가짜 업스트림"""
+    model_name = "bench-model"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    async def generate_stream(self, message, project_context=None, conversation_history=None,
+                              deadline=None, skip_quick_patterns=False):
+        from app.services.stream_events import StartEvent, ContentEvent, EndEvent
+        yield StartEvent(self.model_name)
+        for token in TOKENS:
+            await asyncio.sleep(self.interval)
+            yield ContentEvent(token)
+        yield EndEvent()
+
+
+class InFlight:
+    """토큰을 받고 있는 스트림 수 (실제 동시성)"""
+    active = 0
+    peak = 0
+
+
+async def run_stream(app, project_id: str, gaps: list, index: int):
+    """ASGI 앱에 /stream 요청 1건을 직접 보내고 프레임 간격 기록"""
+    body = json.dumps({"project_id": project_id, "message": f"욕실 방수 공정 순서 {index}"}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/v2/chat/stream", "raw_path": b"/api/v2/chat/stream",
+        "query_string": b"", "root_path": "", "server": ("bench", 80), "client": ("127.0.0.1", 1000 + index),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+    done = asyncio.Event()
+    sent = False
+    last = None
+    status = None
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal last, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            # 토큰(content) 프레임 사이 간격만 측정 (저장 후 end 프레임은 제외)
+            if b'"type":"content"' in message.get("body", b""):
+                now = time.perf_counter()
+                if last is not None:
+                    gaps.append(now - last)
+                else:
+                    InFlight.active += 1
+                    InFlight.peak = max(InFlight.peak, InFlight.active)
+                last = now
+            if not message.get("more_body"):
+                if last is not None:
+                    InFlight.active -= 1
+                done.set()
+
+    await app(scope, receive, send)
+    return status == 200 and last is not None
+
+
+async def bench_capacity(args):
+    from app.main import app
+    from app.database import engine, init_db, SessionLocal
+    from app.models.project import Project
+    from app.services.llm_router import get_llm_router
+
+    engine.echo = False
+    await init_db()
+    project = Project(project_id="proj_bench", name="bench")
+    async with SessionLocal() as db:
+        db.add(project)
+        await db.commit()
+
+    router = get_llm_router()
+    router.providers = {"openai": lambda: FakeProvider(args.interval_ms / 1000)}
+    router.order = ["openai"]
+
+    await run_stream(app, project.project_id, [], 0)  # 지연 초기화 워밍업
+
+    print(f"\ntoken interval {args.interval_ms}ms, target inter-token p99 <= {args.interval_ms + args.target_ms}ms")
+    streams = args.start_streams
+    sustained = 0
+    while streams <= args.max_streams:
+        gaps: list = []
+        InFlight.peak = 0
+        start = time.perf_counter()
+        completed = await asyncio.gather(*(run_stream(app, project.project_id, gaps, i) for i in range(streams)))
+        elapsed = time.perf_counter() - start
+        ok = sum(completed)
+        gaps.sort()
+        p50 = statistics.median(gaps) * 1000 if gaps else 0
+        p99 = gaps[int(len(gaps) * 0.99) - 1] * 1000 if gaps else 0
+        print(f"streams {streams:5d}  ok {ok:5d}  peak in-flight {InFlight.peak:5d}  gap p50 {p50:7.1f}ms  p99 {p99:7.1f}ms  wall {elapsed:6.2f}s")
+        if ok < streams or p99 > args.interval_ms + args.target_ms:
+            break
+        sustained = max(sustained, InFlight.peak)
+        streams *= 2
+    print(f"sustained in-flight streams per worker: {sustained}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200_000)
+    parser.add_argument("--interval-ms", type=float, default=20)
+    parser.add_argument("--target-ms", type=float, default=50, help="허용 추가 지연 (토큰 간격 초과분)")
+    parser.add_argument("--start-streams", type=int, default=50)
+    parser.add_argument("--max-streams", type=int, default=1600)
+    args = parser.parse_args()
+
+    # 임시 DB + 입장 제어 해제 (앱 import 전에 설정)
+    tmp = tempfile.mkdtemp()
+    os.makedirs(os.path.join(tmp, "db"))
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/db/bench.db")
+    os.environ["CHAT_MAX_CONCURRENT"] = str(args.max_streams)
+    os.environ["CHAT_MAX_PER_PROJECT"] = str(args.max_streams)
+    os.environ["CHAT_MAX_QUEUE"] = str(args.max_streams)
+    os.chdir(tmp)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    import logging
+    logging.disable(logging.INFO)
+
+    bench_encoding(args.rounds)
+    asyncio.run(bench_capacity(args))
+
+
+if __name__ == "__main__":
+    main()
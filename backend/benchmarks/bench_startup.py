@@ -0,0 +1,136 @@
+"""
+콜드 스타트 벤치마크
+- import 프로파일: python -X importtime 으로 app.main 을 import 하고 누적 시간이 큰 모듈 순으로 출력
+- 부팅 시간: 빈 DB 로 uvicorn 을 띄워 포트가 열릴 때(/health)와 실제로 준비될 때(/ready 200)까지 측정
+- 예산(--budget-import-ms / --budget-ready-ms)을 넘으면 종료 코드 1 (CI 회귀 확인용)
+
+실행: cd backend && python -m benchmarks.bench_startup [--runs 3] [--top 20] [--budget-ready-ms 4000]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env(workdir: str) -> Dict[str, str]:
+    os.makedirs(os.path.join(workdir, "db"), exist_ok=True)
+    return dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{workdir}/db/startup.db",
+        STORAGE_PATH=os.path.join(workdir, "storage", "projects"),
+        METRICS_DIR=os.path.join(workdir, "metrics"),
+        TIMING_LOG_SAMPLE="0",
+        PYTHONPATH=BACKEND_DIR,
+    )
+
+
+def import_profile(workdir: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """app.main import 시간 (ms) + 최상위 패키지별 self 시간 합 (fastapi, sqlalchemy, numpy ...)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=workdir, env=_env(workdir), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+
+    packages: Dict[str, int] = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        top = name.strip().split(".")[0]
+        packages[top] = packages.get(top, 0) + int(self_us)
+        if name.strip() == "app.main":
+            total_us = int(cumulative)
+    ranked = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)
+    return total_us / 1000, [(name, us / 1000) for name, us in ranked]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot_once(workdir: str) -> Dict[str, float]:
+    """새 DB 로 서버를 띄워 /health(포트 열림)와 /ready(준비 완료) 시각 측정"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=workdir, env=_env(workdir), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    timings: Dict[str, float] = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=2) as client:
+            deadline = started + 60
+            while "ready_ms" not in timings and time.perf_counter() < deadline:
+                if process.poll() is not None:
+                    raise RuntimeError(f"server exited with {process.returncode}")
+                try:
+                    if "listen_ms" not in timings and client.get("/health").status_code == 200:
+                        timings["listen_ms"] = (time.perf_counter() - started) * 1000
+                    if "listen_ms" in timings and client.get("/ready").status_code == 200:
+                        timings["ready_ms"] = (time.perf_counter() - started) * 1000
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        if "ready_ms" not in timings:
+            raise RuntimeError("server did not become ready within 60s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드 스타트 벤치마크")
+    parser.add_argument("--runs", type=int, default=3, help="부팅 반복 횟수 (매번 새 DB)")
+    parser.add_argument("--top", type=int, default=20, help="출력할 import 상위 패키지 수")
+    parser.add_argument("--budget-import-ms", type=float, default=None, help="app.main import 예산")
+    parser.add_argument("--budget-ready-ms", type=float, default=None, help="프로세스 시작~/ready 200 예산 (중앙값)")
+    args = parser.parse_args()
+
+    import_ms, ranked = import_profile(tempfile.mkdtemp(prefix="tevor-startup-"))
+    print(f"\n📦 import app.main: {import_ms:.0f} ms")
+    for name, ms in ranked[:args.top]:
+        print(f"  {name:<28} {ms:8.1f} ms  {ms / import_ms * 100:5.1f}%")
+
+    runs = [boot_once(tempfile.mkdtemp(prefix="tevor-startup-")) for _ in range(args.runs)]
+    listen = statistics.median(r["listen_ms"] for r in runs)
+    ready = statistics.median(r["ready_ms"] for r in runs)
+    print(f"\n🚀 부팅 ({args.runs}회 중앙값)")
+    print(f"  포트 열림 (/health 200): {listen:8.0f} ms")
+    print(f"  준비 완료 (/ready 200):  {ready:8.0f} ms")
+
+    failures = []
+    if args.budget_import_ms is not None and import_ms > args.budget_import_ms:
+        failures.append(f"import {import_ms:.0f} ms > budget {args.budget_import_ms:.0f} ms")
+    if args.budget_ready_ms is not None and ready > args.budget_ready_ms:
+        failures.append(f"ready {ready:.0f} ms > budget {args.budget_ready_ms:.0f} ms")
+    if failures:
+        print("\n❌ 예산 초과")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\n✅ 예산 이내" if args.budget_import_ms or args.budget_ready_ms else "")
+
+
+if __name__ == "__main__":
+    main()
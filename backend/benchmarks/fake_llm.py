@@ -0,0 +1,326 @@
+"""
+벤치마크용 로컬 LLM 대역 서버
+- OpenAI HTTP API: POST /v1/chat/completions (스트리밍/일반), POST /v1/embeddings
+- Gemini gRPC API: GenerativeService.GenerateContent / StreamGenerateContent (TLS, 자체 서명 인증서)
+- 첫 토큰 지연(TTFT), 초당 토큰 수, 오류 주입(첫 토큰 전 5xx / 스트림 중간 끊김) 설정
+- 앱은 환경변수만 바꿔서 연결 (OPENAI_BASE_URL, GEMINI_API_ENDPOINT, GRPC_DEFAULT_SSL_ROOTS_FILE_PATH)
+
+실행: cd backend && python -m benchmarks.fake_llm [--port 9100] [--grpc-port 9101] [--ttft-ms 400]
+      [--tokens-per-s 40] [--tokens 120] [--error-rate 0.02] [--abort-rate 0.01]
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import subprocess
+from typing import Dict, Any, Optional
+
+SYLLABLES = "욕실타일줄눈시공전에방수층양생을충분히확인해주세요바닥수평철거설비목공도장마감"
+
+
+class FakeLLM:
+    """응답 지연/속도/오류 모델 (OpenAI·Gemini 공용)"""
+
+    def __init__(self, ttft_ms: float = 400, tokens_per_s: float = 40, tokens: int = 120,
+                 error_rate: float = 0.0, abort_rate: float = 0.0, jitter: float = 0.3, seed: Optional[int] = None):
+        self.ttft = ttft_ms / 1000
+        self.interval = 1 / tokens_per_s if tokens_per_s > 0 else 0.0
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.abort_rate = abort_rate
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, int] = {"requests": 0, "errors": 0, "aborts": 0, "active": 0, "tokens": 0}
+
+    def _jittered(self, seconds: float) -> float:
+        return max(0.0, seconds * self.rng.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def should_fail(self) -> bool:
+        self.stats["requests"] += 1
+        if self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return True
+        return False
+
+    def abort_at(self) -> Optional[int]:
+        """스트림을 끊을 토큰 위치 (없으면 None)"""
+        if self.rng.random() < self.abort_rate:
+            self.stats["aborts"] += 1
+            return self.rng.randint(1, max(1, self.tokens - 1))
+        return None
+
+    def token(self) -> str:
+        text = "".join(self.rng.choice(SYLLABLES) for _ in range(self.rng.randint(1, 3)))
+        return text + (" " if self.rng.random() < 0.3 else "")
+
+    async def first_token_delay(self):
+        await asyncio.sleep(self._jittered(self.ttft))
+
+    async def token_delay(self):
+        if self.interval:
+            await asyncio.sleep(self._jittered(self.interval))
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+
+# =========================
+# OpenAI HTTP
+# =========================
+
+def create_openai_app(llm: FakeLLM):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    app = FastAPI()
+
+    def usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+
+    def prompt_size(body: Dict[str, Any]) -> int:
+        return sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 2
+
+    def chunk(completion_id: str, model: str, delta: Dict[str, Any], finish: Optional[str] = None) -> bytes:
+        data = {
+            "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]
+        }
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake")
+        max_tokens = min(body.get("max_tokens") or llm.tokens, llm.tokens)
+        await llm.first_token_delay()
+        if llm.should_fail():
+            return JSONResponse({"error": {"message": "injected failure", "type": "server_error"}}, status_code=500)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        if not body.get("stream"):
+            text = "".join(llm.token() for _ in range(max_tokens))
+            await asyncio.sleep(llm.interval * max_tokens)
+            llm.stats["tokens"] += max_tokens
+            return {
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage(prompt_size(body), max_tokens)
+            }
+
+        abort_at = llm.abort_at()
+
+        async def stream():
+            llm.stats["active"] += 1
+            try:
+                yield chunk(completion_id, model, {"role": "assistant", "content": ""})
+                for index in range(max_tokens):
+                    if index:
+                        await llm.token_delay()
+                    if abort_at is not None and index == abort_at:
+                        raise ConnectionResetError("injected abort")
+                    llm.stats["tokens"] += 1
+                    yield chunk(completion_id, model, {"content": llm.token()})
+                yield chunk(completion_id, model, {}, "stop")
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    data = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                            "model": model, "choices": [], "usage": usage(prompt_size(body), max_tokens)}
+                    yield f"data: {json.dumps(data)}\n\n".encode("utf-8")
+                yield b"data: [DONE]\n\n"
+            finally:
+                llm.stats["active"] -= 1
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        dim = body.get("dimensions") or 256
+        data = []
+        for index, text in enumerate(inputs):
+            rng = random.Random(str(text))
+            data.append({"object": "embedding", "index": index, "embedding": [rng.gauss(0, 1) for _ in range(dim)]})
+        tokens = sum(len(str(t)) for t in inputs) // 2
+        return {"object": "list", "data": data, "model": body.get("model"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+    @app.get("/_stats")
+    async def stats():
+        return llm.get_stats()
+
+    return app
+
+
+# =========================
+# Gemini gRPC
+# =========================
+
+GEMINI_SERVICE = "google.ai.generativelanguage.v1beta.GenerativeService"
+
+
+def create_gemini_server(llm: FakeLLM, port: int, cert_file: str, key_file: str):
+    import grpc
+    from google.ai import generativelanguage_v1beta as glm
+
+    def response(text: str, finish: bool = False, prompt_tokens: int = 0, completion_tokens: int = 0):
+        candidate = glm.Candidate(content=glm.Content(parts=[glm.Part(text=text)], role="model"), index=0)
+        if finish:
+            candidate.finish_reason = glm.Candidate.FinishReason.STOP
+        result = glm.GenerateContentResponse(candidates=[candidate])
+        if finish:
+            result.usage_metadata = glm.GenerateContentResponse.UsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=completion_tokens,
+                total_token_count=prompt_tokens + completion_tokens
+            )
+        return result
+
+    def limits(request) -> int:
+        max_tokens = request.generation_config.max_output_tokens if request.generation_config else 0
+        return min(max_tokens or llm.tokens, llm.tokens)
+
+    def prompt_size(request) -> int:
+        return sum(len(part.text) for content in request.contents for part in content.parts) // 2
+
+    async def generate_content(request, context):
+        await llm.first_token_delay()
+        if llm.should_fail():
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "injected failure")
+        count = limits(request)
+        await asyncio.sleep(llm.interval * count)
+        llm.stats["tokens"] += count
+        return response("".join(llm.token() for _ in range(count)), True, prompt_size(request), count)
+
+    async def stream_generate_content(request, context):
+        await llm.first_token_delay()
+        if llm.should_fail():
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "injected failure")
+        count = limits(request)
+        abort_at = llm.abort_at()
+        llm.stats["active"] += 1
+        try:
+            # Gemini 는 델타를 몇 토큰씩 묶어서 보냄
+            sent = 0
+            while sent < count:
+                batch = min(count - sent, llm.rng.randint(3, 8))
+                for _ in range(batch):
+                    await llm.token_delay()
+                if abort_at is not None and sent >= abort_at:
+                    await context.abort(grpc.StatusCode.INTERNAL, "injected abort")
+                sent += batch
+                llm.stats["tokens"] += batch
+                text = "".join(llm.token() for _ in range(batch))
+                yield response(text, sent >= count, prompt_size(request), count)
+        finally:
+            llm.stats["active"] -= 1
+
+    handler = grpc.method_handlers_generic_handler(GEMINI_SERVICE, {
+        "GenerateContent": grpc.unary_unary_rpc_method_handler(
+            generate_content,
+            request_deserializer=glm.GenerateContentRequest.deserialize,
+            response_serializer=glm.GenerateContentResponse.serialize
+        ),
+        "StreamGenerateContent": grpc.unary_stream_rpc_method_handler(
+            stream_generate_content,
+            request_deserializer=glm.GenerateContentRequest.deserialize,
+            response_serializer=glm.GenerateContentResponse.serialize
+        ),
+    })
+
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers((handler,))
+    with open(key_file, "rb") as f:
+        key = f.read()
+    with open(cert_file, "rb") as f:
+        cert = f.read()
+    server.add_secure_port(f"localhost:{port}", grpc.ssl_server_credentials([(key, cert)]))
+    return server
+
+
+def ensure_certificate(directory: str) -> tuple:
+    """localhost 용 자체 서명 인증서 (앱은 GRPC_DEFAULT_SSL_ROOTS_FILE_PATH 로 신뢰)"""
+    os.makedirs(directory, exist_ok=True)
+    cert_file = os.path.join(directory, "fake_llm.crt")
+    key_file = os.path.join(directory, "fake_llm.key")
+    if not (os.path.exists(cert_file) and os.path.exists(key_file)):
+        subprocess.run([
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "7",
+            "-keyout", key_file, "-out", cert_file, "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"
+        ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return cert_file, key_file
+
+
+def app_environment(port: int, grpc_port: Optional[int], cert_file: Optional[str]) -> Dict[str, str]:
+    """앱 프로세스가 대역 서버를 쓰도록 하는 환경변수"""
+    env = {
+        "OPENAI_API_KEY": "sk-bench-0000000000000000000000",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+    }
+    if grpc_port and cert_file:
+        env.update({
+            "GEMINI_API_KEY": "bench-gemini-key",
+            "GEMINI_API_ENDPOINT": f"localhost:{grpc_port}",
+            "GRPC_DEFAULT_SSL_ROOTS_FILE_PATH": cert_file,
+        })
+    return env
+
+
+async def serve(args):
+    import uvicorn
+
+    llm = FakeLLM(args.ttft_ms, args.tokens_per_s, args.tokens, args.error_rate, args.abort_rate, seed=args.seed)
+    config = uvicorn.Config(create_openai_app(llm), host="127.0.0.1", port=args.port,
+                            log_level="warning", timeout_keep_alive=30)
+    tasks = [uvicorn.Server(config).serve()]
+
+    grpc_server = None
+    if args.grpc_port:
+        cert_file, key_file = ensure_certificate(args.cert_dir)
+        grpc_server = create_gemini_server(llm, args.grpc_port, cert_file, key_file)
+        await grpc_server.start()
+        tasks.append(grpc_server.wait_for_termination())
+
+    print(json.dumps(app_environment(args.port, args.grpc_port, args.grpc_port and cert_file)), flush=True)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        if grpc_server is not None:
+            await grpc_server.stop(0)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--ttft-ms", type=float, default=400, help="첫 토큰까지 지연 (ms, ±jitter)")
+    parser.add_argument("--tokens-per-s", type=float, default=40, help="첫 토큰 이후 초당 토큰 수")
+    parser.add_argument("--tokens", type=int, default=120, help="응답당 최대 토큰 수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="첫 토큰 전 오류 비율")
+    parser.add_argument("--abort-rate", type=float, default=0.0, help="스트림 중간 끊김 비율")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--grpc-port", type=int, default=9101, help="0 이면 Gemini gRPC 대역 끔")
+    parser.add_argument("--cert-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".certs"))
+    add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
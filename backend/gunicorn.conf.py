@@ -0,0 +1,34 @@
+"""
+gunicorn 설정 (Render 배포: gunicorn -c gunicorn.conf.py app.main:app)
+- --preload: 마스터가 앱을 한 번 import 하고 워커를 fork (읽기 전용 데이터는 copy-on-write 로 공유)
+- pre_fork: 읽기 전용 서비스 생성 + 연결 풀 정리 + gc.freeze (startup.before_fork)
+- post_fork: 워커별 연결 풀/API 클라이언트 재생성 (startup.after_fork)
+- fork 직전(마스터)/직후(워커) 메모리(rss/pss/private)를 로그로 남김 - 준비 완료 후 값은 /ready 와 /metrics
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+max_requests = 1000
+max_requests_jitter = 50
+
+
+def _format_memory(memory):
+    return " ".join(f"{kind}={value / 1048576:.1f}MB" for kind, value in memory.items())
+
+
+def pre_fork(server, worker):
+    from app.startup import before_fork
+    memory = before_fork()
+    server.log.info(f"master before fork: {_format_memory(memory)}")
+
+
+def post_fork(server, worker):
+    from app.startup import after_fork
+    memory = after_fork()
+    server.log.info(f"worker {worker.pid} after fork: {_format_memory(memory)}")
+
@@ -89,6 +89,17 @@ class TevorAPI {
     return response.data;
   }
 
+  // 인수인계 패키지 zip (브라우저 다운로드 링크로 사용 - 서버가 스트리밍, 끊기면 이어받기)
+  getProjectExportUrl(projectId: string): string {
+    return `${API_BASE_URL}/api/v1/projects/${projectId}/export`;
+  }
+
+  // 대시보드 - 프로젝트 목록 + 통계 + 최근 채팅 + 대표 사진 (프로젝트별 요약/아카이브 요청 대신)
+  async getDashboard(page = 1, pageSize = 20) {
+    const response = await apiClient.get('/api/v1/dashboard/', { params: { page, page_size: pageSize } });
+    return response.data;
+  }
+
   // 채팅 관련 API - v2 엔드포인트 사용
   async sendMessage(data: ChatRequest): Promise<ChatResponse> {
     const response: AxiosResponse<ChatResponse> = await apiClient.post('/api/v2/chat/message', data);
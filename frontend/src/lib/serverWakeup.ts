@@ -5,11 +5,11 @@ export async function wakeUpServer(): Promise<boolean> {
   try {
     console.log('🔄 서버 상태 확인 중...');
     
-    // health endpoint로 서버 깨우기 (timeout 짧게 설정)
+    // ready endpoint로 서버 깨우기 - 예열이 끝나야 200 (timeout 짧게 설정)
     const controller = new AbortController();
     const timeoutId = setTimeout(() => controller.abort(), 5000); // 5초 timeout
     
-    const response = await fetch(`${API_BASE_URL}/health`, {
+    const response = await fetch(`${API_BASE_URL}/ready`, {
       method: 'GET',
       signal: controller.signal,
     });